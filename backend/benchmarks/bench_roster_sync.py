@@ -0,0 +1,132 @@
+"""
+Compare per-page and batched Classroom roster fetching.
+
+Usage (from the backend/ directory; no Google account or database needed):
+    python -m benchmarks.bench_roster_sync
+    python -m benchmarks.bench_roster_sync --courses 200 --students 45 --latency 0.25
+
+Starts a local fake Classroom API that answers courses.students.list (pages
+of 30 students) and the /batch endpoint, with --latency seconds per HTTP
+exchange, and points google_clients at it. Times the old fan-out (one
+request per roster page, 16 threads) against classroom_fetch.fetch_rosters
+(batch requests) and counts the HTTP exchanges each needed.
+"""
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from google.oauth2.credentials import Credentials
+
+from src.services import classroom_fetch, google_clients
+
+PAGE = 30
+BOUNDARY = "fake_batch_boundary"
+
+
+class _Server(ThreadingHTTPServer):
+    # The default listen backlog of 5 drops connections when every worker connects at once.
+    request_queue_size = 128
+    daemon_threads = True
+    exchanges = 0
+
+
+def _fake_classroom(n_students: int, latency: float) -> _Server:
+    def roster_page(path: str) -> dict:
+        url = urlparse(path)
+        course_id = url.path.split("/courses/")[1].split("/")[0]
+        start = int(parse_qs(url.query).get("pageToken", ["0"])[0])
+        body = {"students": [
+            {"userId": f"{course_id}-{i}", "profile": {"name": {"fullName": f"Alumno {i} Perez Lopez"}}}
+            for i in range(start, min(start + PAGE, n_students))
+        ]}
+        if start + PAGE < n_students:
+            body["nextPageToken"] = str(start + PAGE)
+        return body
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _send(self, content_type: str, data: bytes):
+            self.server.exchanges += 1
+            time.sleep(latency)
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            self._send("application/json", json.dumps(roster_page(self.path)).encode())
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            header = f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode()
+            parts = []
+            for part in BytesParser().parsebytes(header + body).get_payload():
+                request_line = part.get_payload().splitlines()[0]
+                content = json.dumps(roster_page(request_line.split(" ")[1]))
+                parts.append(
+                    f"--{BOUNDARY}\r\nContent-Type: application/http\r\n"
+                    f"Content-ID: <response-{part['Content-ID'][1:-1]}>\r\n\r\n"
+                    f"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n\r\n{content}\r\n"
+                )
+            parts.append(f"--{BOUNDARY}--\r\n")
+            self._send(f"multipart/mixed; boundary={BOUNDARY}", "".join(parts).encode())
+
+    server = _Server(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _per_page(credentials: Credentials, course_ids, workers: int = 16) -> dict:
+    service = google_clients.classroom(credentials)
+
+    def fetch(course_id):
+        return course_id, classroom_fetch.list_all(
+            lambda page_token: service.courses().students().list(
+                courseId=course_id, pageSize=classroom_fetch.PAGE_SIZE, pageToken=page_token,
+            ),
+            "students",
+        )
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return dict(pool.map(fetch, course_ids))
+
+
+def _batched(credentials: Credentials, course_ids) -> dict:
+    return {course_id: listing.items for course_id, listing in classroom_fetch.fetch_rosters(credentials, course_ids).items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--courses", type=int, default=200)
+    parser.add_argument("--students", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.2)
+    args = parser.parse_args()
+
+    server = _fake_classroom(args.students, args.latency)
+    google_clients.API_ENDPOINTS["classroom"] = f"http://127.0.0.1:{server.server_port}/"
+    credentials = Credentials(token="fake")
+    course_ids = [f"course{i}" for i in range(args.courses)]
+
+    timings = {}
+    for label, fetch in (("per-page", _per_page), ("batched", _batched)):
+        server.exchanges = 0
+        start = time.perf_counter()
+        rosters = fetch(credentials, course_ids)
+        timings[label] = time.perf_counter() - start
+        fetched = sum(len(students) for students in rosters.values())
+        print(f"{label:>9}: {timings[label]:.2f}s, {server.exchanges} HTTP exchanges, "
+              f"{len(rosters)} courses, {fetched} students")
+    print(f"speedup: {timings['per-page'] / timings['batched']:.1f}x")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
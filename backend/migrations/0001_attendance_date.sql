@@ -0,0 +1,30 @@
+-- One attendance record per student, period and local (Mexico, UTC-6) day,
+-- enforced by a unique key instead of a read-then-write in the API.
+
+ALTER TABLE attendance_records ADD COLUMN IF NOT EXISTS attendance_date DATE;
+
+UPDATE attendance_records
+SET attendance_date = ("timestamp" - INTERVAL '6 hours')::date
+WHERE attendance_date IS NULL;
+
+-- Rows recorded before the key existed may collide on the local day;
+-- keep the most recent scan of each student/period/day.
+DELETE FROM attendance_records a
+USING attendance_records b
+WHERE a.student_id = b.student_id
+  AND a.period_id = b.period_id
+  AND a.attendance_date = b.attendance_date
+  AND (a."timestamp", a.id) < (b."timestamp", b.id);
+
+ALTER TABLE attendance_records ALTER COLUMN attendance_date SET NOT NULL;
+
+CREATE INDEX IF NOT EXISTS ix_attendance_records_attendance_date
+    ON attendance_records (attendance_date);
+
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = '_student_period_date_uc') THEN
+        ALTER TABLE attendance_records
+            ADD CONSTRAINT _student_period_date_uc UNIQUE (student_id, period_id, attendance_date);
+    END IF;
+END $$;
@@ -0,0 +1,3 @@
+-- Keyset pagination of attendance history walks (timestamp, id) in order.
+CREATE INDEX IF NOT EXISTS ix_attendance_records_timestamp_id
+    ON attendance_records ("timestamp", id);
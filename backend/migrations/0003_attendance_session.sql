@@ -0,0 +1,7 @@
+-- Links attendance records to the class meeting they were scanned in.
+-- class_sessions itself is created by create_all and filled at startup.
+ALTER TABLE attendance_records
+    ADD COLUMN IF NOT EXISTS session_id INTEGER REFERENCES class_sessions(id) ON DELETE SET NULL;
+
+CREATE INDEX IF NOT EXISTS ix_attendance_records_session_id
+    ON attendance_records (session_id);
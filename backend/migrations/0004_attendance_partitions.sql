@@ -0,0 +1,75 @@
+-- attendance_records becomes a table partitioned by month of attendance_date.
+-- Queries for a day or a date range only touch the matching partitions, and
+-- closed school years can be detached and archived (see
+-- services/attendance_partitions.py). Partitioned tables need the partition key
+-- in every unique key, so the primary key becomes (id, attendance_date).
+
+-- Creates the partition holding `day` if it does not exist yet; returns its name.
+CREATE OR REPLACE FUNCTION ensure_attendance_partition(day DATE) RETURNS TEXT AS $$
+DECLARE
+    month_start DATE := date_trunc('month', day)::date;
+    partition_name TEXT := 'attendance_records_' || to_char(month_start, 'YYYY_MM');
+BEGIN
+    IF to_regclass(partition_name) IS NULL THEN
+        EXECUTE 'CREATE TABLE IF NOT EXISTS ' || quote_ident(partition_name)
+            || ' PARTITION OF attendance_records FOR VALUES FROM ('
+            || quote_literal(month_start) || ') TO ('
+            || quote_literal((month_start + INTERVAL '1 month')::date) || ')';
+    END IF;
+    RETURN partition_name;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Databases created before partitioning: move the rows into a partitioned copy.
+-- Fresh databases already get the partitioned table from create_all.
+DO $$
+DECLARE
+    month DATE;
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = 'attendance_records'::regclass) = 'r' THEN
+        ALTER TABLE attendance_records RENAME TO attendance_records_unpartitioned;
+        ALTER SEQUENCE attendance_records_id_seq OWNED BY NONE;
+
+        CREATE TABLE attendance_records (
+            id INTEGER NOT NULL DEFAULT nextval('attendance_records_id_seq'),
+            student_id INTEGER NOT NULL,
+            subject_id INTEGER NOT NULL,
+            "timestamp" TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now(),
+            attendance_date DATE NOT NULL,
+            period_id INTEGER NOT NULL,
+            session_id INTEGER,
+            status VARCHAR(20)
+        ) PARTITION BY RANGE (attendance_date);
+
+        FOR month IN
+            SELECT generate_series(
+                date_trunc('month', min(attendance_date)),
+                date_trunc('month', max(attendance_date)),
+                INTERVAL '1 month'
+            )::date
+            FROM attendance_records_unpartitioned
+        LOOP
+            PERFORM ensure_attendance_partition(month);
+        END LOOP;
+
+        INSERT INTO attendance_records
+            (id, student_id, subject_id, "timestamp", attendance_date, period_id, session_id, status)
+        SELECT id, student_id, subject_id, "timestamp", attendance_date, period_id, session_id, status
+        FROM attendance_records_unpartitioned;
+
+        DROP TABLE attendance_records_unpartitioned;
+        ALTER SEQUENCE attendance_records_id_seq OWNED BY attendance_records.id;
+
+        ALTER TABLE attendance_records
+            ADD PRIMARY KEY (id, attendance_date),
+            ADD CONSTRAINT _student_period_date_uc UNIQUE (student_id, period_id, attendance_date),
+            ADD FOREIGN KEY (student_id) REFERENCES students (id) ON DELETE CASCADE,
+            ADD FOREIGN KEY (subject_id) REFERENCES subjects (id) ON DELETE CASCADE,
+            ADD FOREIGN KEY (period_id) REFERENCES periods (id),
+            ADD FOREIGN KEY (session_id) REFERENCES class_sessions (id) ON DELETE SET NULL;
+
+        CREATE INDEX ix_attendance_records_attendance_date ON attendance_records (attendance_date);
+        CREATE INDEX ix_attendance_records_session_id ON attendance_records (session_id);
+        CREATE INDEX ix_attendance_records_timestamp_id ON attendance_records ("timestamp", id);
+    END IF;
+END $$;
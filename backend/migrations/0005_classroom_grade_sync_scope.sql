@@ -0,0 +1,5 @@
+-- Records which linked assignments and mapped students a Classroom grade
+-- import high-water mark covers. Existing marks get NULL and are therefore
+-- ignored once: the next import of each course work reads it in full.
+ALTER TABLE classroom_grade_sync_states
+    ADD COLUMN IF NOT EXISTS scope_hash VARCHAR(64);
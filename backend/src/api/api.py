@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from .endpoints import teacher, subject, group, schedule, topic, student, qr_code, download, google_auth, classroom, assignment, grades, attendance 
+from .endpoints import teacher, subject, group, schedule, topic, student, qr_code, download, google_auth, classroom, assignment, grades, attendance, class_session 
 
 api_router = APIRouter()
 api_router.include_router(teacher.router, prefix="/api", tags=["teacher"])
@@ -14,4 +14,5 @@ api_router.include_router(google_auth.router, prefix="/api", tags=["auth"])
 api_router.include_router(classroom.router, prefix="/api", tags=["classroom"])
 api_router.include_router(assignment.router, prefix="/api", tags=["assignment"])
 api_router.include_router(grades.router, prefix="/api", tags=["grades"])
-api_router.include_router(attendance.router, prefix="/api", tags=["attendance"])
\ No newline at end of file
+api_router.include_router(attendance.router, prefix="/api", tags=["attendance"])
+api_router.include_router(class_session.router, prefix="/api", tags=["class_session"])
\ No newline at end of file
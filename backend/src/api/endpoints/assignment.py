@@ -1,8 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from typing import List
 from ...database import SessionLocal
-from ...crud import crud_assignment
+from ...crud import assignment_registry, crud_assignment
 from ...schemas import assignment as assignment_schema
 from ...models import models
 
@@ -15,15 +15,17 @@ def get_db():
     finally:
         db.close()
 
-# --- GET Endpoint ---
+# --- GET Endpoints ---
 @router.get("/assignments/by-topic/{topic_id}", response_model=assignment_schema.AllAssignmentsResponse)
 def get_all_assignments_for_topic(topic_id: int, db: Session = Depends(get_db)):
-    return {
-        "notebook_assignments": db.query(models.NotebookAssignment).filter(models.NotebookAssignment.topic_id == topic_id).all(),
-        "practice_assignments": db.query(models.PracticeAssignment).filter(models.PracticeAssignment.topic_id == topic_id).all(),
-        "exam_assignments": db.query(models.ExamAssignment).filter(models.ExamAssignment.topic_id == topic_id).all(),
-        "other_assignments": db.query(models.OtherAssignment).filter(models.OtherAssignment.topic_id == topic_id).all()
-    }
+    return crud_assignment.get_assignments_for_topic(db, topic_id=topic_id)
+
+@router.get("/assignments/by-topics", response_model=List[assignment_schema.CategorizedAssignment])
+def get_assignments_for_topics(topic_ids: List[int] = Query(...), db: Session = Depends(get_db)):
+    """
+    Retrieves every assignment of several topics, all categories, in one query.
+    """
+    return assignment_registry.get_assignments(db, topic_ids)
 
 # --- POST Endpoints ---
 @router.post("/assignments/notebook", response_model=assignment_schema.Assignment)
@@ -42,7 +44,21 @@ def create_exam_assignment(assignment: assignment_schema.ExamAssignmentCreate, d
 def create_other_assignment(assignment: assignment_schema.OtherAssignmentCreate, db: Session = Depends(get_db)):
     return crud_assignment.create_other_assignment(db=db, assignment=assignment)
 
+@router.post("/assignments/bulk", response_model=List[assignment_schema.CategorizedAssignment])
+def create_assignments_bulk(assignments: List[assignment_schema.AssignmentBulkCreate], db: Session = Depends(get_db)):
+    """
+    Creates assignments of any categories in one transaction.
+    """
+    return assignment_registry.bulk_create(db, assignments)
+
 # --- PUT Endpoints ---
+@router.put("/assignments/bulk", response_model=List[assignment_schema.CategorizedAssignment])
+def update_assignments_bulk(assignments: List[assignment_schema.AssignmentBulkUpdate], db: Session = Depends(get_db)):
+    """
+    Updates assignments of any categories in one transaction.
+    """
+    return assignment_registry.bulk_update(db, assignments)
+
 @router.put("/assignments/notebook/{assignment_id}", response_model=assignment_schema.Assignment)
 def update_notebook_assignment(assignment_id: int, assignment: assignment_schema.AssignmentUpdate, db: Session = Depends(get_db)):
     return crud_assignment.update_notebook_assignment(db, assignment_id, assignment)
@@ -1,9 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+import json
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Header, Query
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from ...database import SessionLocal
 from ...crud import crud_attendance
 from ...schemas import attendance as attendance_schema
+from ...services.attendance_feed import attendance_feed
 from datetime import date
 
 router = APIRouter()
@@ -25,6 +30,13 @@ def record_attendance(attendance: attendance_schema.AttendanceCreate, db: Sessio
         late_threshold=attendance.late_threshold
     )
 
+@router.post("/attendance/batch", response_model=attendance_schema.AttendanceBatchResult)
+def record_attendance_batch(batch: attendance_schema.AttendanceBatchCreate, db: Session = Depends(get_db)):
+    """
+    Records scans buffered by an offline scanner, reporting an outcome per entry.
+    """
+    return crud_attendance.create_attendance_records_batch(db=db, scans=batch.entries)
+
 @router.get("/attendance/today", response_model=List[attendance_schema.AttendanceRecord])
 def get_todays_attendance(db: Session = Depends(get_db)):
     """
@@ -37,4 +49,158 @@ def get_attendance_for_date(query_date: date, db: Session = Depends(get_db)):
     """
     Retrieves all attendance records for a specific date.
     """
-    return crud_attendance.get_attendance_by_date(db=db, query_date=query_date)
\ No newline at end of file
+    return crud_attendance.get_attendance_by_date(db=db, query_date=query_date)
+
+@router.get("/attendance/absences", response_model=attendance_schema.AbsenceReport)
+def get_absences(
+    start_date: date,
+    end_date: date,
+    group_id: Optional[int] = None,
+    subject_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Infers absences from the weekly schedule, the active rosters and the recorded scans.
+    """
+    return crud_attendance.get_absence_report(db=db, start_date=start_date, end_date=end_date, group_id=group_id, subject_id=subject_id)
+
+@router.post("/attendance/absences/materialize", response_model=attendance_schema.AbsenceMaterializeResult)
+def materialize_absences(
+    start_date: date,
+    end_date: date,
+    group_id: Optional[int] = None,
+    subject_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Stores inferred absences of past days as 'absent' attendance records.
+    """
+    return crud_attendance.materialize_absences(db=db, start_date=start_date, end_date=end_date, group_id=group_id, subject_id=subject_id)
+
+@router.get("/attendance/summary", response_model=List[attendance_schema.AttendanceSummary])
+def get_attendance_summary(
+    subject_id: Optional[int] = None,
+    period_id: Optional[int] = None,
+    group_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Retrieves per-student present/late counts from the attendance rollups.
+    """
+    return crud_attendance.get_attendance_summary(db=db, subject_id=subject_id, period_id=period_id, group_id=group_id)
+
+def history_filters(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    group_id: Optional[int] = None,
+    subject_id: Optional[int] = None,
+    period_id: Optional[int] = None,
+    status: Optional[str] = None,
+):
+    return {
+        "start_date": start_date,
+        "end_date": end_date,
+        "group_id": group_id,
+        "subject_id": subject_id,
+        "period_id": period_id,
+        "status": status,
+    }
+
+@router.get("/attendance/history", response_model=attendance_schema.AttendanceHistoryPage)
+def get_attendance_history(
+    filters: dict = Depends(history_filters),
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Retrieves attendance records for a date range, newest first, filtered by
+    group, subject, period and status. Pass `nextCursor` back as `cursor` to
+    get the following page.
+    """
+    return crud_attendance.get_attendance_history(db=db, filters=filters, limit=limit, cursor=cursor)
+
+@router.get("/attendance/history/export")
+def export_attendance_history(filters: dict = Depends(history_filters)):
+    """
+    Streams every matching attendance record as newline-delimited JSON.
+    """
+    def lines():
+        db = SessionLocal()
+        try:
+            for record in crud_attendance.stream_attendance_history(db=db, filters=filters):
+                yield attendance_schema.AttendanceRecord.model_validate(record).model_dump_json(by_alias=True) + "\n"
+        finally:
+            db.close()
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+KEEP_ALIVE_SECONDS = 15
+
+def _sse(event: str, cursor: str, data) -> str:
+    return f"event: {event}\nid: {cursor}\ndata: {json.dumps(data)}\n\n"
+
+def _todays_snapshot():
+    db = SessionLocal()
+    try:
+        return [
+            attendance_schema.AttendanceRecord.model_validate(record).model_dump(mode='json', by_alias=True)
+            for record in crud_attendance.get_todays_attendance(db=db)
+        ]
+    finally:
+        db.close()
+
+@router.get("/attendance/stream")
+async def stream_todays_attendance(
+    request: Request,
+    cursor: Optional[str] = None,
+    last_event_id: Optional[str] = Header(None),
+):
+    """
+    Server-Sent Events feed of today's attendance.
+
+    Sends a `snapshot` event with the day's records, then a `record` event for
+    every record created or updated afterwards. Each event id is a cursor; a
+    client reconnecting with it (`?cursor=` or the Last-Event-ID header that
+    EventSource sends automatically) only receives what it missed, unless
+    the cursor is too old, in which case it gets a fresh snapshot.
+    """
+    async def events():
+        queue = attendance_feed.subscribe()
+        try:
+            today = crud_attendance.get_mexico_time().date()
+            sent = attendance_feed.sequence
+            backlog = attendance_feed.replay_since(cursor or last_event_id, today)
+            if backlog is None:
+                records = await run_in_threadpool(_todays_snapshot)
+                yield _sse("snapshot", attendance_feed.cursor_for(sent), {"date": today.isoformat(), "records": records})
+            else:
+                for event in backlog:
+                    yield _sse("record", attendance_feed.cursor_for(event.sequence), event.record)
+                    sent = max(sent, event.sequence)
+
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=KEEP_ALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if event.sequence <= sent or event.day < today:
+                    continue
+                if event.day > today:
+                    # The day rolled over: start the new day from a fresh snapshot.
+                    today = event.day
+                    sent = attendance_feed.sequence
+                    records = await run_in_threadpool(_todays_snapshot)
+                    yield _sse("snapshot", attendance_feed.cursor_for(sent), {"date": today.isoformat(), "records": records})
+                    continue
+                yield _sse("record", attendance_feed.cursor_for(event.sequence), event.record)
+                sent = event.sequence
+        finally:
+            attendance_feed.unsubscribe(queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
\ No newline at end of file
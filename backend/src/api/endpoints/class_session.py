@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from datetime import date
+from ...database import SessionLocal
+from ...crud import crud_class_session
+from ...schemas import class_session as class_session_schema
+
+router = APIRouter()
+
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+@router.get("/class-sessions", response_model=List[class_session_schema.ClassSessionSummary])
+def read_class_sessions(start_date: date, end_date: date, group_id: Optional[int] = None, db: Session = Depends(get_db)):
+    """
+    Retrieves the class meetings between two dates with their present/late counts.
+    """
+    return crud_class_session.get_class_sessions(db=db, start_date=start_date, end_date=end_date, group_id=group_id)
+
+@router.get("/class-sessions/attendance-rates", response_model=List[class_session_schema.GroupAttendanceRate])
+def read_attendance_rates(start_date: date, end_date: date, subject_id: Optional[int] = None, db: Session = Depends(get_db)):
+    """
+    Retrieves the attendance rate of each group over its class meetings between two dates.
+    """
+    return crud_class_session.get_attendance_rates(db=db, start_date=start_date, end_date=end_date, subject_id=subject_id)
+
+@router.get("/class-sessions/{session_id}/roll-call", response_model=class_session_schema.RollCall)
+def read_roll_call(session_id: int, db: Session = Depends(get_db)):
+    """
+    Retrieves the session's group roster with each student's attendance record in it.
+    """
+    return crud_class_session.get_roll_call(db=db, session_id=session_id)
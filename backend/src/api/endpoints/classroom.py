@@ -3,12 +3,14 @@ import json
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 
 from ...database import SessionLocal
 from ...crud import crud_teacher
-from ...services.classroom_sync import sync_workspace_from_classroom
+from ...models import models
+from ...schemas import sync_job as sync_job_schema
+from ...services import google_clients
+from ...services.sync_jobs import sync_jobs
 
 router = APIRouter()
 
@@ -19,17 +21,17 @@ def get_db():
     finally:
         db.close()
 
-def get_classroom_service(db: Session = Depends(get_db)):
+def get_classroom_credentials(db: Session = Depends(get_db)):
     teacher = crud_teacher.get_teacher(db)
     if not teacher or not teacher.google_credentials:
         raise HTTPException(status_code=401, detail="Google account not connected.")
     
     creds_info = json.loads(teacher.google_credentials)
-    credentials = Credentials.from_authorized_user_info(creds_info)
-    
+    return google_clients.credentials_from_info(creds_info)
+
+def get_classroom_service(credentials: Credentials = Depends(get_classroom_credentials)):
     try:
-        service = build('classroom', 'v1', credentials=credentials)
-        return service
+        return google_clients.classroom(credentials)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to build Google Classroom service: {e}")
 
@@ -121,17 +123,39 @@ def get_user_profile(service=Depends(get_classroom_service)):
         raise HTTPException(status_code=500, detail=f"Failed to fetch user profile: {e}")
 
 
-@router.post("/classroom/sync-workspace", tags=["classroom"])
+@router.post("/classroom/sync-workspace", tags=["classroom"], status_code=202, response_model=sync_job_schema.SyncJob)
 def sync_workspace(db: Session = Depends(get_db)):
     """
     Idempotent sync: parse Classroom course titles into Subjects + Groups,
     link each group to its Classroom course, and import rosters.
     Useful for accounts created before auto-sync, or to pick up new courses.
+    Runs in the background: returns the queued job (or the one already
+    running for this teacher); poll GET /classroom/sync-jobs/{id} for progress.
     """
     teacher = crud_teacher.get_teacher(db)
     if not teacher or not teacher.google_credentials:
         raise HTTPException(status_code=401, detail="Google account not connected.")
-    try:
-        return sync_workspace_from_classroom(db, teacher)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Workspace sync failed: {e}")
\ No newline at end of file
+    job, _ = sync_jobs.start(db, teacher)
+    return job
+
+@router.get("/classroom/sync-jobs/latest", tags=["classroom"], response_model=sync_job_schema.SyncJob)
+def get_latest_sync_job(db: Session = Depends(get_db)):
+    teacher = crud_teacher.get_teacher(db)
+    job = None
+    if teacher:
+        job = (
+            db.query(models.SyncJob)
+            .filter(models.SyncJob.teacher_id == teacher.id)
+            .order_by(models.SyncJob.id.desc())
+            .first()
+        )
+    if job is None:
+        raise HTTPException(status_code=404, detail="No workspace sync has run yet.")
+    return job
+
+@router.get("/classroom/sync-jobs/{job_id}", tags=["classroom"], response_model=sync_job_schema.SyncJob)
+def get_sync_job(job_id: int, db: Session = Depends(get_db)):
+    job = db.get(models.SyncJob, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Sync job not found.")
+    return job
@@ -4,12 +4,12 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.responses import RedirectResponse
 from sqlalchemy.orm import Session
 from google_auth_oauthlib.flow import Flow
-from googleapiclient.discovery import build
 
 from ...database import SessionLocal
 from ...crud import crud_teacher
 from ...schemas import teacher as teacher_schema
-from ...services.classroom_sync import sync_workspace_from_classroom
+from ...services import google_clients
+from ...services.sync_jobs import sync_jobs
 
 router = APIRouter()
 
@@ -94,7 +94,7 @@ def auth_google_callback(
     credentials = flow.credentials
 
     try:
-        oauth2_service = build('oauth2', 'v2', credentials=credentials)
+        oauth2_service = google_clients.service('oauth2', 'v2', credentials)
         user_info = oauth2_service.userinfo().get().execute()
     except Exception as e:
         raise HTTPException(
@@ -128,12 +128,13 @@ def auth_google_callback(
     db.refresh(teacher)
 
     if is_new_signup:
+        # The workspace sync runs in the background; the frontend polls its progress.
         try:
-            sync_result = sync_workspace_from_classroom(db, teacher, credentials)
-            print(f"Classroom workspace sync completed: {sync_result}")
+            job, _ = sync_jobs.start(db, teacher)
+            return RedirectResponse(url=f"{FRONTEND_URL}/?google_setup=1&sync_job={job.id}")
         except Exception as sync_err:
             # Signup still succeeds; workspace can be synced later via API.
-            print(f"Classroom workspace sync failed: {sync_err}")
+            print(f"Could not start the Classroom workspace sync: {sync_err}")
         return RedirectResponse(url=f"{FRONTEND_URL}/?google_setup=1")
 
     return RedirectResponse(url=f"{FRONTEND_URL}/classroom")
@@ -1,11 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from googleapiclient.errors import HttpError
 
 from ...database import SessionLocal
 from ...models import models
-from .classroom import get_classroom_service 
+from ...crud import crud_grade
+from ...schemas import grade as grade_schema
+from ...services import classroom_grade_import
+from .classroom import get_classroom_credentials
 
 router = APIRouter()
 
@@ -17,75 +20,102 @@ def get_db():
         db.close()
 
 @router.get("/grades/topic/{topic_id}", response_model=Dict[str, Any])
-def get_grades_for_topic(
-    topic_id: int,
-    db: Session = Depends(get_db),
-    service=Depends(get_classroom_service)
-):
+def get_grades_for_topic(topic_id: int, group_id: Optional[int] = None, db: Session = Depends(get_db)):
+    """
+    Returns the topic's assignments and the stored grades of a group (default:
+    the subject's first group). Classroom grades are copied in by
+    POST /grades/classroom-import.
+    """
     db_topic = db.query(models.Topic).filter(models.Topic.id == topic_id).first()
     if not db_topic:
         raise HTTPException(status_code=404, detail="Topic not found")
 
-    if not db_topic.subject.groups:
-        raise HTTPException(status_code=404, detail="No group associated with this topic's subject")
-    db_group = db_topic.subject.groups[0]
+    db_group = crud_grade.get_group_for_topic(db, db_topic, group_id)
 
-    if not db_group.classroom_group or not db_group.classroom_group.classroom_course_id:
-        raise HTTPException(status_code=400, detail="The group for this topic is not linked to Google Classroom.")
-    
-    classroom_course_id = db_group.classroom_group.classroom_course_id
+    return crud_grade.get_grades_for_topic(db=db, topic_id=topic_id, group_id=db_group.id)
 
-    db_students = db.query(models.Student).filter(models.Student.group_id == db_group.id).all()
-    student_map = {student.classroom_user_id: student for student in db_students if student.classroom_user_id}
-    
-    if not student_map:
-        return {"assignments": [], "grades": {}} 
+@router.post("/grades/classroom-import", response_model=grade_schema.ClassroomGradeImport)
+def import_classroom_grades(
+    group_id: Optional[int] = None,
+    topic_id: Optional[int] = None,
+    full: bool = False,
+    db: Session = Depends(get_db),
+    credentials=Depends(get_classroom_credentials)
+):
+    """
+    Copies Classroom grades changed since the last import into the local grade
+    tables, for one group or every linked group, optionally one topic only.
+    """
+    try:
+        return classroom_grade_import.import_classroom_grades(
+            db, credentials, group_ids=[group_id] if group_id else None, topic_id=topic_id, full=full
+        )
+    except HttpError as error:
+        raise HTTPException(status_code=error.resp.status, detail=f"An error occurred with the Google Classroom API: {error}")
 
-    all_assignments = []
-    assignment_types = [
-        (models.NotebookAssignment, "Notebook"),
-        (models.PracticeAssignment, "Practices"),
-        (models.ExamAssignment, "Exam"),
-        (models.OtherAssignment, "Others")
-    ]
-    for model, category in assignment_types:
-        linked_assignments = db.query(model).filter(
-            model.topic_id == topic_id,
-            model.classroom_asg_id.isnot(None)
-        ).all()
-        for asg in linked_assignments:
-            all_assignments.append({"db_asg": asg, "category": category})
+@router.post("/grades/topic-grades/recompute", response_model=grade_schema.TopicGradeRecompute)
+def recompute_topic_grades(topic_id: Optional[int] = None, subject_id: Optional[int] = None, db: Session = Depends(get_db)):
+    """
+    Recomputes the stored topic grades of a topic, a subject, or the whole school.
+    """
+    return crud_grade.recompute_topic_grades(db=db, topic_id=topic_id, subject_id=subject_id)
 
-    if not all_assignments:
-        return {"assignments": [], "grades": {}} 
+@router.get("/grades/topic/{topic_id}/topic-grades", response_model=List[grade_schema.StudentTopicGrade])
+def read_topic_grades(topic_id: int, db: Session = Depends(get_db)):
+    """
+    Retrieves the stored weighted grade of every graded student in a topic.
+    """
+    return crud_grade.get_topic_grades(db=db, topic_id=topic_id)
 
-    grades_by_student_id = {student.id: {} for student in db_students}
+@router.post("/grades/final-grades/rollup", response_model=grade_schema.FinalGradeRollup)
+def rollup_final_grades(subject_id: Optional[int] = None, group_id: Optional[int] = None, db: Session = Depends(get_db)):
+    """
+    Recomputes period and final-year grades for a subject, a group, or the whole school.
+    """
+    return crud_grade.rollup_final_grades(db=db, subject_id=subject_id, group_id=group_id)
 
-    try:
-        for asg_info in all_assignments:
-            db_asg = asg_info['db_asg']
-            submissions_result = service.courses().courseWork().studentSubmissions().list(
-                courseId=classroom_course_id,
-                courseWorkId=db_asg.classroom_asg_id,
-                fields='studentSubmissions(userId,assignedGrade)'
-            ).execute()
+@router.get("/grades/subject/{subject_id}/final-grades", response_model=List[grade_schema.StudentFinalGrade])
+def read_final_grades(subject_id: int, group_id: Optional[int] = None, db: Session = Depends(get_db)):
+    """
+    Retrieves the stored period and final-year grades of a subject, optionally for one group.
+    """
+    return crud_grade.get_final_grades(db=db, subject_id=subject_id, group_id=group_id)
 
-            submissions = submissions_result.get('studentSubmissions', [])
+@router.put("/grades/topic/{topic_id}/matrix", response_model=grade_schema.GradeMatrixResult)
+def save_grade_matrix(topic_id: int, matrix: grade_schema.GradeMatrix, db: Session = Depends(get_db)):
+    """
+    Saves a whole gradebook screen (students x assignments of a topic) in one transaction.
+    """
+    return crud_grade.save_grade_matrix(db=db, topic_id=topic_id, matrix=matrix)
 
-            for sub in submissions:
-                classroom_user_id = sub.get('userId')
-                student_in_db = student_map.get(classroom_user_id)
-                
-                if student_in_db:
-                    grade = sub.get('assignedGrade', None)
-                    grades_by_student_id[student_in_db.id][db_asg.id] = grade
+@router.get("/grades/group/{group_id}/gradebook", response_model=grade_schema.Gradebook)
+def read_gradebook(group_id: int, topic_id: Optional[int] = None, period_id: Optional[int] = None, db: Session = Depends(get_db)):
+    """
+    Retrieves a group's gradebook for one topic or one period as columnar arrays.
+    """
+    return crud_grade.get_gradebook(db=db, group_id=group_id, topic_id=topic_id, period_id=period_id)
 
-    except HttpError as error:
-        raise HTTPException(status_code=error.resp.status, detail=f"An error occurred with the Google Classroom API: {error}")
-    
-    response_assignments = [
-        {"id": asg_info['db_asg'].id, "name": asg_info['db_asg'].name, "category": asg_info['category']}
-        for asg_info in all_assignments
-    ]
+@router.get("/grades/analytics", response_model=grade_schema.GradeAnalytics)
+def read_grade_analytics(
+    assignment_id: Optional[int] = None,
+    category: Optional[str] = None,
+    topic_id: Optional[int] = None,
+    period_id: Optional[int] = None,
+    subject_id: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Grade distribution (mean, median, spread, percentiles, histogram, failing
+    count) of an assignment, a topic or a subject's period, broken down by group.
+    """
+    return crud_grade.get_grade_analytics(
+        db=db, assignment_id=assignment_id, category=category,
+        topic_id=topic_id, period_id=period_id, subject_id=subject_id,
+    )
 
-    return {"assignments": response_assignments, "grades": grades_by_student_id}
\ No newline at end of file
+@router.post("/grades/transform", response_model=grade_schema.GradeTransformResult)
+def transform_grades(transform: grade_schema.GradeTransform, db: Session = Depends(get_db)):
+    """
+    Curves, caps, rescales or fills the missing grades of an assignment or a topic in one transaction.
+    """
+    return crud_grade.transform_grades(db=db, transform=transform)
@@ -0,0 +1,192 @@
+"""
+The four *Assignment tables as one category-tagged collection.
+
+CATEGORIES lists them in a fixed order (their index is the category code used
+by the grading engine and the grade tracker) with their grade table, the
+Topic weight column, the URL slug and the key used in AllAssignmentsResponse.
+Reads go through one UNION ALL query whatever the number of categories or
+topics; bulk writes issue one statement per category touched.
+"""
+from collections import defaultdict
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import Float, cast, insert, literal, select, union_all, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..models import models
+from ..schemas import assignment as assignment_schema
+
+
+class AssignmentCategory(NamedTuple):
+    key: str
+    slug: str
+    response_key: str
+    assignment_model: type
+    grade_model: type
+    weight_column: str
+
+
+CATEGORIES = (
+    AssignmentCategory('Notebook', 'notebook', 'notebook_assignments',
+                       models.NotebookAssignment, models.StudentNotebookGrade, 'notebook_weight'),
+    AssignmentCategory('Practices', 'practice', 'practice_assignments',
+                       models.PracticeAssignment, models.StudentPracticeGrade, 'practice_weight'),
+    AssignmentCategory('Exam', 'exam', 'exam_assignments',
+                       models.ExamAssignment, models.StudentExamGrade, 'exam_weight'),
+    AssignmentCategory('Others', 'other', 'other_assignments',
+                       models.OtherAssignment, models.StudentOtherGrade, 'other_weight'),
+)
+BY_KEY = {category.key: category for category in CATEGORIES}
+INDEX_BY_KEY = {category.key: index for index, category in enumerate(CATEGORIES)}
+
+# Postgres' name for the unique key on ExamAssignment.topic_id (one exam per topic).
+EXAM_TOPIC_CONSTRAINT = 'exam_assignments_topic_id_key'
+
+
+def get_category(key: str) -> AssignmentCategory:
+    category = BY_KEY.get(key)
+    if category is None:
+        raise HTTPException(status_code=400, detail=f"Unknown assignment category: {key}")
+    return category
+
+
+def _select(index: int, where):
+    category = CATEGORIES[index]
+    model = category.assignment_model
+    return select(
+        literal(index).label('category_index'),
+        literal(category.key).label('category'),
+        model.id,
+        model.name,
+        model.topic_id,
+        model.max_grade,
+        model.classroom_asg_id,
+    ).where(where(model))
+
+
+def assignments_query(topic_ids: Iterable[int]):
+    """(category_index, category, id, name, topic_id, max_grade, classroom_asg_id) of every category."""
+    topic_ids = list(topic_ids)
+    union = union_all(*(
+        _select(index, lambda model: model.topic_id.in_(topic_ids)) for index in range(len(CATEGORIES))
+    )).subquery()
+    return select(union).order_by(union.c.topic_id, union.c.category_index, union.c.id)
+
+
+def grades_query(topic_ids: Iterable[int], student_ids: Iterable[int]):
+    """(student_id, category_index, assignment_id, grade) over the four grade tables."""
+    topic_ids, student_ids = list(topic_ids), list(student_ids)
+    parts = []
+    for index, category in enumerate(CATEGORIES):
+        assignment, grade = category.assignment_model, category.grade_model
+        parts.append(
+            select(
+                grade.student_id,
+                literal(index).label('category_index'),
+                grade.assignment_id,
+                cast(grade.grade, Float).label('grade'),
+            )
+            .join(assignment, grade.assignment_id == assignment.id)
+            .where(assignment.topic_id.in_(topic_ids), grade.student_id.in_(student_ids))
+        )
+    return union_all(*parts)
+
+
+def get_assignments(db: Session, topic_ids: Iterable[int]):
+    """Every assignment of the topics, all categories, in one round trip."""
+    return db.execute(assignments_query(topic_ids)).all()
+
+
+def get_assignments_by_topic(db: Session, topic_id: int) -> Dict[str, list]:
+    """A topic's assignments grouped as in AllAssignmentsResponse."""
+    grouped = {category.response_key: [] for category in CATEGORIES}
+    for row in get_assignments(db, [topic_id]):
+        grouped[CATEGORIES[row.category_index].response_key].append(row)
+    return grouped
+
+
+def _load(db: Session, ids_by_category: Dict[str, List[int]]):
+    """The written rows, re-read in one query."""
+    parts = [
+        _select(INDEX_BY_KEY[key], lambda model, ids=ids: model.id.in_(ids))
+        for key, ids in ids_by_category.items()
+    ]
+    return db.execute(union_all(*parts)).all() if parts else []
+
+
+def bulk_create(db: Session, items: List[assignment_schema.AssignmentBulkCreate]):
+    """Creates assignments of any categories in one transaction, one INSERT per category and column set."""
+    rows = defaultdict(list)
+    for item in items:
+        values = item.model_dump(exclude={'category'}, exclude_none=True)
+        rows[get_category(item.category).key].append(values)
+
+    topic_ids = {item.topic_id for item in items}
+    found = {tid for (tid,) in db.query(models.Topic.id).filter(models.Topic.id.in_(topic_ids))}
+    if topic_ids - found:
+        raise HTTPException(status_code=404, detail=f"Topics not found: {sorted(topic_ids - found)}")
+
+    created = defaultdict(list)
+    try:
+        for key, values in rows.items():
+            model = BY_KEY[key].assignment_model
+            for group in _by_columns(values).values():
+                created[key] += db.execute(insert(model).returning(model.id), group).scalars().all()
+        db.commit()
+    except IntegrityError as error:
+        db.rollback()
+        if _violated_constraint(error) == EXAM_TOPIC_CONSTRAINT:
+            raise HTTPException(status_code=400, detail="A topic can only have one exam assignment.")
+        raise HTTPException(status_code=400, detail="The assignments conflict with existing data.")
+    return _load(db, created)
+
+
+def bulk_update(db: Session, items: List[assignment_schema.AssignmentBulkUpdate]):
+    """Updates assignments of any categories in one transaction, one executemany per category."""
+    from ..services.grade_tracker import grade_tracker
+
+    rows = defaultdict(list)
+    for item in items:
+        rows[get_category(item.category).key].append(item.model_dump(exclude={'category'}, exclude_unset=True))
+
+    regraded_topics = set()
+    for key, values in rows.items():
+        model = BY_KEY[key].assignment_model
+        ids = [value['id'] for value in values]
+        current = dict(db.query(model.id, model.topic_id).filter(model.id.in_(ids)).all())
+        missing = sorted(set(ids) - current.keys())
+        if missing:
+            raise HTTPException(status_code=404, detail=f"{key} assignments not found: {missing}")
+        for value in values:
+            if 'max_grade' in value or 'topic_id' in value:
+                regraded_topics.add(current[value['id']])
+                regraded_topics.add(value.get('topic_id', current[value['id']]))
+
+    try:
+        for key, values in rows.items():
+            model = BY_KEY[key].assignment_model
+            for columns, group in _by_columns(values).items():
+                if len(columns) > 1:
+                    db.execute(update(model), group)
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Invalid assignment update.")
+
+    grade_tracker.mark_topics(regraded_topics)
+    return _load(db, {key: [value['id'] for value in values] for key, values in rows.items()})
+
+
+def _violated_constraint(error: IntegrityError) -> Optional[str]:
+    diag = getattr(error.orig, 'diag', None)
+    return getattr(diag, 'constraint_name', None)
+
+
+def _by_columns(values: List[dict]) -> Dict[tuple, List[dict]]:
+    """executemany needs the same keys in every row."""
+    groups = defaultdict(list)
+    for value in values:
+        groups[tuple(sorted(value))].append(value)
+    return groups
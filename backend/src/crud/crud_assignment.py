@@ -2,6 +2,7 @@ from sqlalchemy.orm import Session
 from fastapi import HTTPException
 from ..models import models
 from ..schemas import assignment as assignment_schema
+from . import assignment_registry
 
 # Generic helper 
 
@@ -30,35 +31,32 @@ def delete_assignment(db: Session, model, assignment_id: int):
     return {"ok": True}
 
 
-# Creator Functions
-
-def create_notebook_assignment(db: Session, assignment: assignment_schema.NotebookAssignmentCreate):
-    db_assignment = models.NotebookAssignment(**assignment.model_dump())
+def create_assignment(db: Session, model, assignment: assignment_schema.AssignmentCreateBase):
+    """Creates an assignment record."""
+    db_assignment = model(**assignment.model_dump())
     db.add(db_assignment)
     db.commit()
     db.refresh(db_assignment)
     return db_assignment
 
+def get_assignments_for_topic(db: Session, topic_id: int):
+    """All four categories of a topic's assignments in one query."""
+    return assignment_registry.get_assignments_by_topic(db, topic_id)
+
+
+# Creator Functions
+
+def create_notebook_assignment(db: Session, assignment: assignment_schema.NotebookAssignmentCreate):
+    return create_assignment(db, models.NotebookAssignment, assignment)
+
 def create_practice_assignment(db: Session, assignment: assignment_schema.PracticeAssignmentCreate):
-    db_assignment = models.PracticeAssignment(**assignment.model_dump())
-    db.add(db_assignment)
-    db.commit()
-    db.refresh(db_assignment)
-    return db_assignment
+    return create_assignment(db, models.PracticeAssignment, assignment)
 
 def create_exam_assignment(db: Session, assignment: assignment_schema.ExamAssignmentCreate):
-    db_assignment = models.ExamAssignment(**assignment.model_dump())
-    db.add(db_assignment)
-    db.commit()
-    db.refresh(db_assignment)
-    return db_assignment
+    return create_assignment(db, models.ExamAssignment, assignment)
 
 def create_other_assignment(db: Session, assignment: assignment_schema.OtherAssignmentCreate):
-    db_assignment = models.OtherAssignment(**assignment.model_dump())
-    db.add(db_assignment)
-    db.commit()
-    db.refresh(db_assignment)
-    return db_assignment
+    return create_assignment(db, models.OtherAssignment, assignment)
 
 
 # CRUD Functions
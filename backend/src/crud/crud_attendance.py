@@ -1,101 +1,533 @@
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import desc, and_
+from sqlalchemy import desc, func, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
 from fastapi import HTTPException, status
-from datetime import date, datetime, timedelta
+from datetime import date, datetime, timedelta, timezone
 from ..models import models
+from . import crud_schedule
+from ..services.qr_index import qr_index, StudentRef
+from ..services.attendance_feed import attendance_feed
+from ..services.attendance_rollup import lock_attendance_keys, rollup_update_cte
+from ..services import absence_engine
+from ..services.attendance_partitions import attendance_partitions
+from ..schemas import attendance as attendance_schema
+from typing import Iterator, List, Optional
+import base64
+import numpy as np
+
+MEXICO_UTC_OFFSET = timedelta(hours=6)
 
 def get_mexico_time():
     utc_now = datetime.utcnow()
-    return utc_now - timedelta(hours=6)
+    return utc_now - MEXICO_UTC_OFFSET
+
+def classify_scan(db: Session, student_ref: StudentRef, scan_time_mx: datetime, strict_mode: bool, late_threshold: int) -> str:
+    """
+    Returns 'present' or 'late' for a scan at `scan_time_mx` (Mexico local time).
+    In strict mode, raises if no class is scheduled or it belongs to another group.
+    """
+    if not strict_mode:
+        return 'present'
+
+    active_slot = crud_schedule.get_active_schedule_slot(db, scan_time_mx)
+
+    if not active_slot:
+        raise HTTPException(status_code=403, detail="attendance_error_strict_no_class")
+
+    if student_ref.group_id != active_slot.group_id:
+        raise HTTPException(status_code=403, detail=f"attendance_error_strict_wrong_group||{active_slot.group_name}")
+
+    diff = scan_time_mx.hour * 60 + scan_time_mx.minute - active_slot.start_minute
+
+    return 'late' if diff > late_threshold else 'present'
+
+def _upsert_statement(rows: List[dict], only_if_newer: bool = False):
+    """
+    INSERT ... ON CONFLICT (student, period, attendance_date) DO UPDATE for
+    attendance rows, enforcing one record per student per period per day.
+    """
+    stmt = insert(models.AttendanceRecord).values(rows)
+    return stmt.on_conflict_do_update(
+        constraint='_student_period_date_uc',
+        set_={
+            'timestamp': stmt.excluded.timestamp,
+            'status': stmt.excluded.status,
+            'session_id': func.coalesce(stmt.excluded.session_id, models.AttendanceRecord.session_id),
+        },
+        where=(models.AttendanceRecord.timestamp <= stmt.excluded.timestamp) if only_if_newer else None
+    )
+
+def _session_id_for(db: Session, student_ref: StudentRef, scan_time_mx: datetime):
+    """Scalar subquery for the class session a scan belongs to, or None outside the group's classes."""
+    slot = crud_schedule.get_group_schedule_slot(db, student_ref.group_id, scan_time_mx)
+    if not slot:
+        return None
+    sessions = models.ClassSession
+    return select(sessions.id).where(
+        sessions.group_id == student_ref.group_id,
+        sessions.session_date == scan_time_mx.date(),
+        sessions.start_time == slot.start_time,
+    ).scalar_subquery()
+
+def _record_payload(row) -> dict:
+    """Shapes a flat record row into the nested AttendanceRecord response."""
+    return {
+        "id": row.id,
+        "timestamp": row.timestamp,
+        "status": row.status,
+        "student": {
+            "id": row.student_id,
+            "first_name": row.first_name,
+            "last_name": row.last_name,
+            "qr_code_id": row.qr_code_id,
+            "group": {
+                "id": row.group_id,
+                "grade": row.group_grade,
+                "name": row.group_name,
+                "subject": {"name": row.subject_name},
+            },
+        },
+        "period": {"name": row.period_name},
+    }
+
+def _select_with_relations(records, *extra_columns):
+    """Joins the relation columns the AttendanceRecord schema needs onto `records`."""
+    return select(
+        *extra_columns,
+        records.c.id,
+        records.c.timestamp,
+        records.c.status,
+        models.Student.id.label("student_id"),
+        models.Student.first_name,
+        models.Student.last_name,
+        models.Student.qr_code_id,
+        models.Group.id.label("group_id"),
+        models.Group.grade.label("group_grade"),
+        models.Group.name.label("group_name"),
+        models.Subject.name.label("subject_name"),
+        models.Period.name.label("period_name"),
+    ).select_from(
+        records
+        .join(models.Student, models.Student.id == records.c.student_id)
+        .join(models.Group, models.Group.id == models.Student.group_id)
+        .join(models.Subject, models.Subject.id == models.Group.subject_id)
+        .join(models.Period, models.Period.id == records.c.period_id)
+    )
+
+def _upsert_with_relations(rows: List[dict], only_if_newer: bool = False):
+    """
+    One statement that upserts `rows`, applies them to attendance_rollups and
+    returns every written record joined with the relations the response needs.
+    """
+    records = models.AttendanceRecord
+    record_key = tuple_(records.student_id, records.period_id, records.attendance_date)
+    prior = select(
+        records.student_id, records.period_id, records.attendance_date, records.status
+    ).where(
+        record_key.in_([(row['student_id'], row['period_id'], row['attendance_date']) for row in rows])
+    ).cte('prior')
+
+    upserted = _upsert_statement(rows, only_if_newer).returning(
+        records.id,
+        records.timestamp,
+        records.status,
+        records.student_id,
+        records.subject_id,
+        records.period_id,
+        records.attendance_date,
+    ).cte('upserted')
+
+    return _select_with_relations(
+        upserted, upserted.c.period_id, upserted.c.attendance_date
+    ).add_cte(rollup_update_cte(upserted, prior))
+
+def _write_attendance(db: Session, rows: List[dict], only_if_newer: bool = False):
+    """
+    Locks the rows' records, then runs _upsert_with_relations. Returns the
+    written rows and the keys that already had a record before the write.
+
+    The existing keys are read by their own statement once the locks are held:
+    under READ COMMITTED a snapshot taken earlier (or a CTE of the upsert) can
+    miss a record another scan committed while we waited.
+    """
+    keys = [(row['student_id'], row['period_id'], row['attendance_date']) for row in rows]
+    lock_attendance_keys(db, keys)
+    existing = set(
+        db.query(
+            models.AttendanceRecord.student_id,
+            models.AttendanceRecord.period_id,
+            models.AttendanceRecord.attendance_date,
+        ).filter(
+            tuple_(
+                models.AttendanceRecord.student_id,
+                models.AttendanceRecord.period_id,
+                models.AttendanceRecord.attendance_date
+            ).in_(keys)
+        ).all()
+    )
+    return db.execute(_upsert_with_relations(rows, only_if_newer)).all(), existing
+
+def _publish(day: date, payloads: List[dict]):
+    """Pushes committed records to live /attendance/stream subscribers."""
+    attendance_feed.publish(day, [
+        attendance_schema.AttendanceRecord.model_validate(payload).model_dump(mode='json', by_alias=True)
+        for payload in payloads
+    ])
 
 def create_attendance_record(db: Session, student_qr_id: str, period_id: int, strict_mode: bool = False, late_threshold: int = 5):
-    db_student = db.query(models.Student).filter(models.Student.qr_code_id == student_qr_id).first()
-    if not db_student:
+    student_ref = qr_index.resolve(db, student_qr_id)
+    if not student_ref:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="attendance_error_student_not_found")
 
-    subject_id = db_student.group.subject_id
-    attendance_status = 'present' 
-
-    if strict_mode:
-        now_mx = get_mexico_time()
-        current_day_english = now_mx.strftime('%A')
-        current_time_str = now_mx.strftime('%H:%M')
-
-        active_schedule = db.query(models.WeeklySchedule).filter(
-            models.WeeklySchedule.day_of_week == current_day_english,
-            models.WeeklySchedule.start_time <= current_time_str,
-            models.WeeklySchedule.end_time > current_time_str
-        ).first()
-
-        if not active_schedule:
-            raise HTTPException(status_code=403, detail="attendance_error_strict_no_class")
-
-        if db_student.group_id != active_schedule.group_id:
-            active_group = db.query(models.Group).filter(models.Group.id == active_schedule.group_id).first()
-            active_name = f"{active_group.grade}{active_group.name}"
-            raise HTTPException(status_code=403, detail=f"attendance_error_strict_wrong_group||{active_name}")
-
-        class_start = datetime.strptime(active_schedule.start_time, '%H:%M')
-        current_scan_time = datetime.strptime(current_time_str, '%H:%M')
-        
-        diff = (current_scan_time - class_start).total_seconds() / 60
-        
-        if diff > late_threshold:
-            attendance_status = 'late'
-
-    today = datetime.now().date()
-    start_of_day = datetime.combine(today, datetime.min.time())
-    end_of_day = datetime.combine(today, datetime.max.time())
-
-    existing_record = db.query(models.AttendanceRecord).filter(
-        and_(
-            models.AttendanceRecord.student_id == db_student.id,
-            models.AttendanceRecord.period_id == period_id,
-            models.AttendanceRecord.timestamp.between(start_of_day, end_of_day)
-        )
-    ).first()
+    now = datetime.utcnow()
+    now_mx = now - MEXICO_UTC_OFFSET
+    attendance_status = classify_scan(db, student_ref, now_mx, strict_mode, late_threshold)
+    attendance_partitions.ensure(db, [now_mx.date()])
 
-    if existing_record:
-        existing_record.timestamp = datetime.now()
-        existing_record.status = attendance_status 
-        db.commit()
-        db.refresh(existing_record)
-        return get_record_with_relations(db, existing_record.id)
-    else:
-        db_attendance = models.AttendanceRecord(
-            student_id=db_student.id,
-            subject_id=subject_id,
-            period_id=period_id,
-            status=attendance_status
-        )
-        db.add(db_attendance)
-        db.commit()
-        db.refresh(db_attendance)
-        return get_record_with_relations(db, db_attendance.id)
+    # One statement: upsert the day's record, update its rollup and return it with its relations.
+    written, _ = _write_attendance(db, [{
+        'student_id': student_ref.student_id,
+        'subject_id': student_ref.subject_id,
+        'period_id': period_id,
+        'timestamp': now,
+        'attendance_date': now_mx.date(),
+        'status': attendance_status,
+        'session_id': _session_id_for(db, student_ref, now_mx),
+    }])
+
+    row = written[0]
+    db.commit()
+    payload = _record_payload(row)
+    _publish(now_mx.date(), [payload])
+    return payload
+
+def _to_server_time(moment: datetime) -> datetime:
+    """Scanner timestamps are stored like `timestamp`: naive UTC."""
+    if moment.tzinfo is not None:
+        return moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+def create_attendance_records_batch(db: Session, scans: List[attendance_schema.AttendanceScan]):
+    """
+    Ingests scans replayed by an offline scanner in one pass and one transaction.
+
+    Students and periods are resolved with one query each and every accepted
+    scan is written by a single multi-row upsert. The once-per-day rule of
+    create_attendance_record applies per scan using its own `scanned_at`: the
+    latest scan of a student/period/day wins, and a replayed scan never
+    overwrites a more recent record.
+    """
+    results = [None] * len(scans)
+    student_refs = qr_index.resolve_many(db, {scan.student_qr_id for scan in scans})
+    known_periods = {
+        period_id for (period_id,) in
+        db.query(models.Period.id).filter(models.Period.id.in_({scan.period_id for scan in scans})).all()
+    }
+
+    latest_by_key = {}
+    for index, scan in enumerate(scans):
+        student_ref = student_refs.get(scan.student_qr_id)
+        if not student_ref:
+            results[index] = {"index": index, "outcome": "rejected", "detail": "attendance_error_student_not_found"}
+            continue
+        if scan.period_id not in known_periods:
+            results[index] = {"index": index, "outcome": "rejected", "detail": "attendance_error_period_not_found"}
+            continue
+
+        scanned_at = _to_server_time(scan.scanned_at)
+        scan_time_mx = scanned_at - MEXICO_UTC_OFFSET
+        try:
+            attendance_status = classify_scan(db, student_ref, scan_time_mx, scan.strict_mode, scan.late_threshold)
+        except HTTPException as error:
+            results[index] = {"index": index, "outcome": "rejected", "detail": error.detail}
+            continue
 
-def get_record_with_relations(db: Session, record_id: int):
-    return db.query(models.AttendanceRecord).options(
-        joinedload(models.AttendanceRecord.student)
-        .joinedload(models.Student.group)
-        .joinedload(models.Group.subject),
-        joinedload(models.AttendanceRecord.period) 
-    ).filter(models.AttendanceRecord.id == record_id).one()
+        key = (student_ref.student_id, scan.period_id, scan_time_mx.date())
+        previous = latest_by_key.get(key)
+        if previous and previous["timestamp"] > scanned_at:
+            results[index] = {"index": index, "outcome": "duplicate", "key": key}
+            continue
+        if previous:
+            results[previous["index"]] = {"index": previous["index"], "outcome": "duplicate", "key": key}
+        latest_by_key[key] = {
+            "index": index,
+            "student_id": student_ref.student_id,
+            "subject_id": student_ref.subject_id,
+            "period_id": scan.period_id,
+            "timestamp": scanned_at,
+            "attendance_date": key[2],
+            "status": attendance_status,
+            "session_id": _session_id_for(db, student_ref, scan_time_mx),
+        }
+
+    records_by_key = {}
+    written = []
+    if latest_by_key:
+        attendance_partitions.ensure(db, {key[2] for key in latest_by_key})
+        rows = [{k: v for k, v in scan.items() if k != "index"} for scan in latest_by_key.values()]
+        written, existing = _write_attendance(db, rows, only_if_newer=True)
+        for row in written:
+            key = (row.student_id, row.period_id, row.attendance_date)
+            records_by_key[key] = row
+            scan = latest_by_key[key]
+            results[scan["index"]] = {"index": scan["index"], "outcome": "updated" if key in existing else "created", "key": key}
+
+        # Keys whose stored record is newer than the replayed scan were left untouched.
+        untouched = [key for key in latest_by_key if key not in records_by_key]
+        if untouched:
+            for row in db.query(
+                models.AttendanceRecord.id,
+                models.AttendanceRecord.student_id,
+                models.AttendanceRecord.period_id,
+                models.AttendanceRecord.attendance_date,
+                models.AttendanceRecord.status,
+            ).filter(
+                tuple_(
+                    models.AttendanceRecord.student_id,
+                    models.AttendanceRecord.period_id,
+                    models.AttendanceRecord.attendance_date
+                ).in_(untouched)
+            ).all():
+                key = (row.student_id, row.period_id, row.attendance_date)
+                records_by_key[key] = row
+                scan = latest_by_key[key]
+                results[scan["index"]] = {"index": scan["index"], "outcome": "duplicate", "key": key}
+
+    db.commit()
+
+    written_by_day = {}
+    for row in written:
+        written_by_day.setdefault(row.attendance_date, []).append(_record_payload(row))
+    for day, payloads in written_by_day.items():
+        _publish(day, payloads)
+
+    for result in results:
+        key = result.pop("key", None)
+        if key is not None:
+            record = records_by_key[key]
+            result["record_id"] = record.id
+            result["status"] = record.status
+
+    return {
+        "created": sum(1 for r in results if r["outcome"] == "created"),
+        "updated": sum(1 for r in results if r["outcome"] == "updated"),
+        "duplicates": sum(1 for r in results if r["outcome"] == "duplicate"),
+        "rejected": sum(1 for r in results if r["outcome"] == "rejected"),
+        "results": results,
+    }
 
 def get_todays_attendance(db: Session):
-    today = date.today()
+    today = get_mexico_time().date()
     return get_attendance_by_date(db, today)
 
 def get_attendance_by_date(db: Session, query_date: date):
-    start_of_day = datetime.combine(query_date, datetime.min.time())
-    end_of_day = datetime.combine(query_date, datetime.max.time())
-    
+    """The day's scans, newest first. Absences stored by materialize_absences are not scans and are left out."""
     return db.query(models.AttendanceRecord)\
         .options(
             joinedload(models.AttendanceRecord.student)
             .joinedload(models.Student.group)
             .joinedload(models.Group.subject),
-            joinedload(models.AttendanceRecord.period) 
+            joinedload(models.AttendanceRecord.period)
+        )\
+        .filter(
+            models.AttendanceRecord.attendance_date == query_date,
+            models.AttendanceRecord.status != 'absent',
         )\
-        .filter(models.AttendanceRecord.timestamp.between(start_of_day, end_of_day))\
         .order_by(desc(models.AttendanceRecord.timestamp))\
-        .all()
\ No newline at end of file
+        .all()
+
+def encode_history_cursor(timestamp: datetime, record_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{timestamp.isoformat()}|{record_id}".encode()).decode()
+
+def decode_history_cursor(cursor: str):
+    try:
+        timestamp, record_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(timestamp), int(record_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid history cursor.")
+
+def _history_statement(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    group_id: Optional[int] = None,
+    subject_id: Optional[int] = None,
+    period_id: Optional[int] = None,
+    status: Optional[str] = None,
+):
+    """Filtered records with their relations, newest first by (timestamp, id)."""
+    records = models.AttendanceRecord.__table__
+    stmt = _select_with_relations(records)
+    if start_date:
+        stmt = stmt.where(records.c.attendance_date >= start_date)
+    if end_date:
+        stmt = stmt.where(records.c.attendance_date <= end_date)
+    if group_id:
+        stmt = stmt.where(models.Student.group_id == group_id)
+    if subject_id:
+        stmt = stmt.where(records.c.subject_id == subject_id)
+    if period_id:
+        stmt = stmt.where(records.c.period_id == period_id)
+    if status:
+        stmt = stmt.where(records.c.status == status)
+    return stmt.order_by(records.c.timestamp.desc(), records.c.id.desc())
+
+def get_attendance_history(db: Session, filters: dict, limit: int = 100, cursor: Optional[str] = None):
+    """
+    One page of attendance history using keyset pagination on (timestamp, id):
+    each page starts right after the cursor row, so deep pages cost the same
+    as the first one.
+    """
+    records = models.AttendanceRecord.__table__
+    stmt = _history_statement(**filters)
+    if cursor:
+        stmt = stmt.where(tuple_(records.c.timestamp, records.c.id) < tuple_(*decode_history_cursor(cursor)))
+
+    rows = db.execute(stmt.limit(limit + 1)).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_history_cursor(rows[-1].timestamp, rows[-1].id)
+    return {"items": [_record_payload(row) for row in rows], "next_cursor": next_cursor}
+
+def stream_attendance_history(db: Session, filters: dict, batch_size: int = 1000) -> Iterator[dict]:
+    """
+    Yields every matching record, reading rows through a server-side cursor
+    `batch_size` at a time so exports never hold the full result in memory.
+    """
+    result = db.execute(_history_statement(**filters).execution_options(yield_per=batch_size))
+    for row in result:
+        yield _record_payload(row)
+
+def get_attendance_summary(db: Session, subject_id: Optional[int] = None, period_id: Optional[int] = None, group_id: Optional[int] = None):
+    """Per-student present/late counts read from attendance_rollups."""
+    rollup = models.AttendanceRollup
+    query = db.query(
+        rollup.student_id,
+        models.Student.first_name,
+        models.Student.last_name,
+        models.Student.group_id,
+        rollup.subject_id,
+        rollup.period_id,
+        rollup.present_count,
+        rollup.late_count,
+        rollup.last_seen_at,
+    ).join(models.Student, models.Student.id == rollup.student_id)
+    if subject_id:
+        query = query.filter(rollup.subject_id == subject_id)
+    if period_id:
+        query = query.filter(rollup.period_id == period_id)
+    if group_id:
+        query = query.filter(models.Student.group_id == group_id)
+    return query.order_by(models.Student.last_name, models.Student.first_name).all()
+
+def _absence_range_end(start_date: date, end_date: date, last_day: date) -> date:
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date must not be after end_date.")
+    return min(end_date, last_day)
+
+def get_absence_report(db: Session, start_date: date, end_date: date, group_id: Optional[int] = None, subject_id: Optional[int] = None):
+    """
+    Per-student expected meetings and inferred absences between two dates
+    (up to today), ordered by student name.
+    """
+    end_date = _absence_range_end(start_date, end_date, get_mexico_time().date())
+    result = absence_engine.infer_absences(db, start_date, end_date, group_id=group_id, subject_id=subject_id)
+
+    expected_ids, expected_counts = np.unique(result.expected.student_ids, return_counts=True)
+    absences = result.absences
+    order = np.lexsort((absences.days, absences.student_ids))
+    absent_ids, first_index = np.unique(absences.student_ids[order], return_index=True)
+    absent_days = dict(zip(absent_ids.tolist(), np.split(absences.days[order], first_index[1:])))
+
+    students = db.query(
+        models.Student.id, models.Student.first_name, models.Student.last_name, models.Student.group_id
+    ).filter(models.Student.id.in_(expected_ids.tolist())).all()
+    by_id = {student.id: student for student in students}
+
+    entries = []
+    for student_id, expected_count in zip(expected_ids.tolist(), expected_counts.tolist()):
+        student = by_id[student_id]
+        days = absent_days.get(student_id)
+        entries.append({
+            "student_id": student_id,
+            "first_name": student.first_name,
+            "last_name": student.last_name,
+            "group_id": student.group_id,
+            "expected_count": expected_count,
+            "absence_count": len(days) if days is not None else 0,
+            "absence_dates": days.tolist() if days is not None else [],
+        })
+    entries.sort(key=lambda entry: (entry["last_name"], entry["first_name"]))
+
+    return {
+        "start_date": start_date,
+        "end_date": end_date,
+        "expected_count": len(result.expected),
+        "absence_count": len(absences),
+        "students": entries,
+    }
+
+def materialize_absences(
+    db: Session,
+    start_date: date,
+    end_date: date,
+    group_id: Optional[int] = None,
+    subject_id: Optional[int] = None,
+    chunk_size: int = 5000,
+):
+    """
+    Stores inferred absences as 'absent' records for days that are over
+    (up to yesterday). Existing records are left untouched, so re-running is
+    safe and a later scan still turns the record into a presence. Absent
+    records do not count towards the attendance rollups and are left out of
+    the day listings (and so the live feed snapshot), where their midnight
+    timestamp would read as a scan.
+    """
+    end_date = _absence_range_end(start_date, end_date, get_mexico_time().date() - timedelta(days=1))
+    if start_date <= end_date:
+        attendance_partitions.ensure_range(db, start_date, end_date)
+    absences = absence_engine.infer_absences(db, start_date, end_date, group_id=group_id, subject_id=subject_id).absences
+
+    inserted = 0
+    if len(absences):
+        group_ids, group_index = np.unique(absences.group_ids, return_inverse=True)
+        subject_by_group = dict(
+            db.query(models.Group.id, models.Group.subject_id).filter(models.Group.id.in_(group_ids.tolist())).all()
+        )
+        subject_ids = np.array([subject_by_group[gid] for gid in group_ids.tolist()], dtype=np.int64)[group_index]
+        # Local midnight of the absent day, stored in server (UTC) time.
+        timestamps = (absences.days + np.timedelta64(int(MEXICO_UTC_OFFSET.total_seconds()), 's')).astype('datetime64[us]')
+
+        rows = [
+            {
+                "student_id": student_id,
+                "subject_id": subject,
+                "period_id": period_id,
+                "attendance_date": day,
+                "timestamp": timestamp,
+                "status": "absent",
+            }
+            for student_id, subject, period_id, day, timestamp in zip(
+                absences.student_ids.tolist(),
+                subject_ids.tolist(),
+                absences.period_ids.tolist(),
+                absences.days.tolist(),
+                timestamps.tolist(),
+            )
+        ]
+        for offset in range(0, len(rows), chunk_size):
+            stmt = (
+                insert(models.AttendanceRecord)
+                .values(rows[offset:offset + chunk_size])
+                .on_conflict_do_nothing(constraint='_student_period_date_uc')
+                .returning(models.AttendanceRecord.id)
+            )
+            inserted += len(db.execute(stmt).all())
+        db.commit()
+
+    return {
+        "start_date": start_date,
+        "end_date": end_date,
+        "absence_count": len(absences),
+        "inserted": inserted,
+    }
@@ -0,0 +1,174 @@
+from datetime import date
+from typing import Optional
+from sqlalchemy.orm import Session
+from sqlalchemy import distinct, func, select
+from fastapi import HTTPException
+from ..models import models
+from ..services import class_sessions
+from . import crud_attendance
+
+COUNTED_STATUSES = ('present', 'late')
+
+def sync_class_sessions(db: Session, since: Optional[date] = None, backfill: bool = False):
+    """
+    Regenerates class sessions from `since` (default: today) onwards. With
+    `backfill`, an empty table is filled for the whole Period calendar and
+    existing attendance records are linked to their sessions.
+    """
+    backfilling = backfill and db.query(models.ClassSession.id).first() is None
+    if backfilling:
+        since = db.query(func.min(models.Period.start_date)).scalar()
+        if since is None:
+            return 0
+    elif since is None:
+        since = crud_attendance.get_mexico_time().date()
+
+    count = class_sessions.sync_class_sessions(db, since)
+    if backfilling:
+        class_sessions.link_attendance_records(db)
+    db.commit()
+    return count
+
+def _attendance_counts(start_date: date, end_date: date, group_id: Optional[int] = None):
+    """
+    present/late counts of the sessions between the dates. A record is linked
+    to a session of its own day, so the attendance_date bounds are exact and
+    let Postgres skip the partitions outside the range.
+    """
+    records = models.AttendanceRecord
+    sessions_in_range = select(models.ClassSession.id).where(
+        models.ClassSession.session_date.between(start_date, end_date)
+    )
+    if group_id:
+        sessions_in_range = sessions_in_range.where(models.ClassSession.group_id == group_id)
+    return (
+        select(
+            records.session_id,
+            func.count().filter(records.status == 'present').label('present_count'),
+            func.count().filter(records.status == 'late').label('late_count'),
+        )
+        .where(
+            records.attendance_date.between(start_date, end_date),
+            records.session_id.in_(sessions_in_range),
+        )
+        .group_by(records.session_id)
+        .subquery()
+    )
+
+def _roster_sizes():
+    students = models.Student
+    return (
+        select(students.group_id, func.count(students.id).label('student_count'))
+        .where(students.status == 'active')
+        .group_by(students.group_id)
+        .subquery()
+    )
+
+def get_class_sessions(db: Session, start_date: date, end_date: date, group_id: Optional[int] = None):
+    sessions = models.ClassSession
+    counts = _attendance_counts(start_date, end_date, group_id)
+    roster = _roster_sizes()
+    query = (
+        db.query(
+            sessions.id,
+            sessions.group_id,
+            sessions.period_id,
+            sessions.session_date,
+            sessions.start_time,
+            sessions.end_time,
+            func.coalesce(counts.c.present_count, 0).label('present_count'),
+            func.coalesce(counts.c.late_count, 0).label('late_count'),
+            func.coalesce(roster.c.student_count, 0).label('student_count'),
+        )
+        .outerjoin(counts, counts.c.session_id == sessions.id)
+        .outerjoin(roster, roster.c.group_id == sessions.group_id)
+        .filter(sessions.session_date.between(start_date, end_date))
+    )
+    if group_id:
+        query = query.filter(sessions.group_id == group_id)
+    return query.order_by(sessions.session_date, sessions.start_time).all()
+
+def get_roll_call(db: Session, session_id: int):
+    """Every active student of the session's group with their record in it, if any."""
+    session = db.query(models.ClassSession).filter(models.ClassSession.id == session_id).first()
+    if not session:
+        raise HTTPException(status_code=404, detail="Class session not found")
+
+    records = models.AttendanceRecord
+    students = (
+        db.query(
+            models.Student.id.label('student_id'),
+            models.Student.first_name,
+            models.Student.last_name,
+            records.id.label('record_id'),
+            records.status,
+            records.timestamp,
+        )
+        .outerjoin(records, (records.student_id == models.Student.id) & (records.session_id == session.id))
+        .filter(models.Student.group_id == session.group_id, models.Student.status == 'active')
+        .order_by(models.Student.last_name, models.Student.first_name)
+        .all()
+    )
+    return {
+        "id": session.id,
+        "group_id": session.group_id,
+        "period_id": session.period_id,
+        "session_date": session.session_date,
+        "start_time": session.start_time,
+        "end_time": session.end_time,
+        "students": students,
+    }
+
+def get_attendance_rates(db: Session, start_date: date, end_date: date, subject_id: Optional[int] = None):
+    """
+    Attendance rate per group: present/late records over students times
+    meeting days (a student has one record per day, however many classes).
+    """
+    sessions = models.ClassSession
+    records = models.AttendanceRecord
+    in_range = sessions.session_date.between(start_date, end_date)
+    held = (
+        select(
+            sessions.group_id,
+            func.count(sessions.id).label('session_count'),
+            func.count(distinct(sessions.session_date)).label('meeting_days'),
+        )
+        .where(in_range)
+        .group_by(sessions.group_id)
+        .subquery()
+    )
+    attended = (
+        select(sessions.group_id, func.count(records.id).label('attended_count'))
+        .join(records, records.session_id == sessions.id)
+        .where(in_range, records.status.in_(COUNTED_STATUSES))
+        .group_by(sessions.group_id)
+        .subquery()
+    )
+    roster = _roster_sizes()
+
+    query = (
+        db.query(
+            models.Group.id.label('group_id'),
+            models.Group.grade,
+            models.Group.name,
+            held.c.session_count,
+            held.c.meeting_days,
+            func.coalesce(roster.c.student_count, 0).label('student_count'),
+            func.coalesce(attended.c.attended_count, 0).label('attended_count'),
+        )
+        .join(held, held.c.group_id == models.Group.id)
+        .outerjoin(attended, attended.c.group_id == models.Group.id)
+        .outerjoin(roster, roster.c.group_id == models.Group.id)
+    )
+    if subject_id:
+        query = query.filter(models.Group.subject_id == subject_id)
+
+    rates = []
+    for row in query.order_by(models.Group.grade, models.Group.name).all():
+        expected = row.meeting_days * row.student_count
+        rates.append({
+            **row._asdict(),
+            "expected_count": expected,
+            "attendance_rate": row.attended_count / expected if expected else None,
+        })
+    return rates
@@ -0,0 +1,341 @@
+import base64
+from typing import List, Optional, Tuple
+import numpy as np
+from sqlalchemy.orm import Session
+from sqlalchemy import Float, cast, func, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from fastapi import HTTPException
+from ..models import models
+from ..schemas import grade as grade_schema
+from ..services import grade_analytics, grade_rollup, grade_transforms, grading_engine
+from ..services.grade_tracker import grade_tracker
+from . import assignment_registry
+
+def recompute_topic_grades(db: Session, topic_id: Optional[int] = None, subject_id: Optional[int] = None):
+    """
+    Recomputes StudentTopicGrade for one topic, every topic of a subject, or
+    (with neither) the whole school.
+    """
+    topic_ids = None
+    if topic_id:
+        if not db.query(models.Topic.id).filter(models.Topic.id == topic_id).first():
+            raise HTTPException(status_code=404, detail="Topic not found")
+        topic_ids = [topic_id]
+    elif subject_id:
+        topic_ids = [tid for (tid,) in db.query(models.Topic.id).filter(models.Topic.subject_id == subject_id).all()]
+
+    written = grading_engine.recompute_topic_grades(db, topic_ids=topic_ids)
+    if topic_ids is None:
+        grade_rollup.rollup_final_grades(db)
+    elif topic_ids:
+        subject_ids = {sid for (sid,) in db.query(models.Topic.subject_id).filter(models.Topic.id.in_(topic_ids)).distinct()}
+        grade_rollup.rollup_final_grades(db, subject_ids=subject_ids)
+    db.commit()
+    grade_tracker.invalidate()
+    return {
+        "topic_count": len(topic_ids) if topic_ids is not None else None,
+        "grades_written": written,
+    }
+
+def get_topic_grades(db: Session, topic_id: int):
+    return db.query(models.StudentTopicGrade)\
+        .filter(models.StudentTopicGrade.topic_id == topic_id)\
+        .all()
+
+def rollup_final_grades(db: Session, subject_id: Optional[int] = None, group_id: Optional[int] = None):
+    """
+    Recomputes the period and final-year grades of one subject, one group,
+    or (with neither) the whole school from the stored topic grades.
+    """
+    if subject_id and not db.query(models.Subject.id).filter(models.Subject.id == subject_id).first():
+        raise HTTPException(status_code=404, detail="Subject not found")
+    if group_id and not db.query(models.Group.id).filter(models.Group.id == group_id).first():
+        raise HTTPException(status_code=404, detail="Group not found")
+
+    written = grade_rollup.rollup_final_grades(
+        db,
+        subject_ids=[subject_id] if subject_id else None,
+        group_ids=[group_id] if group_id else None,
+    )
+    db.commit()
+    grade_tracker.invalidate()
+    return {"grades_written": written}
+
+def get_final_grades(db: Session, subject_id: int, group_id: Optional[int] = None):
+    query = db.query(models.StudentFinalGrade).filter(models.StudentFinalGrade.subject_id == subject_id)
+    if group_id:
+        query = query.join(models.Student).filter(models.Student.group_id == group_id)
+    return query.all()
+
+def _grade_unique_constraint(grade_model):
+    return next(c.name for c in grade_model.__table__.constraints if c.name and c.name.startswith('_student_'))
+
+def upsert_grades(db: Session, grade_model, rows: List[dict]) -> int:
+    """One upsert of {student_id, assignment_id, grade} rows; returns the rows inserted or changed. Does not commit."""
+    if not rows:
+        return 0
+    stmt = insert(grade_model).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        constraint=_grade_unique_constraint(grade_model),
+        set_={"grade": stmt.excluded.grade, "updated_at": func.now()},
+        where=grade_model.grade.is_distinct_from(stmt.excluded.grade),
+    )
+    return db.execute(stmt).rowcount
+
+def delete_grades(db: Session, grade_model, pairs: List[Tuple[int, int]]) -> int:
+    """Deletes the grades of (student_id, assignment_id) pairs. Does not commit."""
+    if not pairs:
+        return 0
+    return db.query(grade_model)\
+        .filter(tuple_(grade_model.student_id, grade_model.assignment_id).in_(pairs))\
+        .delete(synchronize_session=False)
+
+def save_grade_matrix(db: Session, topic_id: int, matrix: grade_schema.GradeMatrix):
+    """
+    Writes a students x assignments grade matrix for one topic: one upsert and
+    one delete (for null cells) per grade table, in a single transaction.
+    """
+    topic = db.query(models.Topic).filter(models.Topic.id == topic_id).first()
+    if not topic:
+        raise HTTPException(status_code=404, detail="Topic not found")
+
+    if len(matrix.grades) != len(matrix.student_ids) or any(len(row) != len(matrix.assignments) for row in matrix.grades):
+        raise HTTPException(status_code=400, detail="The grade matrix must have one row per student and one column per assignment.")
+    columns = [(column.category, column.id) for column in matrix.assignments]
+    if len(set(matrix.student_ids)) != len(matrix.student_ids) or len(set(columns)) != len(columns):
+        raise HTTPException(status_code=400, detail="Students and assignments must not repeat in the grade matrix.")
+    unknown_categories = {category for category, _ in columns} - assignment_registry.BY_KEY.keys()
+    if unknown_categories:
+        raise HTTPException(status_code=400, detail=f"Unknown assignment categories: {sorted(unknown_categories)}")
+
+    enrolled = {
+        student_id for (student_id,) in db.query(models.Student.id)
+        .join(models.Group)
+        .filter(models.Group.subject_id == topic.subject_id, models.Student.id.in_(matrix.student_ids))
+    }
+    strangers = [student_id for student_id in matrix.student_ids if student_id not in enrolled]
+    if strangers:
+        raise HTTPException(status_code=400, detail=f"Students not enrolled in this topic's subject: {strangers}")
+
+    max_grades = {}
+    for key, category in assignment_registry.BY_KEY.items():
+        ids = [assignment_id for column_category, assignment_id in columns if column_category == key]
+        if ids:
+            model = category.assignment_model
+            for assignment_id, max_grade in db.query(model.id, model.max_grade).filter(model.id.in_(ids), model.topic_id == topic_id):
+                max_grades[(key, assignment_id)] = float(max_grade)
+    missing = [f"{key} {assignment_id}" for key, assignment_id in columns if (key, assignment_id) not in max_grades]
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Assignments not found in this topic: {missing}")
+
+    upserts = {key: [] for key in assignment_registry.BY_KEY}
+    deletes = {key: [] for key in assignment_registry.BY_KEY}
+    out_of_range = []
+    for student_id, row in zip(matrix.student_ids, matrix.grades):
+        for (key, assignment_id), grade in zip(columns, row):
+            if grade is None:
+                deletes[key].append((student_id, assignment_id))
+            elif not 0 <= grade <= max_grades[(key, assignment_id)]:
+                out_of_range.append(f"student {student_id}, {key} {assignment_id}: {grade}")
+            else:
+                upserts[key].append({"student_id": student_id, "assignment_id": assignment_id, "grade": grade})
+    if out_of_range:
+        raise HTTPException(status_code=400, detail=f"Grades must be between 0 and the assignment's max grade: {out_of_range[:10]}")
+
+    written = deleted = 0
+    for key, category in assignment_registry.BY_KEY.items():
+        written += upsert_grades(db, category.grade_model, upserts[key])
+        deleted += delete_grades(db, category.grade_model, deletes[key])
+    db.commit()
+
+    for key, assignment_id in columns:
+        grade_tracker.mark_grades(assignment_registry.BY_KEY[key].grade_model, assignment_id, matrix.student_ids)
+    return {"grades_written": written, "grades_deleted": deleted}
+
+def get_grades_for_topic(db: Session, topic_id: int, group_id: int):
+    """
+    Every assignment of a topic and the group's stored grades, as
+    {student_id: {category: {assignment_id: grade}}}: assignment ids are only
+    unique within a category, so cells are keyed by both, as in the gradebook.
+    """
+    student_ids = [sid for (sid,) in db.query(models.Student.id).filter(models.Student.group_id == group_id)]
+    assignments = [
+        {"id": row.id, "name": row.name, "category": row.category}
+        for row in assignment_registry.get_assignments(db, [topic_id])
+    ]
+    grades_by_student_id = {student_id: {} for student_id in student_ids}
+    if student_ids and assignments:
+        for student_id, category_index, assignment_id, grade in db.execute(assignment_registry.grades_query([topic_id], student_ids)):
+            category = assignment_registry.CATEGORIES[category_index].key
+            grades_by_student_id[student_id].setdefault(category, {})[assignment_id] = grade
+    return {"assignments": assignments, "grades": grades_by_student_id}
+
+def get_group_for_topic(db: Session, topic: models.Topic, group_id: Optional[int] = None):
+    """The requested group of the topic's subject, or its first group."""
+    if group_id is None:
+        if not topic.subject.groups:
+            raise HTTPException(status_code=404, detail="No group associated with this topic's subject")
+        return topic.subject.groups[0]
+    group = db.query(models.Group).filter(models.Group.id == group_id).first()
+    if not group or group.subject_id != topic.subject_id:
+        raise HTTPException(status_code=404, detail="Group not found for this topic's subject")
+    return group
+
+def get_gradebook(db: Session, group_id: int, topic_id: Optional[int] = None, period_id: Optional[int] = None):
+    """
+    A group's gradebook for one topic or one period in columnar form: student
+    ids, assignment columns and a row-major grade matrix whose missing cells
+    are 0 and flagged in a packbits/base64 null mask.
+    """
+    group = db.query(models.Group).filter(models.Group.id == group_id).first()
+    if not group:
+        raise HTTPException(status_code=404, detail="Group not found")
+    if (topic_id is None) == (period_id is None):
+        raise HTTPException(status_code=400, detail="Pass exactly one of topic_id or period_id.")
+
+    topics = db.query(models.Topic.id).filter(models.Topic.subject_id == group.subject_id)
+    topics = topics.filter(models.Topic.id == topic_id) if topic_id else topics.filter(models.Topic.period_id == period_id)
+    topic_ids = [tid for (tid,) in topics]
+
+    student_ids = [sid for (sid,) in db.query(models.Student.id)
+                   .filter(models.Student.group_id == group_id)
+                   .order_by(models.Student.last_name, models.Student.first_name)]
+
+    assignments, column_keys = [], []
+    for row in assignment_registry.get_assignments(db, topic_ids):
+        assignments.append({
+            "id": row.id, "category": row.category, "name": row.name,
+            "topic_id": row.topic_id, "max_grade": float(row.max_grade),
+        })
+        column_keys.append((row.category_index << 32) | row.id)
+
+    rows = []
+    if student_ids and assignments:
+        rows = db.execute(assignment_registry.grades_query(topic_ids, student_ids)).all()
+
+    matrix = np.zeros((len(student_ids), len(assignments)), dtype=np.float64)
+    missing = np.ones(matrix.shape, dtype=bool)
+    if rows:
+        students, categories, assignment_ids, grades = (np.array(column) for column in zip(*rows))
+        student_order = np.argsort(student_ids)
+        sorted_students = np.asarray(student_ids, dtype=np.int64)[student_order]
+        row_index = student_order[np.searchsorted(sorted_students, students.astype(np.int64))]
+
+        column_keys = np.array(column_keys, dtype=np.int64)
+        column_order = np.argsort(column_keys)
+        keys = (categories.astype(np.int64) << 32) | assignment_ids.astype(np.int64)
+        column_index = column_order[np.searchsorted(column_keys[column_order], keys)]
+
+        matrix[row_index, column_index] = grades.astype(np.float64)
+        missing[row_index, column_index] = False
+
+    return {
+        "group_id": group_id,
+        "student_ids": student_ids,
+        "assignments": assignments,
+        "grades": np.round(matrix, 2).ravel().tolist(),
+        "null_mask": base64.b64encode(np.packbits(missing.ravel()).tobytes()).decode('ascii'),
+    }
+
+def _period_slot(db: Session, period_id: int) -> int:
+    """1-3, the position of the period by start date (see grade_rollup)."""
+    period_ids = [pid for (pid,) in db.query(models.Period.id).order_by(models.Period.start_date, models.Period.id)]
+    if period_id not in period_ids:
+        raise HTTPException(status_code=404, detail="Period not found")
+    slot = period_ids.index(period_id) + 1
+    if slot > 3:
+        raise HTTPException(status_code=400, detail="Final grades only hold the first three periods.")
+    return slot
+
+def get_grade_analytics(
+    db: Session,
+    assignment_id: Optional[int] = None,
+    category: Optional[str] = None,
+    topic_id: Optional[int] = None,
+    period_id: Optional[int] = None,
+    subject_id: Optional[int] = None,
+):
+    """
+    Grade distribution of one assignment (its grades), one topic (its topic
+    grades) or one period of a subject (its final-grade period column),
+    overall and per group.
+    """
+    student = models.Student
+    if assignment_id is not None:
+        if category is None:
+            raise HTTPException(status_code=400, detail="category is required with assignment_id.")
+        registry_category = assignment_registry.get_category(category)
+        assignment_model, grade_model = registry_category.assignment_model, registry_category.grade_model
+        max_grade = db.query(assignment_model.max_grade).filter(assignment_model.id == assignment_id).scalar()
+        if max_grade is None:
+            raise HTTPException(status_code=404, detail="Assignment not found")
+        scope = ('assignment', registry_category.key, assignment_id)
+        scale = float(max_grade)
+        query = select(student.group_id, cast(grade_model.grade, Float))\
+            .join(student, student.id == grade_model.student_id)\
+            .where(grade_model.assignment_id == assignment_id)
+    elif topic_id is not None:
+        if not db.query(models.Topic.id).filter(models.Topic.id == topic_id).first():
+            raise HTTPException(status_code=404, detail="Topic not found")
+        scope = ('topic', topic_id)
+        scale = 10.0
+        topic_grade = models.StudentTopicGrade
+        query = select(student.group_id, cast(topic_grade.calculated_grade, Float))\
+            .join(student, student.id == topic_grade.student_id)\
+            .where(topic_grade.topic_id == topic_id)
+    elif period_id is not None and subject_id is not None:
+        column = getattr(models.StudentFinalGrade, f"period_{_period_slot(db, period_id)}_grade")
+        scope = ('period', period_id, subject_id)
+        scale = 10.0
+        final_grade = models.StudentFinalGrade
+        query = select(student.group_id, cast(column, Float))\
+            .join(student, student.id == final_grade.student_id)\
+            .where(final_grade.subject_id == subject_id, column.isnot(None))
+    else:
+        raise HTTPException(status_code=400, detail="Pass assignment_id and category, topic_id, or period_id and subject_id.")
+
+    def compute():
+        rows = db.execute(query).all()
+        group_ids, grades = (np.array(column) for column in zip(*rows)) if rows else (np.empty(0), np.empty(0))
+        return {"scope": scope[0], **grade_analytics.summarize(group_ids, grades, scale)}
+
+    return grade_analytics.analytics_cache.get_or_compute((scope, scale, grade_tracker.data_version), compute)
+
+def transform_grades(db: Session, transform: grade_schema.GradeTransform):
+    """
+    Applies a curve, cap, rescale or fill-missing operation to an assignment's
+    or a topic's grades in one transaction, with 0-10 summary statistics of
+    the scope before and after.
+    """
+    category = None
+    if transform.assignment_id is not None:
+        if not transform.category:
+            raise HTTPException(status_code=400, detail="category is required with assignment_id.")
+        category = assignment_registry.get_category(transform.category)
+        model = category.assignment_model
+        if not db.query(model.id).filter(model.id == transform.assignment_id).first():
+            raise HTTPException(status_code=404, detail="Assignment not found")
+    elif transform.topic_id is not None:
+        if not db.query(models.Topic.id).filter(models.Topic.id == transform.topic_id).first():
+            raise HTTPException(status_code=404, detail="Topic not found")
+    else:
+        raise HTTPException(status_code=400, detail="Pass assignment_id and category, or topic_id.")
+
+    targets = grade_transforms.scopes(category, transform.assignment_id, transform.topic_id)
+    before = grade_transforms.normalized_grades(db, targets)
+    affected, changed = grade_transforms.apply(
+        db, targets, transform.operation,
+        slope=transform.slope, offset=transform.offset,
+        value=transform.value, new_max_grade=transform.new_max_grade,
+    )
+    after = grade_transforms.normalized_grades(db, targets)
+    db.commit()
+
+    for (grade_model, assignment_id), student_ids in changed.items():
+        grade_tracker.mark_grades(grade_model, assignment_id, student_ids)
+    return {
+        "operation": transform.operation,
+        "grades_affected": affected,
+        "before": grade_analytics.summarize(np.zeros(len(before)), before, 10.0)["overall"],
+        "after": grade_analytics.summarize(np.zeros(len(after)), after, 10.0)["overall"],
+    }
@@ -2,6 +2,8 @@ from sqlalchemy.orm import Session, joinedload
 from fastapi import HTTPException
 from ..models import models
 from ..schemas import group as group_schema
+from ..services.qr_index import qr_index
+from ..services.schedule_index import schedule_index
 
 def create_group(db: Session, group: group_schema.GroupCreate):
     existing_color = db.query(models.Group).filter(models.Group.color == group.color).first()
@@ -71,4 +73,6 @@ def delete_group(db: Session, group_id: int):
         raise HTTPException(status_code=404, detail="Group not found")
     db.delete(db_group)
     db.commit()
+    qr_index.discard_group(group_id)
+    schedule_index.invalidate()
     return db_group
\ No newline at end of file
@@ -1,8 +1,12 @@
-from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Optional
+from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import and_
 from ..models import models
 from ..schemas import schedule as schedule_schema
+from ..services.schedule_index import schedule_index, ScheduleSlot
 from fastapi import HTTPException
+from . import crud_class_session
 
 def create_or_update_schedule_entry(db: Session, schedule_entry: schedule_schema.ScheduleCreate):
     db_existing_entry = db.query(models.WeeklySchedule).filter(
@@ -16,16 +20,18 @@ def create_or_update_schedule_entry(db: Session, schedule_entry: schedule_schema
         db_existing_entry.group_id = schedule_entry.group_id
         db.commit()
         db.refresh(db_existing_entry)
+        _schedule_changed(db)
         return db_existing_entry
     else:
         db_schedule_entry = models.WeeklySchedule(**schedule_entry.model_dump())
         db.add(db_schedule_entry)
         db.commit()
         db.refresh(db_schedule_entry)
+        _schedule_changed(db)
         return db_schedule_entry
 
 def get_schedule(db: Session):
-    return db.query(models.WeeklySchedule).all()
+    return db.query(models.WeeklySchedule).options(joinedload(models.WeeklySchedule.group)).all()
 
 def delete_schedule_entry(db: Session, schedule_id: int):
     db_entry = db.query(models.WeeklySchedule).filter(models.WeeklySchedule.id == schedule_id).first()
@@ -33,4 +39,24 @@ def delete_schedule_entry(db: Session, schedule_id: int):
         raise HTTPException(status_code=404, detail="Schedule entry not found")
     db.delete(db_entry)
     db.commit()
+    _schedule_changed(db)
     return db_entry
+
+def refresh_schedule_index(db: Session):
+    schedule_index.load(get_schedule(db))
+
+def _schedule_changed(db: Session):
+    refresh_schedule_index(db)
+    crud_class_session.sync_class_sessions(db)
+
+def get_active_schedule_slot(db: Session, moment: datetime) -> Optional[ScheduleSlot]:
+    """Returns the class scheduled at `moment` (local time), if any."""
+    if not schedule_index.is_loaded:
+        refresh_schedule_index(db)
+    return schedule_index.lookup(moment.strftime('%A'), moment.hour * 60 + moment.minute)
+
+def get_group_schedule_slot(db: Session, group_id: int, moment: datetime) -> Optional[ScheduleSlot]:
+    """Returns the class of `group_id` a scan at `moment` (local time) belongs to, if any."""
+    if not schedule_index.is_loaded:
+        refresh_schedule_index(db)
+    return schedule_index.group_slot(moment.strftime('%A'), group_id, moment.hour * 60 + moment.minute)
@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from fastapi import HTTPException
 from ..models import models
 from ..schemas import student as student_schema
+from ..services.qr_index import qr_index
 from typing import List
 from sqlalchemy.orm import Session, joinedload
 
@@ -49,6 +50,7 @@ def create_student(db: Session, student: student_schema.StudentCreate):
     db_student.qr_code_id = qr_code
     db.commit()
     db.refresh(db_student)
+    qr_index.put_student(db_student)
     
     return db_student
 
@@ -77,6 +79,7 @@ def update_student(db: Session, student_id: int, student_update: student_schema.
     
     db.commit()
     db.refresh(db_student)
+    qr_index.put_student(db_student)
     return db_student
 
 def delete_student(db: Session, student_id: int):
@@ -85,6 +88,7 @@ def delete_student(db: Session, student_id: int):
         raise HTTPException(status_code=404, detail="Student not found")
     db.delete(db_student)
     db.commit()
+    qr_index.discard_student(student_id)
     return {"ok": True}
 
 def create_students_from_roster(db: Session, group_id: int, students: List[student_schema.StudentFromClassroom]):
@@ -111,6 +115,7 @@ def create_students_from_roster(db: Session, group_id: int, students: List[stude
     db.add_all(db_students_to_add)
     db.commit()
 
+    indexed_qr_codes = []
     for student in db_students_to_add:
         db.refresh(student) 
         
@@ -125,8 +130,12 @@ def create_students_from_roster(db: Session, group_id: int, students: List[stude
         
         qr_code = f"{first_initial}{first_last_name}{second_last_name_initial}{student.id}"
         student.qr_code_id = qr_code
+        indexed_qr_codes.append((student.id, qr_code))
 
     db.commit() 
+    subject_id = db.query(models.Group.subject_id).filter(models.Group.id == group_id).scalar()
+    for student_id, qr_code in indexed_qr_codes:
+        qr_index.put(student_id, qr_code, group_id, subject_id)
     return db_students_to_add
 
 def get_all_students_with_details(db: Session):
@@ -2,6 +2,8 @@ from sqlalchemy.orm import Session
 from fastapi import HTTPException
 from ..models import models
 from ..schemas import subject as subject_schema
+from ..services.qr_index import qr_index
+from ..services.schedule_index import schedule_index
 import unicodedata
 from sqlalchemy.orm import Session
 
@@ -66,4 +68,6 @@ def delete_subject(db: Session, subject_id: int):
         raise HTTPException(status_code=404, detail="Subject not found")
     db.delete(db_subject)
     db.commit()
+    qr_index.discard_subject(subject_id)
+    schedule_index.invalidate()
     return db_subject
\ No newline at end of file
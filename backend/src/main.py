@@ -5,8 +5,16 @@ from datetime import date
 
 from .database import engine, SessionLocal
 from .models import models
+from .migrations import run_migrations
+from .services.qr_index import qr_index
+from .services.attendance_partitions import attendance_partitions
+from .services.grade_tracker import grade_tracker
+from .services.sync_jobs import sync_jobs
+from .crud import crud_attendance, crud_schedule, crud_class_session
 
 models.Base.metadata.create_all(bind=engine)
+run_migrations(engine)
+grade_tracker.install()
 
 from .api.api import api_router
 
@@ -35,6 +43,36 @@ def seed_initial_data():
     finally:
         db.close()
 
+@app.on_event("startup")
+def warm_attendance_indexes():
+    db = SessionLocal()
+    try:
+        attendance_partitions.ensure_upcoming(db, crud_attendance.get_mexico_time().date())
+        count = qr_index.warm(db)
+        print(f"QR code index warmed with {count} students.")
+        crud_schedule.refresh_schedule_index(db)
+        crud_class_session.sync_class_sessions(db, backfill=True)
+    finally:
+        db.close()
+
+@app.on_event("startup")
+def fail_interrupted_sync_jobs():
+    db = SessionLocal()
+    try:
+        count = sync_jobs.fail_interrupted(db)
+        if count:
+            print(f"Marked {count} interrupted Classroom sync job(s) as failed.")
+    finally:
+        db.close()
+
+@app.on_event("shutdown")
+def flush_grade_tracker():
+    grade_tracker.flush()
+
+@app.on_event("shutdown")
+def stop_sync_jobs():
+    sync_jobs.shutdown()
+
 
 app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
 
@@ -0,0 +1,31 @@
+"""
+Applies the SQL scripts in backend/migrations/ that have not run yet.
+
+models.Base.metadata.create_all only creates missing tables, so databases
+created by an earlier version need these scripts for new columns, keys and
+backfills. Scripts run once each, in file name order, each in its own
+transaction, and must be safe to run on a freshly created schema too.
+"""
+from pathlib import Path
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent / "migrations"
+
+
+def run_migrations(engine: Engine):
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            "name VARCHAR(255) PRIMARY KEY, "
+            "applied_at TIMESTAMP NOT NULL DEFAULT now())"
+        ))
+        applied = {name for (name,) in conn.execute(text("SELECT name FROM schema_migrations"))}
+
+    for script in sorted(MIGRATIONS_DIR.glob("*.sql")):
+        if script.name in applied:
+            continue
+        with engine.begin() as conn:
+            conn.exec_driver_sql(script.read_text())
+            conn.execute(text("INSERT INTO schema_migrations (name) VALUES (:name)"), {"name": script.name})
+        print(f"Applied migration {script.name}")
@@ -1,9 +1,9 @@
 from sqlalchemy import (
     Boolean, create_engine, Column, Integer, String, Date, Numeric, TIMESTAMP, ForeignKey,
-    CheckConstraint, UniqueConstraint
+    CheckConstraint, UniqueConstraint, Index
 )
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 from ..database import Base
 
 # Core Foundational Schemas 
@@ -259,18 +259,52 @@ class StudentFinalGrade(Base):
 # Ancillary and Integration Schemas
 
 class AttendanceRecord(Base):
+    """
+    Range-partitioned by month of attendance_date (see services/attendance_partitions.py),
+    so the partition key is part of the primary key.
+    """
     __tablename__ = 'attendance_records'
     id = Column(Integer, primary_key=True, autoincrement=True)
     student_id = Column(Integer, ForeignKey('students.id', ondelete='CASCADE'), nullable=False)
     subject_id = Column(Integer, ForeignKey('subjects.id', ondelete='CASCADE'), nullable=False)
     timestamp = Column(TIMESTAMP, server_default=func.now(), nullable=False)
+    # Local (Mexico) calendar day of the scan; one record per student, period and day.
+    attendance_date = Column(Date, primary_key=True, index=True)
     period_id = Column(Integer, ForeignKey('periods.id'), nullable=False)
+    # Class meeting the scan belongs to, assigned at scan time.
+    session_id = Column(Integer, ForeignKey('class_sessions.id', ondelete='SET NULL'), nullable=True, index=True)
     
     status = Column(String(20), default='present') 
 
+    __table_args__ = (
+        UniqueConstraint('student_id', 'period_id', 'attendance_date', name='_student_period_date_uc'),
+        Index('ix_attendance_records_timestamp_id', 'timestamp', 'id'),
+        {'postgresql_partition_by': 'RANGE (attendance_date)'},
+    )
+
     student = relationship("Student", back_populates="attendance_records")
     subject = relationship("Subject", back_populates="attendance_records")
     period = relationship("Period", back_populates="attendance_records")
+    session = relationship("ClassSession", back_populates="attendance_records")
+
+class AttendanceRollup(Base):
+    """
+    Per student/subject/period attendance counts, maintained in the same
+    statement that writes each attendance record (see services/attendance_rollup.py).
+    """
+    __tablename__ = 'attendance_rollups'
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    student_id = Column(Integer, ForeignKey('students.id', ondelete='CASCADE'), nullable=False)
+    subject_id = Column(Integer, ForeignKey('subjects.id', ondelete='CASCADE'), nullable=False)
+    period_id = Column(Integer, ForeignKey('periods.id'), nullable=False)
+    present_count = Column(Integer, nullable=False, default=0)
+    late_count = Column(Integer, nullable=False, default=0)
+    last_seen_at = Column(TIMESTAMP, nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint('student_id', 'subject_id', 'period_id', name='_student_subject_period_rollup_uc'),
+        Index('ix_attendance_rollups_subject_period', 'subject_id', 'period_id'),
+    )
 
 class PlanningReport(Base):
     __tablename__ = 'planning_reports'
@@ -301,4 +335,85 @@ class WeeklySchedule(Base):
 
     __table_args__ = (
         UniqueConstraint('day_of_week', 'start_time', name='_day_time_uc'),
-    )
\ No newline at end of file
+    )
+
+class ClassSession(Base):
+    """
+    One actual class meeting, generated from WeeklySchedule over the Period
+    calendars (see services/class_sessions.py).
+    """
+    __tablename__ = 'class_sessions'
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    group_id = Column(Integer, ForeignKey('groups.id', ondelete='CASCADE'), nullable=False)
+    schedule_id = Column(Integer, ForeignKey('weekly_schedules.id', ondelete='SET NULL'), nullable=True)
+    period_id = Column(Integer, ForeignKey('periods.id'), nullable=False)
+    session_date = Column(Date, nullable=False, index=True)
+    start_time = Column(String(5), nullable=False)
+    end_time = Column(String(5), nullable=False)
+
+    group = relationship("Group")
+    period = relationship("Period")
+    attendance_records = relationship("AttendanceRecord", back_populates="session")
+
+    __table_args__ = (
+        UniqueConstraint('group_id', 'session_date', 'start_time', name='_group_session_date_start_uc'),
+    )
+
+class ClassroomGradeSyncState(Base):
+    """
+    High-water mark of the Classroom grade import for one course work: the
+    newest submission updateTime already copied into the Student*Grade tables.
+    The mark only holds for the linked assignments and mapped students it was
+    written for, fingerprinted in scope_hash.
+    """
+    __tablename__ = 'classroom_grade_sync_states'
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    classroom_course_id = Column(String(255), nullable=False)
+    classroom_asg_id = Column(String(255), nullable=False)
+    last_update_time = Column(TIMESTAMP, nullable=True)
+    scope_hash = Column(String(64), nullable=True)
+    last_synced_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint('classroom_course_id', 'classroom_asg_id', name='_course_asg_uc'),
+    )
+
+class ClassroomCourseSyncState(Base):
+    """
+    What the workspace sync last saw of one Classroom course: its updateTime
+    (course metadata) and a hash of its roster, so later syncs skip courses
+    and rosters that did not change.
+    """
+    __tablename__ = 'classroom_course_sync_states'
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    classroom_course_id = Column(String(255), nullable=False, unique=True)
+    course_update_time = Column(TIMESTAMP, nullable=True)
+    roster_hash = Column(String(64), nullable=True)
+    roster_size = Column(Integer, nullable=True)
+    last_synced_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now(), nullable=False)
+
+class SyncJob(Base):
+    """
+    One background run of the Classroom workspace sync (services/sync_jobs.py).
+    Progress is committed while the job runs; the partial unique index allows
+    at most one queued or running job per teacher.
+    """
+    __tablename__ = 'sync_jobs'
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    teacher_id = Column(Integer, ForeignKey('teacher.id', ondelete='CASCADE'), nullable=False)
+    status = Column(String(20), nullable=False, default='queued')
+    courses_total = Column(Integer, nullable=False, default=0)
+    courses_done = Column(Integer, nullable=False, default=0)
+    students_imported = Column(Integer, nullable=False, default=0)
+    # JSON list of {"course_id", "course_name", "error"}, and the sync report once finished.
+    errors = Column(String, nullable=False, default='[]')
+    result = Column(String, nullable=True)
+    created_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
+    started_at = Column(TIMESTAMP, nullable=True)
+    finished_at = Column(TIMESTAMP, nullable=True)
+
+    __table_args__ = (
+        CheckConstraint("status IN ('queued', 'running', 'succeeded', 'failed')", name='check_sync_job_status'),
+        Index('ix_sync_jobs_active_teacher', 'teacher_id', unique=True,
+              postgresql_where=text("status IN ('queued', 'running')")),
+    )
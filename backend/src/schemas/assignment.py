@@ -34,4 +34,29 @@ class AllAssignmentsResponse(CamelCaseModel):
     notebook_assignments: List[Assignment]
     practice_assignments: List[Assignment]
     exam_assignments: List[Assignment]
-    other_assignments: List[Assignment]
\ No newline at end of file
+    other_assignments: List[Assignment]
+
+class CategorizedAssignment(CamelCaseModel):
+    category: str
+    id: int
+    name: str
+    topic_id: int
+    max_grade: float
+    classroom_asg_id: Optional[str] = None
+    class Config:
+        from_attributes = True
+
+class AssignmentBulkCreate(CamelCaseModel):
+    category: str
+    name: str
+    topic_id: int
+    max_grade: Optional[float] = Field(default=None, gt=0)
+    classroom_asg_id: Optional[str] = None
+
+class AssignmentBulkUpdate(CamelCaseModel):
+    category: str
+    id: int
+    name: Optional[str] = None
+    topic_id: Optional[int] = None
+    max_grade: Optional[float] = Field(default=None, gt=0)
+    classroom_asg_id: Optional[str] = None
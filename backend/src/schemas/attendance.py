@@ -1,6 +1,7 @@
 from pydantic import BaseModel
-from datetime import datetime
-from typing import Optional
+from datetime import date, datetime
+from typing import List, Optional
+from pydantic import Field
 from .teacher import CamelCaseModel
 
 class PeriodForAttendance(CamelCaseModel):
@@ -36,4 +37,65 @@ class AttendanceCreate(CamelCaseModel):
     student_qr_id: str
     period_id: int
     strict_mode: bool = False
-    late_threshold: int = 5
\ No newline at end of file
+    late_threshold: int = 5
+
+class AttendanceScan(CamelCaseModel):
+    student_qr_id: str
+    period_id: int
+    scanned_at: datetime
+    strict_mode: bool = False
+    late_threshold: int = 5
+
+class AttendanceBatchCreate(CamelCaseModel):
+    entries: List[AttendanceScan] = Field(..., max_length=1000)
+
+class AttendanceScanResult(CamelCaseModel):
+    index: int
+    outcome: str
+    record_id: Optional[int] = None
+    status: Optional[str] = None
+    detail: Optional[str] = None
+
+class AttendanceBatchResult(CamelCaseModel):
+    created: int
+    updated: int
+    duplicates: int
+    rejected: int
+    results: List[AttendanceScanResult]
+
+class AttendanceHistoryPage(CamelCaseModel):
+    items: List[AttendanceRecord]
+    next_cursor: Optional[str] = None
+
+class AttendanceSummary(CamelCaseModel):
+    student_id: int
+    first_name: str
+    last_name: str
+    group_id: int
+    subject_id: int
+    period_id: int
+    present_count: int
+    late_count: int
+    last_seen_at: Optional[datetime] = None
+
+class AbsenceReportEntry(CamelCaseModel):
+    student_id: int
+    first_name: str
+    last_name: str
+    group_id: int
+    expected_count: int
+    absence_count: int
+    absence_dates: List[date]
+
+class AbsenceReport(CamelCaseModel):
+    start_date: date
+    end_date: date
+    expected_count: int
+    absence_count: int
+    students: List[AbsenceReportEntry]
+
+class AbsenceMaterializeResult(CamelCaseModel):
+    start_date: date
+    end_date: date
+    absence_count: int
+    inserted: int
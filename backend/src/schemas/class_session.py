@@ -0,0 +1,38 @@
+from datetime import date, datetime
+from typing import List, Optional
+from .teacher import CamelCaseModel
+
+class ClassSession(CamelCaseModel):
+    id: int
+    group_id: int
+    period_id: int
+    session_date: date
+    start_time: str
+    end_time: str
+
+class ClassSessionSummary(ClassSession):
+    present_count: int
+    late_count: int
+    student_count: int
+
+class RollCallEntry(CamelCaseModel):
+    student_id: int
+    first_name: str
+    last_name: str
+    record_id: Optional[int] = None
+    status: Optional[str] = None
+    timestamp: Optional[datetime] = None
+
+class RollCall(ClassSession):
+    students: List[RollCallEntry]
+
+class GroupAttendanceRate(CamelCaseModel):
+    group_id: int
+    grade: int
+    name: str
+    session_count: int
+    meeting_days: int
+    student_count: int
+    attended_count: int
+    expected_count: int
+    attendance_rate: Optional[float] = None
@@ -0,0 +1,121 @@
+from typing import Dict, List, Optional
+from pydantic import Field, model_validator
+from .teacher import CamelCaseModel
+
+# Grades and max grades are stored as Numeric(5, 2).
+MAX_GRADE = 999.99
+
+# The parameters each GradeTransform operation takes; curve's have defaults.
+TRANSFORM_PARAMETERS = {
+    'curve': {'slope', 'offset'},
+    'cap': {'value'},
+    'rescale': {'new_max_grade'},
+    'fill_missing': {'value'},
+}
+
+class StudentTopicGrade(CamelCaseModel):
+    student_id: int
+    topic_id: int
+    calculated_grade: float
+
+class TopicGradeRecompute(CamelCaseModel):
+    topic_count: Optional[int] = None
+    grades_written: int
+
+class StudentFinalGrade(CamelCaseModel):
+    student_id: int
+    subject_id: int
+    period_1_grade: Optional[float] = None
+    period_2_grade: Optional[float] = None
+    period_3_grade: Optional[float] = None
+    final_year_grade: Optional[float] = None
+
+class FinalGradeRollup(CamelCaseModel):
+    grades_written: int
+
+class MatrixAssignment(CamelCaseModel):
+    id: int
+    category: str
+
+class GradeMatrix(CamelCaseModel):
+    """grades[i][j] is student_ids[i]'s grade on assignments[j]; null removes the grade."""
+    student_ids: List[int]
+    assignments: List[MatrixAssignment]
+    grades: List[List[Optional[float]]]
+
+class GradeMatrixResult(CamelCaseModel):
+    grades_written: int
+    grades_deleted: int
+
+class ClassroomGradeImport(CamelCaseModel):
+    courses: int
+    submissions_seen: int
+    grades_written: int
+    grades_deleted: int
+
+class GradebookAssignment(CamelCaseModel):
+    id: int
+    category: str
+    name: str
+    topic_id: int
+    max_grade: float
+
+class Gradebook(CamelCaseModel):
+    """
+    grades is the row-major student_ids x assignments matrix (missing cells
+    are 0); null_mask is base64 of the packed bits (MSB first, 1 = no grade).
+    """
+    group_id: int
+    student_ids: List[int]
+    assignments: List[GradebookAssignment]
+    grades: List[float]
+    null_mask: str
+
+class GradeStats(CamelCaseModel):
+    count: int
+    mean: Optional[float] = None
+    median: Optional[float] = None
+    std: Optional[float] = None
+    percentiles: Dict[str, Optional[float]]
+    histogram: List[int]
+    failing_count: int
+
+class GroupGradeStats(GradeStats):
+    group_id: int
+
+class GradeAnalytics(CamelCaseModel):
+    scope: str
+    scale: float
+    bin_edges: List[float]
+    overall: GradeStats
+    groups: List[GroupGradeStats]
+
+class GradeTransform(CamelCaseModel):
+    """One of curve (slope, offset), cap (value), rescale (new_max_grade) or fill_missing (value)."""
+    operation: str
+    category: Optional[str] = None
+    assignment_id: Optional[int] = None
+    topic_id: Optional[int] = None
+    slope: float = Field(default=1.0, ge=0, le=100)
+    offset: float = Field(default=0.0, ge=-MAX_GRADE, le=MAX_GRADE)
+    value: Optional[float] = Field(default=None, ge=0, le=MAX_GRADE)
+    new_max_grade: Optional[float] = Field(default=None, gt=0, le=MAX_GRADE)
+
+    @model_validator(mode='after')
+    def _check_parameters(self):
+        parameters = TRANSFORM_PARAMETERS.get(self.operation)
+        if parameters is None:
+            raise ValueError(f"Unknown operation: {self.operation}")
+        unexpected = self.model_fields_set & {'slope', 'offset', 'value', 'new_max_grade'} - parameters
+        if unexpected:
+            raise ValueError(f"{self.operation} does not take {', '.join(sorted(unexpected))}.")
+        missing = {name for name in parameters if getattr(self, name) is None}
+        if missing:
+            raise ValueError(f"{self.operation} requires {', '.join(sorted(missing))}.")
+        return self
+
+class GradeTransformResult(CamelCaseModel):
+    operation: str
+    grades_affected: int
+    before: GradeStats
+    after: GradeStats
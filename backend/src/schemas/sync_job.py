@@ -0,0 +1,31 @@
+import json
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import field_validator
+
+from .teacher import CamelCaseModel
+
+class SyncJobError(CamelCaseModel):
+    course_id: Optional[str] = None
+    course_name: Optional[str] = None
+    error: str
+
+class SyncJob(CamelCaseModel):
+    id: int
+    teacher_id: int
+    status: str
+    courses_total: int
+    courses_done: int
+    students_imported: int
+    errors: List[SyncJobError]
+    # The sync report (subjects/groups created, per-course timings, ...) once finished.
+    result: Optional[dict] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    @field_validator('errors', 'result', mode='before')
+    @classmethod
+    def _parse_json(cls, value):
+        return json.loads(value) if isinstance(value, str) else value
@@ -0,0 +1,193 @@
+"""
+Absence inference from the weekly schedule, the rosters and the scans.
+
+Only presences are scanned, so an absence is an expected class meeting with
+no present/late record: every day a group meets (WeeklySchedule day within a
+Period's date range) times every active student of the group, minus the
+(student, attendance_date) pairs that have a record. Meetings, rosters and
+records are loaded with one query each and combined as NumPy arrays of
+integer keys, so a full school year is a handful of array operations rather
+than a loop per student and day.
+"""
+from datetime import date
+from typing import NamedTuple, Optional
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..models import models
+
+COUNTED_STATUSES = ('present', 'late')
+
+WEEKDAY_INDEX = {
+    'Monday': 0, 'Tuesday': 1, 'Wednesday': 2, 'Thursday': 3,
+    'Friday': 4, 'Saturday': 5, 'Sunday': 6,
+}
+
+# 1970-01-01 (day 0 of datetime64[D]) was a Thursday.
+_EPOCH_WEEKDAY = 3
+
+_EMPTY_IDS = np.empty(0, dtype=np.int64)
+_EMPTY_DAYS = np.empty(0, dtype='datetime64[D]')
+
+
+class AbsenceSet(NamedTuple):
+    """Parallel arrays, one entry per expected meeting (or absence)."""
+    student_ids: np.ndarray
+    group_ids: np.ndarray
+    period_ids: np.ndarray
+    days: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.student_ids)
+
+
+class AbsenceResult(NamedTuple):
+    expected: AbsenceSet
+    absences: AbsenceSet
+
+
+def _empty_set() -> AbsenceSet:
+    return AbsenceSet(_EMPTY_IDS, _EMPTY_IDS, _EMPTY_IDS, _EMPTY_DAYS)
+
+
+def school_days(db: Session, start_date: date, end_date: date):
+    """Every day of [start_date, end_date] inside a Period, with its period id."""
+    periods = db.execute(
+        select(models.Period.id, models.Period.start_date, models.Period.end_date)
+        .where(models.Period.start_date <= end_date, models.Period.end_date >= start_date)
+        .order_by(models.Period.start_date, models.Period.id)
+    ).all()
+    spans, owners = [], []
+    for period_id, period_start, period_end in periods:
+        first = np.datetime64(max(period_start, start_date), 'D')
+        last = np.datetime64(min(period_end, end_date), 'D')
+        if last < first:
+            continue
+        span = np.arange(first, last + 1)
+        spans.append(span)
+        owners.append(np.full(len(span), period_id, dtype=np.int64))
+    if not spans:
+        return _EMPTY_DAYS, _EMPTY_IDS
+    days = np.concatenate(spans)
+    period_ids = np.concatenate(owners)
+    # Overlapping periods: a day belongs to the one that started first.
+    days, first_index = np.unique(days, return_index=True)
+    return days, period_ids[first_index]
+
+
+def weekday_numbers(days: np.ndarray) -> np.ndarray:
+    """Monday=0 ... Sunday=6 for datetime64[D] days."""
+    return (days.astype(np.int64) + _EPOCH_WEEKDAY) % 7
+
+
+def _weekly_meetings(db: Session, group_id: Optional[int], subject_id: Optional[int]):
+    """Distinct (group, weekday) pairs; several classes on one day are one meeting."""
+    query = (
+        select(models.WeeklySchedule.group_id, models.WeeklySchedule.day_of_week)
+        .join(models.Group, models.WeeklySchedule.group_id == models.Group.id)
+        .distinct()
+    )
+    if group_id is not None:
+        query = query.where(models.WeeklySchedule.group_id == group_id)
+    if subject_id is not None:
+        query = query.where(models.Group.subject_id == subject_id)
+    pairs = [(gid, WEEKDAY_INDEX[day]) for gid, day in db.execute(query) if day in WEEKDAY_INDEX]
+    if not pairs:
+        return _EMPTY_IDS, _EMPTY_IDS
+    groups, weekdays = np.array(pairs, dtype=np.int64).T
+    return groups, weekdays
+
+
+def _roster(db: Session, group_ids: np.ndarray):
+    """Active students of `group_ids`, sorted by group."""
+    rows = db.execute(
+        select(models.Student.group_id, models.Student.id)
+        .where(models.Student.status == 'active', models.Student.group_id.in_(group_ids.tolist()))
+        .order_by(models.Student.group_id, models.Student.id)
+    ).all()
+    if not rows:
+        return _EMPTY_IDS, _EMPTY_IDS
+    groups, students = np.array(rows, dtype=np.int64).T
+    return groups, students
+
+
+def _attended_keys(db: Session, start_date: date, end_date: date, group_ids: np.ndarray) -> np.ndarray:
+    rows = db.execute(
+        select(models.AttendanceRecord.student_id, models.AttendanceRecord.attendance_date)
+        .join(models.Student, models.AttendanceRecord.student_id == models.Student.id)
+        .where(
+            models.AttendanceRecord.attendance_date.between(start_date, end_date),
+            models.AttendanceRecord.status.in_(COUNTED_STATUSES),
+            models.Student.group_id.in_(group_ids.tolist()),
+        )
+    ).all()
+    if not rows:
+        return _EMPTY_IDS
+    students = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+    days = np.array([row[1] for row in rows], dtype='datetime64[D]')
+    return encode_keys(students, days)
+
+
+def encode_keys(student_ids: np.ndarray, days: np.ndarray) -> np.ndarray:
+    """Packs (student id, day) pairs into single int64 keys."""
+    return (student_ids.astype(np.int64) << 32) | days.astype(np.int64)
+
+
+def _expand(counts: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """For run i of length counts[i], yields starts[i], starts[i] + 1, ..."""
+    total = int(counts.sum())
+    run_offsets = np.repeat(np.cumsum(counts) - counts, counts)
+    return np.repeat(starts, counts) + (np.arange(total) - run_offsets)
+
+
+def expected_meetings(
+    db: Session,
+    start_date: date,
+    end_date: date,
+    group_id: Optional[int] = None,
+    subject_id: Optional[int] = None,
+) -> AbsenceSet:
+    """Every (student, day) a student was expected in class."""
+    days, day_periods = school_days(db, start_date, end_date)
+    meeting_groups, meeting_weekdays = _weekly_meetings(db, group_id, subject_id)
+    if not len(days) or not len(meeting_groups):
+        return _empty_set()
+
+    # Group meetings: every school day whose weekday the group has a class.
+    day_weekdays = weekday_numbers(days)
+    pair_index, day_index = np.nonzero(meeting_weekdays[:, None] == day_weekdays[None, :])
+    groups = meeting_groups[pair_index]
+
+    # Student meetings: each group meeting repeated over the group's roster.
+    roster_groups, roster_students = _roster(db, np.unique(groups))
+    first = np.searchsorted(roster_groups, groups, side='left')
+    counts = np.searchsorted(roster_groups, groups, side='right') - first
+    meeting = np.repeat(np.arange(len(groups)), counts)
+    students = roster_students[_expand(counts, first)]
+
+    return AbsenceSet(
+        student_ids=students,
+        group_ids=groups[meeting],
+        period_ids=day_periods[day_index][meeting],
+        days=days[day_index][meeting],
+    )
+
+
+def infer_absences(
+    db: Session,
+    start_date: date,
+    end_date: date,
+    group_id: Optional[int] = None,
+    subject_id: Optional[int] = None,
+) -> AbsenceResult:
+    """Expected meetings and the subset of them without a present/late record."""
+    expected = expected_meetings(db, start_date, end_date, group_id, subject_id)
+    if not len(expected):
+        return AbsenceResult(expected, expected)
+
+    attended = _attended_keys(db, start_date, end_date, np.unique(expected.group_ids))
+    missing = ~np.isin(encode_keys(expected.student_ids, expected.days), attended)
+    absences = AbsenceSet(*(column[missing] for column in expected))
+    return AbsenceResult(expected, absences)
@@ -0,0 +1,84 @@
+"""
+In-process broadcaster for attendance records.
+
+crud_attendance publishes every record it commits. Subscribers (the
+/attendance/stream endpoint) receive them on their own event loop, and a
+bounded replay buffer lets a reconnecting client resume from its last cursor
+instead of downloading the whole day again. Cursors look like
+"<epoch>:<sequence>"; the epoch changes on every process start, so a cursor
+from a previous process is never mistaken for a current one.
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+from datetime import date
+from typing import Deque, List, NamedTuple, Optional, Set, Tuple
+
+
+class FeedEvent(NamedTuple):
+    sequence: int
+    day: date
+    record: dict
+
+
+class AttendanceFeed:
+    def __init__(self, buffer_size: int = 5000):
+        self.epoch = str(int(time.time() * 1000))
+        self._lock = threading.Lock()
+        self._events: Deque[FeedEvent] = deque(maxlen=buffer_size)
+        self._sequence = 0
+        self._subscribers: Set[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = set()
+
+    @property
+    def sequence(self) -> int:
+        return self._sequence
+
+    def cursor_for(self, sequence: int) -> str:
+        return f"{self.epoch}:{sequence}"
+
+    def publish(self, day: date, records: List[dict]):
+        """Called from worker threads after a commit; `records` are JSON-ready."""
+        with self._lock:
+            events = []
+            for record in records:
+                self._sequence += 1
+                event = FeedEvent(self._sequence, day, record)
+                self._events.append(event)
+                events.append(event)
+            subscribers = list(self._subscribers)
+        for loop, queue in subscribers:
+            for event in events:
+                loop.call_soon_threadsafe(queue.put_nowait, event)
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue()
+        with self._lock:
+            self._subscribers.add((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        with self._lock:
+            self._subscribers = {(loop, q) for loop, q in self._subscribers if q is not queue}
+
+    def replay_since(self, cursor: Optional[str], day: date) -> Optional[List[FeedEvent]]:
+        """
+        Events of `day` after `cursor`, or None when the cursor is missing,
+        from another process, or older than the replay buffer; the client
+        then needs a fresh snapshot.
+        """
+        if not cursor:
+            return None
+        epoch, _, sequence = cursor.partition(":")
+        if epoch != self.epoch or not sequence.isdigit():
+            return None
+        sequence = int(sequence)
+        with self._lock:
+            if sequence > self._sequence:
+                return None
+            if self._events and sequence < self._events[0].sequence - 1:
+                return None
+            return [event for event in self._events if event.sequence > sequence and event.day == day]
+
+
+attendance_feed = AttendanceFeed()
@@ -0,0 +1,203 @@
+"""
+Monthly partitions of attendance_records and their cold archive.
+
+attendance_records is range-partitioned by month of attendance_date
+(migrations/0004_attendance_partitions.sql); a day or date-range query only
+scans the partitions it needs. Partitions are created by the
+ensure_attendance_partition() SQL function: at startup for the upcoming
+months, and before a write lands in a month this process has not seen yet.
+
+Closed school years are archived with
+
+    python -m src.services.attendance_partitions --archive [--before 2025-09-01]
+
+which detaches every partition that ends on or before the cutoff (default:
+start of the earliest Period, i.e. the current school year), writes it to a
+zstd-compressed Parquet file and drops it. read_archived_attendance() (or
+any Parquet reader) queries the files, pruning on attendance_date. Archived
+rows no longer count in a rollup rebuild.
+"""
+import argparse
+import threading
+from datetime import date, datetime
+from pathlib import Path
+from typing import Iterable, List, Optional, Set
+
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+
+from ..models import models
+
+ARCHIVE_DIR = Path(__file__).resolve().parent.parent.parent / "archive" / "attendance"
+PARTITION_PREFIX = "attendance_records_"
+_COLUMNS = 'id, student_id, subject_id, period_id, session_id, attendance_date, "timestamp", status'
+
+
+def _month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def _add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+class AttendancePartitions:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._months: Set[date] = set()
+
+    def ensure(self, db: Session, days: Iterable[date]):
+        """
+        Makes sure the partitions holding `days` exist. Months already seen
+        cost a set lookup; new ones are created in a short transaction of
+        their own, so call this before the session reads attendance_records.
+        """
+        months = {_month_start(day) for day in days} - self._months
+        if not months:
+            return
+        with db.get_bind().begin() as conn:
+            for month in sorted(months):
+                conn.execute(text("SELECT ensure_attendance_partition(:day)"), {"day": month})
+        with self._lock:
+            self._months |= months
+
+    def ensure_range(self, db: Session, start_date: date, end_date: date):
+        month, last = _month_start(start_date), _month_start(end_date)
+        months = []
+        while month <= last:
+            months.append(month)
+            month = _add_months(month, 1)
+        self.ensure(db, months)
+
+    def ensure_upcoming(self, db: Session, today: date, months_ahead: int = 3):
+        self.ensure_range(db, today, _add_months(_month_start(today), months_ahead))
+
+    def forget(self, months: Iterable[date]):
+        with self._lock:
+            self._months -= set(months)
+
+
+attendance_partitions = AttendancePartitions()
+
+
+def list_partitions(db: Session) -> List[date]:
+    """Months with an attached partition, oldest first."""
+    names = db.execute(text("""
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'attendance_records'::regclass
+    """)).scalars()
+    months = []
+    for name in names:
+        if name.startswith(PARTITION_PREFIX):
+            months.append(datetime.strptime(name[len(PARTITION_PREFIX):], "%Y_%m").date())
+    return sorted(months)
+
+
+def _partition_name(month: date) -> str:
+    return f"{PARTITION_PREFIX}{month:%Y_%m}"
+
+
+def _export_partition(db: Session, table_name: str, path: Path) -> int:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    rows = db.execute(text(f'SELECT {_COLUMNS} FROM "{table_name}" ORDER BY attendance_date, id')).all()
+    if not rows:
+        return 0
+    columns = list(zip(*rows))
+    table = pa.table({
+        "id": pa.array(columns[0], pa.int32()),
+        "student_id": pa.array(columns[1], pa.int32()),
+        "subject_id": pa.array(columns[2], pa.int32()),
+        "period_id": pa.array(columns[3], pa.int32()),
+        "session_id": pa.array(columns[4], pa.int32()),
+        "attendance_date": pa.array(columns[5], pa.date32()),
+        "timestamp": pa.array(columns[6], pa.timestamp("us")),
+        "status": pa.array(columns[7], pa.string()),
+    })
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    pq.write_table(table, tmp_path, compression="zstd")
+    if pq.read_metadata(tmp_path).num_rows != len(rows):
+        raise RuntimeError(f"Archive of {table_name} is incomplete.")
+    tmp_path.replace(path)
+    return len(rows)
+
+
+def archive_partitions(db: Session, before: date, archive_dir: Path = ARCHIVE_DIR, drop: bool = True) -> List[dict]:
+    """
+    Detaches the partitions whose month ends on or before `before`, exports
+    each non-empty one to `archive_dir`/attendance_records_YYYY_MM.parquet
+    and drops it (or keeps the detached table with drop=False).
+    """
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    archived = []
+    for month in list_partitions(db):
+        if _add_months(month, 1) > before:
+            continue
+        name = _partition_name(month)
+        db.execute(text(f'ALTER TABLE attendance_records DETACH PARTITION "{name}"'))
+        db.commit()
+        attendance_partitions.forget([month])
+
+        path = archive_dir / f"{name}.parquet"
+        count = _export_partition(db, name, path)
+        if not count:
+            path = None
+        if drop:
+            db.execute(text(f'DROP TABLE "{name}"'))
+        db.commit()
+        archived.append({"partition": name, "rows": count, "file": str(path) if path else None})
+    return archived
+
+
+def read_archived_attendance(
+    start_date: date,
+    end_date: date,
+    student_id: Optional[int] = None,
+    archive_dir: Path = ARCHIVE_DIR,
+) -> List[dict]:
+    """Archived records between two dates, read from the Parquet files."""
+    import pyarrow.dataset as ds
+
+    if not archive_dir.exists():
+        return []
+    dataset = ds.dataset(str(archive_dir), format="parquet")
+    condition = (ds.field("attendance_date") >= start_date) & (ds.field("attendance_date") <= end_date)
+    if student_id is not None:
+        condition = condition & (ds.field("student_id") == student_id)
+    return dataset.to_table(filter=condition).to_pylist()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage attendance_records partitions.")
+    parser.add_argument("--list", action="store_true", help="list attached partitions")
+    parser.add_argument("--archive", action="store_true", help="detach, export and drop closed partitions")
+    parser.add_argument("--before", type=date.fromisoformat, help="archive months ending on or before this date")
+    parser.add_argument("--out", type=Path, default=ARCHIVE_DIR, help="archive directory")
+    parser.add_argument("--keep", action="store_true", help="keep detached partitions instead of dropping them")
+    args = parser.parse_args()
+
+    from ..database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        if args.archive:
+            before = args.before or db.query(func.min(models.Period.start_date)).scalar()
+            if before is None:
+                raise SystemExit("No periods defined; pass --before.")
+            archived = archive_partitions(db, before, args.out, drop=not args.keep)
+            for entry in archived:
+                print(f"{entry['partition']}: {entry['rows']} rows -> {entry['file'] or 'nothing to export'}")
+            print(f"Archived {len(archived)} partitions before {before}.")
+        if args.list or not args.archive:
+            for month in list_partitions(db):
+                print(_partition_name(month))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Incrementally maintained attendance rollups.
+
+attendance_rollups keeps present/late counts and the last time a student was
+seen per (student, subject, period), so reports read a few summary rows
+instead of aggregating every scan. crud_attendance folds the rollup update
+into the same statement as each attendance upsert via `rollup_update_cte`,
+after taking `lock_attendance_keys` so concurrent scans of the same record
+are applied one after the other; `rebuild_rollups` recomputes the table from
+attendance_records and `check_rollups` compares the two.
+
+    python -m src.services.attendance_rollup --check
+    python -m src.services.attendance_rollup --rebuild
+"""
+import argparse
+from datetime import date
+from typing import Iterable, List, Tuple
+
+from sqlalchemy import Integer, and_, case, cast, func, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from ..models import models
+
+COUNTED_STATUSES = ('present', 'late')
+
+_AGGREGATE_SQL = """
+    SELECT student_id, subject_id, period_id,
+           count(*) FILTER (WHERE status = 'present') AS present_count,
+           count(*) FILTER (WHERE status = 'late') AS late_count,
+           max("timestamp") AS last_seen_at
+    FROM attendance_records
+    WHERE status IN ('present', 'late')
+    GROUP BY student_id, subject_id, period_id
+"""
+
+
+def _count_delta(new_status, old_status, counted: str):
+    return cast(new_status == counted, Integer) - func.coalesce(cast(old_status == counted, Integer), 0)
+
+
+def lock_attendance_keys(db: Session, keys: Iterable[Tuple[int, int, date]]):
+    """
+    Takes a transaction-level advisory lock on each (student, period, day), in
+    sorted order so concurrent batches cannot deadlock. It must run as its own
+    statement before the upsert: under READ COMMITTED the upsert's snapshot is
+    then taken after any competing writer of those records has committed.
+    """
+    keys = sorted(set(keys))
+    if not keys:
+        return
+    students, periods, days = zip(*keys)
+    db.execute(text(
+        "SELECT pg_advisory_xact_lock(hashtextextended("
+        "format('attendance:%s:%s:%s', k.student_id, k.period_id, k.day), 0)) "
+        "FROM unnest(CAST(:students AS integer[]), CAST(:periods AS integer[]), CAST(:days AS date[])) "
+        "AS k(student_id, period_id, day)"
+    ), {"students": list(students), "periods": list(periods), "days": list(days)})
+
+
+def rollup_update_cte(upserted, prior):
+    """
+    Builds the data-modifying CTE that applies an attendance upsert to the
+    rollups.
+
+    `upserted` is the upsert's RETURNING CTE (student_id, subject_id,
+    period_id, attendance_date, timestamp, status) and `prior` a CTE reading
+    the same keys from attendance_records. Both read the statement's snapshot,
+    so the caller must hold lock_attendance_keys for every key: otherwise a
+    scan racing another scan of the same record takes the ON CONFLICT path
+    with no prior row in its snapshot and is counted twice.
+    """
+    old_status = prior.c.status
+    changes = (
+        select(
+            upserted.c.student_id,
+            upserted.c.subject_id,
+            upserted.c.period_id,
+            func.sum(_count_delta(upserted.c.status, old_status, 'present')).label('present_count'),
+            func.sum(_count_delta(upserted.c.status, old_status, 'late')).label('late_count'),
+            func.max(case((upserted.c.status.in_(COUNTED_STATUSES), upserted.c.timestamp))).label('last_seen_at'),
+        )
+        .select_from(
+            upserted.outerjoin(prior, and_(
+                prior.c.student_id == upserted.c.student_id,
+                prior.c.period_id == upserted.c.period_id,
+                prior.c.attendance_date == upserted.c.attendance_date,
+            ))
+        )
+        .group_by(upserted.c.student_id, upserted.c.subject_id, upserted.c.period_id)
+    )
+
+    rollup = models.AttendanceRollup
+    stmt = insert(rollup).from_select(
+        ['student_id', 'subject_id', 'period_id', 'present_count', 'late_count', 'last_seen_at'],
+        changes,
+    )
+    stmt = stmt.on_conflict_do_update(
+        constraint='_student_subject_period_rollup_uc',
+        set_={
+            'present_count': rollup.present_count + stmt.excluded.present_count,
+            'late_count': rollup.late_count + stmt.excluded.late_count,
+            'last_seen_at': func.greatest(rollup.last_seen_at, stmt.excluded.last_seen_at),
+        },
+    )
+    return stmt.cte('rollup_update')
+
+
+def rebuild_rollups(db: Session) -> int:
+    """Recomputes every rollup from attendance_records. Returns the row count."""
+    db.execute(text("LOCK TABLE attendance_rollups IN EXCLUSIVE MODE"))
+    db.execute(text("DELETE FROM attendance_rollups"))
+    result = db.execute(text(
+        "INSERT INTO attendance_rollups "
+        "(student_id, subject_id, period_id, present_count, late_count, last_seen_at) "
+        + _AGGREGATE_SQL
+    ))
+    db.commit()
+    return result.rowcount
+
+
+def check_rollups(db: Session, sample: int = 20) -> List[dict]:
+    """Returns up to `sample` rollup rows that disagree with attendance_records."""
+    rows = db.execute(text(f"""
+        WITH expected AS ({_AGGREGATE_SQL})
+        SELECT coalesce(e.student_id, r.student_id) AS student_id,
+               coalesce(e.subject_id, r.subject_id) AS subject_id,
+               coalesce(e.period_id, r.period_id) AS period_id,
+               e.present_count AS expected_present, r.present_count AS actual_present,
+               e.late_count AS expected_late, r.late_count AS actual_late,
+               e.last_seen_at AS expected_last_seen, r.last_seen_at AS actual_last_seen
+        FROM expected e
+        FULL OUTER JOIN attendance_rollups r
+          ON r.student_id = e.student_id AND r.subject_id = e.subject_id AND r.period_id = e.period_id
+        WHERE e.student_id IS NULL
+           OR r.student_id IS NULL
+           OR (e.present_count, e.late_count) IS DISTINCT FROM (r.present_count, r.late_count)
+           OR e.last_seen_at IS DISTINCT FROM r.last_seen_at
+        LIMIT :sample
+    """), {"sample": sample}).mappings().all()
+    return [dict(row) for row in rows]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild or verify attendance rollups.")
+    parser.add_argument("--rebuild", action="store_true", help="recompute the rollups from attendance_records")
+    parser.add_argument("--check", action="store_true", help="compare the rollups with attendance_records")
+    args = parser.parse_args()
+
+    from ..database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        if args.rebuild:
+            print(f"Rebuilt {rebuild_rollups(db)} attendance rollups.")
+        if args.check or not args.rebuild:
+            mismatches = check_rollups(db)
+            for row in mismatches:
+                print(row)
+            print("Rollups match attendance_records." if not mismatches else f"{len(mismatches)} mismatching rollups shown.")
+            if mismatches:
+                raise SystemExit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Class sessions generated from the weekly schedule.
+
+WeeklySchedule is a template; class_sessions holds one row per actual
+meeting (group, date, start, end, period) for every schedule entry on every
+matching day of the Period calendars. Attendance records point at the
+session they were scanned in, so roll calls and attendance rates are joins
+on indexed ids instead of time-range scans.
+
+Sessions are regenerated from a given day onwards whenever the schedule
+changes; earlier sessions are kept as the record of what was taught.
+"""
+from datetime import date
+from typing import List, Optional
+
+import numpy as np
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from ..models import models
+from .absence_engine import WEEKDAY_INDEX, school_days, weekday_numbers
+
+_CHUNK_SIZE = 5000
+
+
+def generate_sessions(db: Session, start_date: date, end_date: date) -> List[dict]:
+    """Session rows for every schedule entry on every matching school day."""
+    days, period_ids = school_days(db, start_date, end_date)
+    if not len(days):
+        return []
+    weekdays = weekday_numbers(days)
+    entries = db.execute(select(
+        models.WeeklySchedule.id,
+        models.WeeklySchedule.group_id,
+        models.WeeklySchedule.day_of_week,
+        models.WeeklySchedule.start_time,
+        models.WeeklySchedule.end_time,
+    )).all()
+
+    rows = []
+    for entry in entries:
+        weekday = WEEKDAY_INDEX.get(entry.day_of_week)
+        if weekday is None:
+            continue
+        matching = np.nonzero(weekdays == weekday)[0]
+        for day, period_id in zip(days[matching].tolist(), period_ids[matching].tolist()):
+            rows.append({
+                'group_id': entry.group_id,
+                'schedule_id': entry.id,
+                'period_id': period_id,
+                'session_date': day,
+                'start_time': entry.start_time,
+                'end_time': entry.end_time,
+            })
+    return rows
+
+
+def sync_class_sessions(db: Session, since: date) -> int:
+    """
+    Makes the sessions from `since` onwards match the current schedule:
+    upserts the expected ones and deletes the rest (their attendance records
+    keep existing with session_id NULL). Does not commit. Returns the number
+    of sessions from `since` on.
+    """
+    last_day: Optional[date] = db.query(func.max(models.Period.end_date)).scalar()
+    rows = generate_sessions(db, since, last_day) if last_day and last_day >= since else []
+
+    kept_ids = []
+    for offset in range(0, len(rows), _CHUNK_SIZE):
+        stmt = insert(models.ClassSession).values(rows[offset:offset + _CHUNK_SIZE])
+        stmt = stmt.on_conflict_do_update(
+            constraint='_group_session_date_start_uc',
+            set_={
+                'schedule_id': stmt.excluded.schedule_id,
+                'period_id': stmt.excluded.period_id,
+                'end_time': stmt.excluded.end_time,
+            },
+        ).returning(models.ClassSession.id)
+        kept_ids.extend(db.execute(stmt).scalars())
+
+    stale = db.query(models.ClassSession).filter(models.ClassSession.session_date >= since)
+    if kept_ids:
+        stale = stale.filter(models.ClassSession.id.notin_(kept_ids))
+    stale.delete(synchronize_session=False)
+    return len(kept_ids)
+
+
+def link_attendance_records(db: Session) -> int:
+    """
+    Assigns a session to records that have none: the student's group's
+    session that day which started last at or before the scan, else the
+    day's first one. Used once, after the first generation. Does not commit.
+    """
+    result = db.execute(text("""
+        UPDATE attendance_records r
+        SET session_id = m.session_id
+        FROM (
+            SELECT DISTINCT ON (r.id) r.id AS record_id, cs.id AS session_id
+            FROM attendance_records r
+            JOIN students st ON st.id = r.student_id
+            JOIN class_sessions cs
+              ON cs.group_id = st.group_id AND cs.session_date = r.attendance_date
+            WHERE r.session_id IS NULL
+            ORDER BY r.id,
+                     cs.start_time <= to_char(r."timestamp" - INTERVAL '6 hours', 'HH24:MI') DESC,
+                     CASE WHEN cs.start_time <= to_char(r."timestamp" - INTERVAL '6 hours', 'HH24:MI')
+                          THEN cs.start_time END DESC,
+                     cs.start_time
+        ) m
+        WHERE r.id = m.record_id
+    """))
+    return result.rowcount
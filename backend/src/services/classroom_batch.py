@@ -0,0 +1,92 @@
+"""
+Batched, paginated Classroom listings.
+
+Listing N courses one request at a time costs N x pages HTTP exchanges. Here
+the first page of every listing is packed into multipart batch requests of
+up to BATCH_SIZE calls (one exchange each), and the listings that come back
+with a nextPageToken are fed into the next round. A school-wide roster or
+submission sync then costs about (listings / BATCH_SIZE) x (longest
+pagination) exchanges. The batches of one round are sent concurrently.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Hashable, Iterable, List, NamedTuple, Optional, Tuple
+
+from google.oauth2.credentials import Credentials
+from googleapiclient.discovery import Resource
+from googleapiclient.http import HttpRequest
+
+from . import google_clients
+
+# Google accepts up to 1000 calls per batch (googleapiclient.http.MAX_BATCH_LIMIT);
+# smaller batches keep each multipart response small and let a round overlap.
+BATCH_SIZE = 100
+MAX_CONCURRENT_BATCHES = 4
+
+# (service, key, page_token) -> the list() request for that page
+MakeRequest = Callable[[Resource, Hashable, Optional[str]], HttpRequest]
+
+
+class Listing(NamedTuple):
+    items: List[dict]
+    # From the start of list_batched until this listing's last page arrived.
+    seconds: float
+    error: Optional[Exception] = None
+
+
+def list_batched(
+    credentials: Credentials,
+    keys: Iterable[Hashable],
+    make_request: MakeRequest,
+    items_key: str,
+    batch_size: int = BATCH_SIZE,
+    max_concurrent: int = MAX_CONCURRENT_BATCHES,
+) -> Dict[Hashable, Listing]:
+    """
+    Every page of one listing per key. A listing whose call fails (or whose
+    whole batch fails) carries the error and no items; the others go on.
+    """
+    service = google_clients.classroom(credentials)
+    keys = list(dict.fromkeys(keys))
+    items: Dict[Hashable, List[dict]] = {key: [] for key in keys}
+    finished: Dict[Hashable, float] = {}
+    errors: Dict[Hashable, Exception] = {}
+    start = time.perf_counter()
+
+    def send(chunk: List[Tuple[Hashable, Optional[str]]]) -> List[Tuple[Hashable, str]]:
+        continuations = []
+
+        def callback(request_id: str, response: dict, error: Optional[Exception]):
+            key = chunk[int(request_id)][0]
+            if error is None:
+                items[key].extend(response.get(items_key, []))
+                page_token = response.get("nextPageToken")
+                if page_token:
+                    continuations.append((key, page_token))
+                    return
+            else:
+                errors[key] = error
+            finished[key] = time.perf_counter() - start
+
+        batch = google_clients.new_batch("classroom", "v1", callback)
+        for index, (key, page_token) in enumerate(chunk):
+            batch.add(make_request(service, key, page_token), request_id=str(index))
+        try:
+            batch.execute()
+        except Exception as error:
+            for key, _ in chunk:
+                errors.setdefault(key, error)
+                finished[key] = time.perf_counter() - start
+            return []
+        return continuations
+
+    pending: List[Tuple[Hashable, Optional[str]]] = [(key, None) for key in keys]
+    with ThreadPoolExecutor(max_workers=max(1, max_concurrent)) as pool:
+        while pending:
+            chunks = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+            pending = [continuation for sent in pool.map(send, chunks) for continuation in sent]
+
+    return {
+        key: Listing([] if key in errors else items[key], finished.get(key, 0.0), errors.get(key))
+        for key in keys
+    }
@@ -0,0 +1,76 @@
+"""
+Paginated reads from the Classroom API.
+
+The per-course fan-outs go through classroom_batch: the calls are packed into
+batch requests, so listing every roster or submission of a school costs a
+handful of HTTP exchanges instead of one per page.
+"""
+from typing import Callable, Dict, Iterable, List, Optional
+
+from google.oauth2.credentials import Credentials
+
+from . import classroom_batch
+
+PAGE_SIZE = 100
+
+
+def list_all(make_request: Callable[[Optional[str]], object], items_key: str) -> List[dict]:
+    """Follows nextPageToken until the listing is exhausted."""
+    items = []
+    page_token = None
+    while True:
+        response = make_request(page_token).execute()
+        items.extend(response.get(items_key, []))
+        page_token = response.get("nextPageToken")
+        if not page_token:
+            return items
+
+
+def _raise_first_error(listings: Dict[str, classroom_batch.Listing]) -> Dict[str, List[dict]]:
+    for listing in listings.values():
+        if listing.error is not None:
+            raise listing.error
+    return {key: listing.items for key, listing in listings.items()}
+
+
+def fetch_course_submissions(
+    credentials: Credentials,
+    course_ids: Iterable[str],
+    fields: str = "studentSubmissions(courseWorkId,userId,assignedGrade,updateTime),nextPageToken",
+) -> Dict[str, List[dict]]:
+    """Every student submission of each course (all of its course work), in batches."""
+    listings = classroom_batch.list_batched(
+        credentials,
+        course_ids,
+        lambda service, course_id, page_token: service.courses().courseWork().studentSubmissions().list(
+            courseId=course_id,
+            courseWorkId="-",
+            pageSize=PAGE_SIZE,
+            pageToken=page_token,
+            fields=fields,
+        ),
+        "studentSubmissions",
+    )
+    return _raise_first_error(listings)
+
+
+def fetch_rosters(
+    credentials: Credentials,
+    course_ids: Iterable[str],
+    fields: str = "students(userId,profile(name(fullName))),nextPageToken",
+) -> Dict[str, classroom_batch.Listing]:
+    """
+    The student roster of each course, in batches. A failing course does not
+    stop the others: its listing carries the error instead.
+    """
+    return classroom_batch.list_batched(
+        credentials,
+        course_ids,
+        lambda service, course_id, page_token: service.courses().students().list(
+            courseId=course_id,
+            pageSize=PAGE_SIZE,
+            pageToken=page_token,
+            fields=fields,
+        ),
+        "students",
+    )
@@ -0,0 +1,176 @@
+"""
+Incremental import of Classroom grades into the local grade tables.
+
+Each linked course is listed once (courseWorkId "-", all of its course work,
+concurrently across courses). Submissions are matched to local assignments
+through classroom_asg_id and to students through Student.classroom_user_id.
+The Classroom API cannot filter submissions by update time, so the
+high-water mark kept per course work (ClassroomGradeSyncState) prunes the
+work after the download: submissions not updated since the last import are
+neither written nor reported to the grade tracker. A mark only covers the
+local assignments linked to the course work and the course's mapped students
+when it was written (its scope_hash); once either changes, e.g. a student is
+mapped or a second assignment is linked, the mark is ignored and the course
+work is imported in full again. An assignedGrade that was removed in
+Classroom removes the local grade.
+"""
+import hashlib
+import json
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from google.oauth2.credentials import Credentials
+from sqlalchemy import case, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from ..crud import assignment_registry, crud_grade
+from ..models import models
+from . import classroom_fetch
+from .grade_tracker import grade_tracker
+
+
+def parse_update_time(value: Optional[str]) -> Optional[datetime]:
+    """RFC 3339 timestamp (e.g. 2025-10-01T17:04:05.123456789Z) as naive UTC."""
+    if not value:
+        return None
+    value = value.rstrip("Z")
+    if "." in value:
+        whole, fraction = value.split(".", 1)
+        value = f"{whole}.{fraction[:6]}"
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _linked_assignments(db: Session, topic_id: Optional[int]) -> Dict[str, List[Tuple[str, int, int]]]:
+    """classroom_asg_id -> [(category key, assignment_id, subject_id)]."""
+    linked = defaultdict(list)
+    for key, category in assignment_registry.BY_KEY.items():
+        assignment = category.assignment_model
+        query = (
+            select(assignment.id, assignment.classroom_asg_id, models.Topic.subject_id)
+            .join(models.Topic, models.Topic.id == assignment.topic_id)
+            .where(assignment.classroom_asg_id.isnot(None))
+        )
+        if topic_id:
+            query = query.where(assignment.topic_id == topic_id)
+        for assignment_id, classroom_asg_id, subject_id in db.execute(query):
+            linked[classroom_asg_id].append((key, assignment_id, subject_id))
+    return linked
+
+
+def scope_hash(targets: Iterable[Tuple[str, int, int]], student_ids: Iterable[int]) -> str:
+    """Fingerprint of the local assignments and students a course work's mark covers."""
+    payload = json.dumps([sorted((key, assignment_id) for key, assignment_id, _ in targets), sorted(student_ids)])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def import_classroom_grades(
+    db: Session,
+    credentials: Credentials,
+    group_ids: Optional[Iterable[int]] = None,
+    topic_id: Optional[int] = None,
+    full: bool = False,
+) -> dict:
+    """
+    Imports the grades of the linked groups (default: all of them), optionally
+    only for one topic's assignments. `full` ignores the high-water marks.
+    """
+    courses = (
+        db.query(models.ClassroomGroup.classroom_course_id, models.Group.id, models.Group.subject_id)
+        .join(models.Group, models.Group.id == models.ClassroomGroup.group_id)
+    )
+    if group_ids is not None:
+        courses = courses.filter(models.Group.id.in_(list(group_ids)))
+    course_groups = {course_id: (group_id, subject_id) for course_id, group_id, subject_id in courses}
+    linked = _linked_assignments(db, topic_id)
+    result = {"courses": len(course_groups), "submissions_seen": 0, "grades_written": 0, "grades_deleted": 0}
+    if not course_groups or not linked:
+        return result
+
+    students = {}
+    group_students = defaultdict(set)
+    for student_id, group_id, classroom_user_id in db.query(
+        models.Student.id, models.Student.group_id, models.Student.classroom_user_id
+    ).filter(
+        models.Student.group_id.in_([group_id for group_id, _ in course_groups.values()]),
+        models.Student.classroom_user_id.isnot(None),
+    ):
+        students[(group_id, classroom_user_id)] = student_id
+        group_students[group_id].add(student_id)
+    states = {} if full else {
+        (state.classroom_course_id, state.classroom_asg_id): (state.last_update_time, state.scope_hash)
+        for state in db.query(models.ClassroomGradeSyncState)
+        .filter(models.ClassroomGradeSyncState.classroom_course_id.in_(list(course_groups)))
+    }
+
+    submissions = classroom_fetch.fetch_course_submissions(credentials, course_groups)
+
+    upserts = defaultdict(list)
+    deletes = defaultdict(list)
+    changed = defaultdict(set)
+    newest: Dict[Tuple[str, str], datetime] = {}
+    scopes: Dict[Tuple[str, str], str] = {}
+    for course_id, course_submissions in submissions.items():
+        group_id, subject_id = course_groups[course_id]
+        for submission in course_submissions:
+            result["submissions_seen"] += 1
+            classroom_asg_id = submission.get("courseWorkId")
+            targets = [t for t in linked.get(classroom_asg_id, ()) if t[2] == subject_id]
+            student_id = students.get((group_id, submission.get("userId")))
+            if not targets or student_id is None:
+                continue
+            key = (course_id, classroom_asg_id)
+            if key not in scopes:
+                scopes[key] = scope_hash(targets, group_students[group_id])
+            updated = parse_update_time(submission.get("updateTime"))
+            mark, mark_scope = states.get(key, (None, None))
+            if mark_scope != scopes[key]:
+                mark = None
+            if updated is not None:
+                if mark is not None and updated <= mark:
+                    continue
+                newest[key] = max(updated, newest.get(key, updated))
+
+            grade = submission.get("assignedGrade")
+            for category_key, assignment_id, _ in targets:
+                if grade is None:
+                    deletes[category_key].append((student_id, assignment_id))
+                else:
+                    upserts[category_key].append({"student_id": student_id, "assignment_id": assignment_id, "grade": grade})
+                changed[(category_key, assignment_id)].add(student_id)
+
+    for key, category in assignment_registry.BY_KEY.items():
+        result["grades_written"] += crud_grade.upsert_grades(db, category.grade_model, upserts[key])
+        result["grades_deleted"] += crud_grade.delete_grades(db, category.grade_model, deletes[key])
+
+    if newest:
+        state = models.ClassroomGradeSyncState
+        stmt = insert(state).values([
+            {
+                "classroom_course_id": course_id, "classroom_asg_id": classroom_asg_id,
+                "last_update_time": updated, "scope_hash": scopes[(course_id, classroom_asg_id)],
+            }
+            for (course_id, classroom_asg_id), updated in newest.items()
+        ])
+        db.execute(stmt.on_conflict_do_update(
+            constraint="_course_asg_uc",
+            set_={
+                # A mark written for another scope is replaced, not merged.
+                "last_update_time": case(
+                    (state.scope_hash == stmt.excluded.scope_hash,
+                     func.greatest(state.last_update_time, stmt.excluded.last_update_time)),
+                    else_=stmt.excluded.last_update_time,
+                ),
+                "scope_hash": stmt.excluded.scope_hash,
+                "last_synced_at": func.now(),
+            },
+        ))
+    db.commit()
+
+    for (category_key, assignment_id), student_ids in changed.items():
+        grade_tracker.mark_grades(assignment_registry.BY_KEY[category_key].grade_model, assignment_id, student_ids)
+    return result
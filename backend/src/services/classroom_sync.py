@@ -3,15 +3,20 @@ Parse Google Classroom course titles and bootstrap Subjects + Groups.
 """
 import re
 import json
+import time
+import hashlib
 import unicodedata
-from typing import Optional, Dict, List, Set
+from datetime import datetime
+from typing import Callable, Optional, Dict, List, Set
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
 
 from ..models import models
 from ..crud import crud_student
 from ..schemas import student as student_schema
+from . import classroom_fetch, google_clients
+from .classroom_grade_import import parse_update_time
 
 # Distinct palettes so subjects/groups look varied in the Workspace.
 SUBJECT_COLORS = [
@@ -110,62 +115,113 @@ def _parse_full_name(full_name: str) -> Dict[str, str]:
 
 
 def _fetch_active_courses(credentials: Credentials) -> List[dict]:
-    service = build("classroom", "v1", credentials=credentials)
-    results = service.courses().list(
-        pageSize=100,
-        fields="courses(id,name,courseState),nextPageToken",
-    ).execute()
-    courses = results.get("courses", [])
-    # Paginate if needed
-    page_token = results.get("nextPageToken")
-    while page_token:
-        results = service.courses().list(
+    service = google_clients.classroom(credentials)
+    courses = classroom_fetch.list_all(
+        lambda page_token: service.courses().list(
             pageSize=100,
             pageToken=page_token,
-            fields="courses(id,name,courseState),nextPageToken",
-        ).execute()
-        courses.extend(results.get("courses", []))
-        page_token = results.get("nextPageToken")
-
+            fields="courses(id,name,courseState,updateTime),nextPageToken",
+        ),
+        "courses",
+    )
     return [c for c in courses if c.get("courseState") == "ACTIVE"]
 
 
-def _fetch_roster(credentials: Credentials, course_id: str) -> List[dict]:
-    service = build("classroom", "v1", credentials=credentials)
-    students = []
-    page_token = None
-    while True:
-        response = service.courses().students().list(
-            courseId=course_id,
-            pageSize=100,
-            pageToken=page_token,
-            fields="students(userId,profile(name(fullName))),nextPageToken",
-        ).execute()
-        students.extend(response.get("students", []))
-        page_token = response.get("nextPageToken")
-        if not page_token:
-            break
-    return students
+def _roster_payload(roster: List[dict]) -> List[student_schema.StudentFromClassroom]:
+    students_payload = []
+    for roster_student in roster:
+        full_name = (
+            roster_student.get("profile", {})
+            .get("name", {})
+            .get("fullName", "")
+        )
+        names = _parse_full_name(full_name)
+        students_payload.append(
+            student_schema.StudentFromClassroom(
+                first_name=names["first_name"] or "Student",
+                last_name=names["last_name"] or "",
+                classroom_user_id=roster_student.get("userId"),
+            )
+        )
+    return students_payload
+
+
+def roster_hash(roster: List[dict]) -> str:
+    """Order-independent fingerprint of a roster (user ids and names)."""
+    entries = sorted(
+        (s.get("userId") or "", s.get("profile", {}).get("name", {}).get("fullName", ""))
+        for s in roster
+    )
+    return hashlib.sha256(json.dumps(entries).encode()).hexdigest()
+
+
+def _reconcile_roster(db: Session, group_id: int, roster: List[dict]) -> Dict[str, int]:
+    """
+    Makes the group's Classroom students match the roster: new ones are
+    created, ones no longer enrolled become inactive and returning ones
+    active again. Students added by hand (no classroom_user_id) are left alone.
+    """
+    enrolled = {s.get("userId") for s in roster if s.get("userId")}
+    known = {
+        student.classroom_user_id: student
+        for student in db.query(models.Student).filter(
+            models.Student.group_id == group_id,
+            models.Student.classroom_user_id.isnot(None),
+        )
+    }
+    deactivated = reactivated = 0
+    for classroom_user_id, student in known.items():
+        if classroom_user_id not in enrolled and student.status == 'active':
+            student.status = 'inactive'
+            deactivated += 1
+        elif classroom_user_id in enrolled and student.status == 'inactive':
+            student.status = 'active'
+            reactivated += 1
+
+    new_students = [s for s in roster if s.get("userId") and s.get("userId") not in known]
+    created = crud_student.create_students_from_roster(db=db, group_id=group_id, students=_roster_payload(new_students)) if new_students else []
+    return {"created": len(created), "deactivated": deactivated, "reactivated": reactivated}
 
 
 def sync_workspace_from_classroom(
     db: Session,
     teacher: models.Teacher,
     credentials: Optional[Credentials] = None,
+    progress: Optional[Callable[[dict], None]] = None,
 ) -> dict:
     """
     Create subjects and groups from Active Classroom courses.
     Idempotent: skips already-linked courses and existing grade+letter+subject groups.
-    Also imports Classroom rosters into newly created/linked groups.
+    Also keeps the rosters of linked groups in step with Classroom: the
+    rosters are fetched in batch requests first, then applied in course order.
+
+    ClassroomCourseSyncState makes repeated runs incremental: a linked course
+    whose updateTime has not moved skips the subject/group step, and a roster
+    whose hash matches the last run costs no database work. Classroom does not
+    move a course's updateTime when its enrollment changes, so rosters are
+    still listed on every run, but all of them together are a batch request
+    or two; an unchanged account costs about two HTTP exchanges.
+    `progress`, if given, receives the running counts before each course.
     """
     if credentials is None:
         if not teacher.google_credentials:
             raise ValueError("Teacher has no Google credentials.")
         creds_info = json.loads(teacher.google_credentials)
-        credentials = Credentials.from_authorized_user_info(creds_info)
+        credentials = google_clients.credentials_from_info(creds_info)
 
     courses = _fetch_active_courses(credentials)
 
+    linked_groups_by_course = dict(db.query(models.ClassroomGroup.classroom_course_id, models.ClassroomGroup.group_id).all())
+    previously_linked = set(linked_groups_by_course)
+    states = {state.classroom_course_id: state for state in db.query(models.ClassroomCourseSyncState)}
+    roster_course_ids = [
+        course.get("id") for course in courses
+        if parse_classroom_course_title(course.get("name") or "")
+    ]
+    roster_start = time.perf_counter()
+    rosters = classroom_fetch.fetch_rosters(credentials, roster_course_ids)
+    roster_seconds = time.perf_counter() - roster_start
+
     used_subject_colors = {s.color for s in db.query(models.Subject).all()}
     used_group_colors = {g.color for g in db.query(models.Group).all()}
 
@@ -178,13 +234,60 @@ def sync_workspace_from_classroom(
     created_groups = 0
     linked_groups = 0
     imported_students = 0
+    deactivated_students = 0
+    reactivated_students = 0
+    unchanged_courses = 0
+    unchanged_rosters = 0
     skipped = 0
     unparsed = []
+    course_timings = []
+    errors = []
+    synced_courses: Dict[str, Optional[datetime]] = {}
+    roster_hashes: Dict[str, tuple] = {}
+
+    def report(courses_done: int):
+        if progress is not None:
+            progress({
+                "courses_total": len(courses),
+                "courses_done": courses_done,
+                "students_imported": imported_students,
+                "errors": errors,
+            })
+
+    def sync_roster(course_id: str, course_name: str, group_id: int):
+        nonlocal imported_students, deactivated_students, reactivated_students, unchanged_rosters
+        roster_result = rosters.get(course_id)
+        if roster_result is None:
+            return
+        course_timings.append({
+            "course_id": course_id,
+            "course_name": course_name,
+            "seconds": round(roster_result.seconds, 3),
+            "students": len(roster_result.items),
+            "error": str(roster_result.error) if roster_result.error else None,
+        })
+        try:
+            if roster_result.error:
+                raise roster_result.error
+            fingerprint = roster_hash(roster_result.items)
+            state = states.get(course_id)
+            if state is not None and state.roster_hash == fingerprint and course_id in previously_linked:
+                unchanged_rosters += 1
+                return
+            changes = _reconcile_roster(db, group_id, roster_result.items)
+            imported_students += changes["created"]
+            deactivated_students += changes["deactivated"]
+            reactivated_students += changes["reactivated"]
+            roster_hashes[course_id] = (fingerprint, len(roster_result.items))
+        except Exception as roster_err:
+            print(f"Roster import failed for course {course_id}: {roster_err}")
+            errors.append({"course_id": course_id, "course_name": course_name, "error": str(roster_err)})
 
     subject_color_index = len(subjects_by_name)
     group_color_index = db.query(models.Group).count()
 
-    for course in courses:
+    for courses_done, course in enumerate(courses):
+        report(courses_done)
         course_id = course.get("id")
         course_name = course.get("name") or ""
         parsed = parse_classroom_course_title(course_name)
@@ -194,6 +297,21 @@ def sync_workspace_from_classroom(
             skipped += 1
             continue
 
+        update_time = parse_update_time(course.get("updateTime"))
+        synced_courses[course_id] = update_time
+        linked_group_id = linked_groups_by_course.get(course_id)
+
+        # --- Linked and untouched since the last sync: only the roster can have changed ---
+        state = states.get(course_id)
+        if (
+            linked_group_id is not None and state is not None and update_time is not None
+            and state.course_update_time is not None and update_time <= state.course_update_time
+        ):
+            unchanged_courses += 1
+            skipped += 1
+            sync_roster(course_id, course_name, linked_group_id)
+            continue
+
         subject_name = parsed["subject_name"]
         grade = parsed["grade"]
         letter = parsed["group_letter"]
@@ -216,13 +334,9 @@ def sync_workspace_from_classroom(
             created_subjects += 1
 
         # --- Already linked to this Classroom course? ---
-        existing_link = (
-            db.query(models.ClassroomGroup)
-            .filter(models.ClassroomGroup.classroom_course_id == course_id)
-            .first()
-        )
-        if existing_link:
+        if linked_group_id is not None:
             skipped += 1
+            sync_roster(course_id, course_name, linked_group_id)
             continue
 
         # --- Group (get or create by subject + grade + letter) ---
@@ -261,43 +375,39 @@ def sync_workspace_from_classroom(
             )
         )
         db.flush()
+        linked_groups_by_course[course_id] = db_group.id
 
         # Import roster (same as manual group create)
-        try:
-            roster = _fetch_roster(credentials, course_id)
-            students_payload = []
-            for roster_student in roster:
-                full_name = (
-                    roster_student.get("profile", {})
-                    .get("name", {})
-                    .get("fullName", "")
-                )
-                names = _parse_full_name(full_name)
-                students_payload.append(
-                    student_schema.StudentFromClassroom(
-                        first_name=names["first_name"] or "Student",
-                        last_name=names["last_name"] or "",
-                        classroom_user_id=roster_student.get("userId"),
-                    )
-                )
-            if students_payload:
-                created = crud_student.create_students_from_roster(
-                    db=db,
-                    group_id=db_group.id,
-                    students=students_payload,
-                )
-                imported_students += len(created)
-        except Exception as roster_err:
-            print(f"Roster import failed for course {course_id}: {roster_err}")
-
+        sync_roster(course_id, course_name, db_group.id)
+
+    # --- Remember what this run saw ---
+    for course_id, update_time in synced_courses.items():
+        state = states.get(course_id)
+        if state is None:
+            state = models.ClassroomCourseSyncState(classroom_course_id=course_id)
+            db.add(state)
+        if update_time is not None:
+            state.course_update_time = update_time
+        if course_id in roster_hashes:
+            state.roster_hash, state.roster_size = roster_hashes[course_id]
+        state.last_synced_at = func.now()
+
+    report(len(courses))
     db.commit()
 
     return {
         "courses_seen": len(courses),
+        "courses_unchanged": unchanged_courses,
+        "rosters_unchanged": unchanged_rosters,
         "subjects_created": created_subjects,
         "groups_created": created_groups,
         "groups_linked": linked_groups,
         "students_imported": imported_students,
+        "students_deactivated": deactivated_students,
+        "students_reactivated": reactivated_students,
         "skipped": skipped,
         "unparsed_titles": unparsed,
+        "roster_fetch_seconds": round(roster_seconds, 3),
+        "course_timings": course_timings,
+        "errors": errors,
     }
@@ -0,0 +1,136 @@
+"""
+Process-wide factory for Google API clients.
+
+googleapiclient's build() reads and parses the discovery document and sets
+up a new HTTP transport on every call. Here each (api, version) discovery
+document is loaded from the library's static copy and parsed once per
+process, credentials are cached per stored token, and authorized service
+objects are cached per credentials.
+
+A cached service can be shared by any number of threads: its transport
+(ThreadLocalHttp) gives each thread its own httplib2 connection pool, and
+the discovery document is primed before first use so building requests
+never mutates it concurrently.
+"""
+import json
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional, Tuple
+from urllib.parse import urljoin
+
+import google_auth_httplib2
+import httplib2
+from google.oauth2.credentials import Credentials
+from googleapiclient.discovery import Resource, build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+from googleapiclient.http import BatchHttpRequest
+
+MAX_CACHED = 32
+
+# api name -> base URL, for pointing a client at a local fake or emulator.
+API_ENDPOINTS: Dict[str, str] = {}
+
+_lock = threading.Lock()
+_documents: Dict[Tuple[str, str], dict] = {}
+_credentials: "OrderedDict[Hashable, Credentials]" = OrderedDict()
+_services: "OrderedDict[Tuple[str, str, int], Tuple[Credentials, Resource]]" = OrderedDict()
+
+
+class ThreadLocalHttp:
+    """An authorized transport with one httplib2 connection pool per thread."""
+
+    def __init__(self, credentials: Credentials):
+        self.credentials = credentials
+        self._local = threading.local()
+
+    @property
+    def http(self) -> google_auth_httplib2.AuthorizedHttp:
+        http = getattr(self._local, "http", None)
+        if http is None:
+            http = self._local.http = google_auth_httplib2.AuthorizedHttp(self.credentials, http=httplib2.Http())
+        return http
+
+    def request(self, *args, **kwargs):
+        return self.http.request(*args, **kwargs)
+
+    def close(self):
+        http = getattr(self._local, "http", None)
+        if http is not None:
+            http.close()
+
+
+def _prime(resource: Resource, description: dict):
+    """Builds every nested resource once, applying the library's in-place fix-ups to the document."""
+    for name, nested in description.get("resources", {}).items():
+        _prime(getattr(resource, name)(), nested)
+
+
+def discovery_document(api: str, version: str) -> dict:
+    """The parsed (and primed) static discovery document of an API."""
+    key = (api, version)
+    with _lock:
+        document = _documents.get(key)
+        if document is None:
+            content = get_static_doc(api, version)
+            if content is None:
+                raise ValueError(f"No static discovery document for {api} {version}.")
+            document = json.loads(content)
+            _prime(build_from_document(document, http=httplib2.Http()), document)
+            _documents[key] = document
+        return document
+
+
+def _remember(cache: OrderedDict, key, value):
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > MAX_CACHED:
+        cache.popitem(last=False)
+
+
+def credentials_from_info(info: dict) -> Credentials:
+    """
+    Credentials for an authorized-user JSON (Teacher.google_credentials).
+    The same refresh token yields the same object, so a refreshed access
+    token is reused across requests instead of being refreshed again.
+    """
+    key = json.dumps({k: v for k, v in info.items() if k not in ("token", "expiry")}, sort_keys=True)
+    with _lock:
+        credentials = _credentials.get(key)
+        if credentials is None:
+            credentials = Credentials.from_authorized_user_info(info)
+        _remember(_credentials, key, credentials)
+        return credentials
+
+
+def service(api: str, version: str, credentials: Credentials) -> Resource:
+    """A shared, thread-safe authorized service object."""
+    document = discovery_document(api, version)
+    key = (api, version, id(credentials))
+    with _lock:
+        cached = _services.get(key)
+        if cached is not None and cached[0] is credentials:
+            _services.move_to_end(key)
+            return cached[1]
+    client_options = {"api_endpoint": API_ENDPOINTS[api]} if api in API_ENDPOINTS else None
+    resource = build_from_document(document, http=ThreadLocalHttp(credentials), client_options=client_options)
+    with _lock:
+        _remember(_services, key, (credentials, resource))
+    return resource
+
+
+def classroom(credentials: Credentials) -> Resource:
+    return service("classroom", "v1", credentials)
+
+
+def new_batch(api: str, version: str, callback: Optional[Callable] = None) -> BatchHttpRequest:
+    """An empty batch request against the API's own batch endpoint."""
+    document = discovery_document(api, version)
+    root = API_ENDPOINTS.get(api, document["rootUrl"])
+    return BatchHttpRequest(callback=callback, batch_uri=urljoin(root, document.get("batchPath", "batch")))
+
+
+def clear():
+    """Drops cached credentials and services (discovery documents are kept)."""
+    with _lock:
+        _credentials.clear()
+        _services.clear()
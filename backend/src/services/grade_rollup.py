@@ -0,0 +1,86 @@
+"""
+Set-based rollup of StudentTopicGrade into StudentFinalGrade.
+
+Periods are numbered 1-3 by start date. A period grade is the mean of the
+student's topic grades in that period's topics of the subject, and the final
+year grade is the mean of the period grades the student has. One statement
+aggregates the topic grades with a single GROUP BY, pivots them into the
+period columns and upserts them ON CONFLICT (student_id, subject_id).
+
+Scopes combine: students, subjects and groups (default: the whole school).
+"""
+from typing import Iterable, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+_SCOPE = """
+    (CAST(:student_ids AS integer[]) IS NULL OR {student} = ANY(CAST(:student_ids AS integer[])))
+    AND (CAST(:subject_ids AS integer[]) IS NULL OR {subject} = ANY(CAST(:subject_ids AS integer[])))
+    AND (CAST(:group_ids AS integer[]) IS NULL OR {student} IN (
+        SELECT id FROM students WHERE group_id = ANY(CAST(:group_ids AS integer[]))
+    ))
+"""
+
+_ROLLUP_SQL = text("""
+    WITH period_slots AS (
+        SELECT id, row_number() OVER (ORDER BY start_date, id) AS slot FROM periods
+    ),
+    pivoted AS (
+        SELECT g.student_id, t.subject_id,
+               avg(g.calculated_grade) FILTER (WHERE ps.slot = 1) AS p1,
+               avg(g.calculated_grade) FILTER (WHERE ps.slot = 2) AS p2,
+               avg(g.calculated_grade) FILTER (WHERE ps.slot = 3) AS p3
+        FROM student_topic_grades g
+        JOIN topics t ON t.id = g.topic_id
+        JOIN period_slots ps ON ps.id = t.period_id
+        WHERE ps.slot <= 3 AND """ + _SCOPE.format(student="g.student_id", subject="t.subject_id") + """
+        GROUP BY g.student_id, t.subject_id
+    )
+    INSERT INTO student_final_grades
+        (student_id, subject_id, period_1_grade, period_2_grade, period_3_grade, final_year_grade)
+    SELECT student_id, subject_id, round(p1, 2), round(p2, 2), round(p3, 2),
+           round((coalesce(p1, 0) + coalesce(p2, 0) + coalesce(p3, 0))
+                 / ((p1 IS NOT NULL)::int + (p2 IS NOT NULL)::int + (p3 IS NOT NULL)::int), 2)
+    FROM pivoted
+    ON CONFLICT ON CONSTRAINT _student_subject_uc DO UPDATE
+    SET period_1_grade = excluded.period_1_grade,
+        period_2_grade = excluded.period_2_grade,
+        period_3_grade = excluded.period_3_grade,
+        final_year_grade = excluded.final_year_grade
+    WHERE (student_final_grades.period_1_grade, student_final_grades.period_2_grade,
+           student_final_grades.period_3_grade, student_final_grades.final_year_grade)
+          IS DISTINCT FROM
+          (excluded.period_1_grade, excluded.period_2_grade, excluded.period_3_grade, excluded.final_year_grade)
+""")
+
+# Final grades of the scope left without any topic grade.
+_DELETE_STALE_SQL = text("""
+    DELETE FROM student_final_grades f
+    WHERE """ + _SCOPE.format(student="f.student_id", subject="f.subject_id") + """
+      AND NOT EXISTS (
+          SELECT 1 FROM student_topic_grades g JOIN topics t ON t.id = g.topic_id
+          WHERE g.student_id = f.student_id AND t.subject_id = f.subject_id
+      )
+""")
+
+
+def rollup_final_grades(
+    db: Session,
+    student_ids: Optional[Iterable[int]] = None,
+    subject_ids: Optional[Iterable[int]] = None,
+    group_ids: Optional[Iterable[int]] = None,
+) -> int:
+    """
+    Recomputes StudentFinalGrade for the given students/subjects/groups
+    (default: all). Does not commit. Returns the number of rows inserted or
+    changed.
+    """
+    params = {
+        "student_ids": None if student_ids is None else list(student_ids),
+        "subject_ids": None if subject_ids is None else list(subject_ids),
+        "group_ids": None if group_ids is None else list(group_ids),
+    }
+    written = db.execute(_ROLLUP_SQL, params).rowcount
+    db.execute(_DELETE_STALE_SQL, params)
+    return written
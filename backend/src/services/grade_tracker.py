@@ -0,0 +1,249 @@
+"""
+Dirty tracking for derived grades.
+
+Session events record what a commit changed: the (student, assignment) of
+every inserted, updated or deleted Student*Grade, and whole topics whose
+weights, period or assignment max grades changed. Writers that bypass the
+ORM (Core inserts, unnest upserts) report the same with mark_grades() /
+mark_topics(). Rolled-back changes are discarded.
+
+After a short debounce a background thread recomputes only the stale
+StudentTopicGrade rows with the grading engine, then rolls the affected
+students' StudentFinalGrade rows up again. A single grade edit costs one
+student x one topic; a weight change costs that topic. data_version is
+bumped when changes are recorded and again after every flush, so caches of
+grades and derived grades can key on it; code that rewrites derived grades
+itself (the explicit recompute and rollup endpoints) calls invalidate(), and
+deleting a student, group or subject (whose grades go by cascade) counts as
+a change.
+"""
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, Optional, Set, Tuple
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+from ..models import models
+from ..crud.assignment_registry import CATEGORIES
+from . import grade_rollup, grading_engine
+
+logger = logging.getLogger(__name__)
+
+_CATEGORY_INDEX = {category.grade_model: index for index, category in enumerate(CATEGORIES)}
+_ASSIGNMENT_MODELS = tuple(category.assignment_model for category in CATEGORIES)
+_TOPIC_GRADING_ATTRS = ('exam_weight', 'practice_weight', 'notebook_weight', 'other_weight', 'period_id')
+_CASCADING_MODELS = (models.Student, models.Group, models.Subject)
+
+# (category index, student_id, assignment_id)
+GradeRef = Tuple[int, int, int]
+
+
+class _Changes:
+    def __init__(self):
+        self.grades: Set[GradeRef] = set()
+        self.topics: Set[int] = set()
+        self.subjects: Set[int] = set()
+        # Rows deleted by cascade; nothing to recompute, but cached grades are stale.
+        self.removed = False
+
+    def merge(self, other: "_Changes"):
+        self.grades |= other.grades
+        self.topics |= other.topics
+        self.subjects |= other.subjects
+        self.removed |= other.removed
+
+    def __bool__(self) -> bool:
+        return bool(self.grades or self.topics or self.subjects or self.removed)
+
+
+def _values(state, attr: str) -> Set[int]:
+    """Current and pre-flush values of an attribute, without loading anything."""
+    history = state.attrs[attr].history
+    return {value for value in (*history.added, *history.unchanged, *history.deleted) if value is not None}
+
+
+def _changed(state, attrs: Iterable[str]) -> bool:
+    return any(state.attrs[attr].history.has_changes() for attr in attrs)
+
+
+class GradeTracker:
+    def __init__(self, delay: float = 1.0, max_delay: float = 5.0):
+        self.delay = delay
+        self.max_delay = max_delay
+        self.session_factory: Optional[Callable[[], Session]] = None
+        self.data_version = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending = _Changes()
+        self._pending_since: Optional[float] = None
+        self._timer: Optional[threading.Timer] = None
+
+    # Recording
+
+    def mark_grades(self, grade_model, assignment_id: int, student_ids: Iterable[int]):
+        """Marks the grades of `student_ids` on one assignment as changed."""
+        index = _CATEGORY_INDEX[grade_model]
+        changes = _Changes()
+        changes.grades = {(index, student_id, assignment_id) for student_id in student_ids}
+        self._add(changes)
+
+    def mark_topics(self, topic_ids: Iterable[int]):
+        """Marks every student's grade in the topics as stale."""
+        changes = _Changes()
+        changes.topics = set(topic_ids)
+        self._add(changes)
+
+    def invalidate(self):
+        """Bumps data_version after derived grades were rewritten outside the tracker."""
+        with self._lock:
+            self.data_version += 1
+
+    def _add(self, changes: _Changes):
+        if not changes:
+            return
+        with self._lock:
+            self._pending.merge(changes)
+            self.data_version += 1
+            self._schedule(self.delay)
+
+    def _schedule(self, delay: float):
+        """(Re)starts the debounce timer; called with self._lock held."""
+        now = time.monotonic()
+        if self._pending_since is None:
+            self._pending_since = now
+        if self._timer is not None:
+            if now - self._pending_since >= self.max_delay:
+                return
+            self._timer.cancel()
+        self._timer = threading.Timer(delay, self._run)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _collect(self, session: Session):
+        changes = session.info.setdefault('grade_tracker', _Changes())
+        for obj in (*session.new, *session.dirty, *session.deleted):
+            state = inspect(obj)
+            index = _CATEGORY_INDEX.get(type(obj))
+            if index is not None:
+                for student_id in _values(state, 'student_id'):
+                    for assignment_id in _values(state, 'assignment_id'):
+                        changes.grades.add((index, student_id, assignment_id))
+            elif isinstance(obj, _ASSIGNMENT_MODELS):
+                if obj in session.deleted or _changed(state, ('max_grade', 'topic_id')):
+                    changes.topics |= _values(state, 'topic_id')
+            elif isinstance(obj, models.Topic):
+                if obj in session.deleted:
+                    changes.subjects |= _values(state, 'subject_id')
+                elif obj not in session.new and _changed(state, _TOPIC_GRADING_ATTRS):
+                    changes.topics.add(obj.id)
+            elif isinstance(obj, _CASCADING_MODELS) and obj in session.deleted:
+                changes.removed = True
+
+    def install(self):
+        """Registers the session listeners (idempotent)."""
+        if event.contains(Session, 'after_flush', self._after_flush):
+            return
+        event.listen(Session, 'after_flush', self._after_flush)
+        event.listen(Session, 'after_commit', self._after_commit)
+        event.listen(Session, 'after_rollback', self._after_rollback)
+
+    def _after_flush(self, session: Session, flush_context):
+        self._collect(session)
+
+    def _after_commit(self, session: Session):
+        changes = session.info.pop('grade_tracker', None)
+        if changes:
+            self._add(changes)
+
+    def _after_rollback(self, session: Session):
+        session.info.pop('grade_tracker', None)
+
+    # Flushing
+
+    def _run(self):
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Grade recomputation failed; the changes stay pending.")
+
+    def flush(self) -> bool:
+        """Recomputes everything pending now. Returns False if nothing was pending."""
+        with self._flush_lock:
+            with self._lock:
+                changes, self._pending = self._pending, _Changes()
+                self._pending_since = None
+                self._timer = None
+            if not changes:
+                return False
+            try:
+                self._recompute(changes)
+            except Exception:
+                # Retry on a timer of their own rather than waiting for the next mark.
+                with self._lock:
+                    self._pending.merge(changes)
+                    self._schedule(self.max_delay)
+                raise
+            with self._lock:
+                self.data_version += 1
+            return True
+
+    def _session(self) -> Session:
+        if self.session_factory is None:
+            from ..database import SessionLocal
+            self.session_factory = SessionLocal
+        return self.session_factory()
+
+    def _recompute(self, changes: _Changes):
+        db = self._session()
+        try:
+            pair_topics, pair_students = self._resolve_grades(db, changes.grades)
+            pair_topics -= changes.topics
+
+            if changes.topics:
+                grading_engine.recompute_topic_grades(db, topic_ids=changes.topics)
+            if pair_topics:
+                grading_engine.recompute_topic_grades(db, topic_ids=pair_topics, student_ids=pair_students)
+
+            subjects = self._topic_subjects(db, changes.topics)
+            if subjects or changes.subjects:
+                grade_rollup.rollup_final_grades(db, subject_ids=subjects | changes.subjects)
+            pair_subjects = self._topic_subjects(db, pair_topics) - subjects - changes.subjects
+            if pair_subjects:
+                grade_rollup.rollup_final_grades(db, student_ids=pair_students, subject_ids=pair_subjects)
+            db.commit()
+        finally:
+            db.close()
+
+    @staticmethod
+    def _resolve_grades(db: Session, grades: Set[GradeRef]) -> Tuple[Set[int], Set[int]]:
+        """Topics and students touched by the grade changes (deleted assignments resolve to nothing)."""
+        by_category: Dict[int, Set[int]] = defaultdict(set)
+        for index, _, assignment_id in grades:
+            by_category[index].add(assignment_id)
+        topic_of: Dict[Tuple[int, int], int] = {}
+        for index, assignment_ids in by_category.items():
+            assignment = CATEGORIES[index].assignment_model
+            rows = db.execute(select(assignment.id, assignment.topic_id).where(assignment.id.in_(assignment_ids)))
+            topic_of.update({(index, assignment_id): topic_id for assignment_id, topic_id in rows})
+
+        topics, students = set(), set()
+        for index, student_id, assignment_id in grades:
+            topic_id = topic_of.get((index, assignment_id))
+            if topic_id is not None:
+                topics.add(topic_id)
+                students.add(student_id)
+        return topics, students
+
+    @staticmethod
+    def _topic_subjects(db: Session, topic_ids: Set[int]) -> Set[int]:
+        if not topic_ids:
+            return set()
+        return set(db.execute(
+            select(models.Topic.subject_id).where(models.Topic.id.in_(topic_ids)).distinct()
+        ).scalars())
+
+
+grade_tracker = GradeTracker()
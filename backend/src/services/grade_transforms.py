@@ -0,0 +1,102 @@
+"""
+Bulk grade transformations as set operations.
+
+Each operation is one statement per grade table in scope (one table for an
+assignment, up to four for a topic):
+
+    curve         UPDATE ... FROM: grade = clamp(slope * grade + offset, 0, max_grade)
+    cap           UPDATE ... FROM: grade = value where grade > value
+    rescale       UPDATE ... FROM: grade = grade * new_max / max_grade, then
+                  the assignments' max_grade = new_max
+    fill_missing  INSERT ... SELECT: value (at most max_grade) for every active
+                  student of the subject without a grade, ON CONFLICT DO NOTHING
+
+Statements RETURN the (student, assignment) pairs they touched, so only those
+are reported to the grade tracker. Nothing here commits.
+"""
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy import Float, cast, func, literal, select, union_all, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from ..crud.assignment_registry import AssignmentCategory, CATEGORIES
+from ..models import models
+
+OPERATIONS = ('curve', 'cap', 'rescale', 'fill_missing')
+
+# (category, assignment_id or None for the whole topic, topic_id or None)
+Scope = Tuple[AssignmentCategory, Optional[int], Optional[int]]
+
+
+def scopes(category: Optional[AssignmentCategory], assignment_id: Optional[int], topic_id: Optional[int]) -> List[Scope]:
+    if assignment_id is not None:
+        return [(category, assignment_id, None)]
+    return [(each, None, topic_id) for each in CATEGORIES]
+
+
+def _in_scope(model, assignment_id: Optional[int], topic_id: Optional[int]):
+    return model.id == assignment_id if assignment_id is not None else model.topic_id == topic_id
+
+
+def normalized_grades(db: Session, targets: List[Scope]) -> np.ndarray:
+    """Every grade in scope on a 0-10 scale, in one query."""
+    parts = []
+    for category, assignment_id, topic_id in targets:
+        assignment, grade = category.assignment_model, category.grade_model
+        parts.append(
+            select((cast(grade.grade, Float) / cast(assignment.max_grade, Float) * 10.0).label('grade'))
+            .join(assignment, grade.assignment_id == assignment.id)
+            .where(_in_scope(assignment, assignment_id, topic_id), assignment.max_grade > 0)
+        )
+    return np.array(db.execute(union_all(*parts)).scalars().all(), dtype=np.float64)
+
+
+def _touched(result, category: AssignmentCategory, changed: Dict[Tuple[type, int], Set[int]]) -> int:
+    count = 0
+    for student_id, assignment_id in result:
+        changed[(category.grade_model, assignment_id)].add(student_id)
+        count += 1
+    return count
+
+
+def apply(db: Session, targets: List[Scope], operation: str, slope: float = 1.0, offset: float = 0.0,
+          value: Optional[float] = None, new_max_grade: Optional[float] = None):
+    """
+    Runs `operation` over the scopes. Returns (rows affected, {(grade_model,
+    assignment_id): student_ids}).
+    """
+    changed: Dict[Tuple[type, int], Set[int]] = defaultdict(set)
+    affected = 0
+    for category, assignment_id, topic_id in targets:
+        assignment, grade = category.assignment_model, category.grade_model
+        scope = _in_scope(assignment, assignment_id, topic_id)
+        joined = (grade.assignment_id == assignment.id, scope)
+        returning = (grade.student_id, grade.assignment_id)
+
+        if operation == 'curve':
+            new_grade = func.least(func.greatest(grade.grade * slope + offset, 0), assignment.max_grade)
+            stmt = update(grade).where(*joined, grade.grade.is_distinct_from(new_grade)).values(grade=new_grade, updated_at=func.now())
+        elif operation == 'cap':
+            stmt = update(grade).where(*joined, grade.grade > value).values(grade=value, updated_at=func.now())
+        elif operation == 'rescale':
+            new_grade = func.round(grade.grade * new_max_grade / assignment.max_grade, 2)
+            stmt = update(grade).where(*joined, assignment.max_grade > 0).values(grade=new_grade, updated_at=func.now())
+        elif operation == 'fill_missing':
+            students = (
+                select(models.Student.id, assignment.id, func.least(literal(value), assignment.max_grade))
+                .join(models.Group, models.Group.id == models.Student.group_id)
+                .join(models.Topic, models.Topic.subject_id == models.Group.subject_id)
+                .join(assignment, assignment.topic_id == models.Topic.id)
+                .where(scope, models.Student.status == 'active')
+            )
+            stmt = insert(grade).from_select(['student_id', 'assignment_id', 'grade'], students).on_conflict_do_nothing()
+        else:
+            raise ValueError(f"Unknown operation: {operation}")
+
+        affected += _touched(db.execute(stmt.returning(*returning)), category, changed)
+        if operation == 'rescale':
+            db.execute(update(assignment).where(scope).values(max_grade=new_max_grade))
+    return affected, changed
@@ -0,0 +1,153 @@
+"""
+Vectorized topic-grade computation.
+
+A student's topic grade follows the gradebook (GradesTable.jsx): in each of
+the four categories, the mean of the student's graded assignments on a 0-10
+scale (grade / max_grade * 10), weighted by the topic's category weight.
+Categories without grades contribute 0, and only students with at least one
+grade in a topic get a StudentTopicGrade row.
+
+All four grade tables are read with one UNION ALL query, the means are
+computed for every (topic, student) pair at once with np.bincount, and the
+results are written with a single unnest() upsert.
+"""
+from typing import Iterable, List, NamedTuple, Optional
+
+import numpy as np
+from sqlalchemy import Float, cast, literal, select, text, union_all
+from sqlalchemy.orm import Session
+
+from ..crud.assignment_registry import CATEGORIES
+from ..models import models
+
+
+class TopicGrades(NamedTuple):
+    """Parallel arrays, one entry per (topic, student) with at least one grade."""
+    topic_ids: np.ndarray
+    student_ids: np.ndarray
+    grades: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.topic_ids)
+
+
+def _grades_query(topic_ids: Optional[Iterable[int]], student_ids: Optional[Iterable[int]]):
+    """(topic_id, student_id, category, grade, max_grade) over all four grade tables."""
+    parts = []
+    for index, category in enumerate(CATEGORIES):
+        assignment, grade = category.assignment_model, category.grade_model
+        part = (
+            select(
+                assignment.topic_id,
+                grade.student_id,
+                literal(index).label('category'),
+                cast(grade.grade, Float).label('grade'),
+                cast(assignment.max_grade, Float).label('max_grade'),
+            )
+            .join(assignment, grade.assignment_id == assignment.id)
+        )
+        if topic_ids is not None:
+            part = part.where(assignment.topic_id.in_(list(topic_ids)))
+        if student_ids is not None:
+            part = part.where(grade.student_id.in_(list(student_ids)))
+        parts.append(part)
+    return union_all(*parts)
+
+
+def _topic_weights(db: Session, topic_ids: np.ndarray) -> np.ndarray:
+    """(len(topic_ids), 4) weights in CATEGORIES order, as fractions."""
+    columns = [cast(getattr(models.Topic, c.weight_column), Float) for c in CATEGORIES]
+    rows = db.execute(
+        select(models.Topic.id, *columns).where(models.Topic.id.in_(topic_ids.tolist()))
+    ).all()
+    by_id = {row[0]: row[1:] for row in rows}
+    return np.array([by_id[topic_id] for topic_id in topic_ids.tolist()], dtype=np.float64).reshape(-1, 4) / 100.0
+
+
+def compute_topic_grades(
+    db: Session,
+    topic_ids: Optional[Iterable[int]] = None,
+    student_ids: Optional[Iterable[int]] = None,
+) -> TopicGrades:
+    """Computes topic grades for the given topics/students (default: all)."""
+    rows = db.execute(_grades_query(topic_ids, student_ids)).all()
+    if not rows:
+        empty = np.empty(0, dtype=np.int64)
+        return TopicGrades(empty, empty, np.empty(0, dtype=np.float64))
+
+    topics, students, categories, grades, max_grades = (np.array(column) for column in zip(*rows))
+    valid = max_grades > 0
+    topics, students, categories = topics[valid].astype(np.int64), students[valid].astype(np.int64), categories[valid].astype(np.int64)
+    normalized = grades[valid].astype(np.float64) / max_grades[valid].astype(np.float64) * 10.0
+
+    keys = (topics << 32) | students
+    pair_keys, pair_index = np.unique(keys, return_inverse=True)
+    cells = pair_index * len(CATEGORIES) + categories
+    size = len(pair_keys) * len(CATEGORIES)
+    sums = np.bincount(cells, weights=normalized, minlength=size).reshape(-1, len(CATEGORIES))
+    counts = np.bincount(cells, minlength=size).reshape(-1, len(CATEGORIES))
+    means = np.divide(sums, counts, out=np.zeros_like(sums), where=counts > 0)
+
+    pair_topics = pair_keys >> 32
+    unique_topics, topic_index = np.unique(pair_topics, return_inverse=True)
+    weights = _topic_weights(db, unique_topics)[topic_index]
+
+    return TopicGrades(
+        topic_ids=pair_topics,
+        student_ids=pair_keys & 0xFFFFFFFF,
+        grades=np.round((means * weights).sum(axis=1), 2),
+    )
+
+
+_UPSERT_SQL = text("""
+    INSERT INTO student_topic_grades (student_id, topic_id, calculated_grade)
+    SELECT * FROM unnest(CAST(:student_ids AS integer[]), CAST(:topic_ids AS integer[]), CAST(:grades AS numeric[]))
+    ON CONFLICT ON CONSTRAINT _student_topic_uc DO UPDATE
+    SET calculated_grade = excluded.calculated_grade, updated_at = now()
+    WHERE student_topic_grades.calculated_grade IS DISTINCT FROM excluded.calculated_grade
+""")
+
+# Rows of the recomputed scope that the computation no longer produces.
+_DELETE_STALE_SQL = text("""
+    DELETE FROM student_topic_grades g
+    WHERE (CAST(:scope_topics AS integer[]) IS NULL OR g.topic_id = ANY(CAST(:scope_topics AS integer[])))
+      AND (CAST(:scope_students AS integer[]) IS NULL OR g.student_id = ANY(CAST(:scope_students AS integer[])))
+      AND NOT EXISTS (
+          SELECT 1 FROM unnest(CAST(:student_ids AS integer[]), CAST(:topic_ids AS integer[])) AS k(student_id, topic_id)
+          WHERE k.student_id = g.student_id AND k.topic_id = g.topic_id
+      )
+""")
+
+
+def save_topic_grades(
+    db: Session,
+    result: TopicGrades,
+    topic_ids: Optional[List[int]] = None,
+    student_ids: Optional[List[int]] = None,
+) -> int:
+    """
+    Upserts `result` in one statement and deletes the scope's rows for
+    students who no longer have grades there. Does not commit. Returns the
+    number of rows inserted or changed.
+    """
+    computed = {
+        'student_ids': result.student_ids.tolist(),
+        'topic_ids': result.topic_ids.tolist(),
+    }
+    written = 0
+    if len(result):
+        written = db.execute(_UPSERT_SQL, {**computed, 'grades': result.grades.tolist()}).rowcount
+    db.execute(_DELETE_STALE_SQL, {**computed, 'scope_topics': topic_ids, 'scope_students': student_ids})
+    return written
+
+
+def recompute_topic_grades(
+    db: Session,
+    topic_ids: Optional[Iterable[int]] = None,
+    student_ids: Optional[Iterable[int]] = None,
+) -> int:
+    """Computes and stores topic grades for a scope (default: the whole school). Does not commit."""
+    topic_ids = None if topic_ids is None else list(topic_ids)
+    student_ids = None if student_ids is None else list(student_ids)
+    result = compute_topic_grades(db, topic_ids, student_ids)
+    return save_topic_grades(db, result, topic_ids, student_ids)
@@ -0,0 +1,132 @@
+"""
+Process-local index from student QR ids to the ids attendance needs.
+
+Scanning a QR code only needs the student's id, group and subject. Keeping
+those in memory means the attendance hot path resolves a scan without a
+Student query or a lazy load of the student's group. The index is warmed at
+startup and kept current by the student/group/subject CRUD functions.
+"""
+import threading
+from typing import Dict, Iterable, NamedTuple, Optional
+from sqlalchemy.orm import Session
+
+from ..models import models
+
+
+class StudentRef(NamedTuple):
+    student_id: int
+    group_id: int
+    subject_id: int
+
+
+class QRCodeIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_qr: Dict[str, StudentRef] = {}
+        self._qr_by_student: Dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._by_qr)
+
+    def warm(self, db: Session) -> int:
+        """(Re)load every student with a QR id. Returns the number of entries."""
+        rows = (
+            db.query(
+                models.Student.id,
+                models.Student.qr_code_id,
+                models.Student.group_id,
+                models.Group.subject_id,
+            )
+            .join(models.Group, models.Student.group_id == models.Group.id)
+            .filter(models.Student.qr_code_id.isnot(None))
+            .all()
+        )
+        by_qr = {qr: StudentRef(sid, gid, subid) for sid, qr, gid, subid in rows}
+        qr_by_student = {ref.student_id: qr for qr, ref in by_qr.items()}
+        with self._lock:
+            self._by_qr = by_qr
+            self._qr_by_student = qr_by_student
+        return len(by_qr)
+
+    def resolve(self, db: Session, qr_code_id: str) -> Optional[StudentRef]:
+        """
+        Look up a QR id. A miss falls back to a single query so students
+        created by another worker process are still found (and cached).
+        """
+        ref = self._by_qr.get(qr_code_id)
+        if ref is not None:
+            return ref
+
+        row = (
+            db.query(models.Student.id, models.Student.group_id, models.Group.subject_id)
+            .join(models.Group, models.Student.group_id == models.Group.id)
+            .filter(models.Student.qr_code_id == qr_code_id)
+            .first()
+        )
+        if not row:
+            return None
+        self.put(row[0], qr_code_id, row[1], row[2])
+        return StudentRef(row[0], row[1], row[2])
+
+    def resolve_many(self, db: Session, qr_code_ids: Iterable[str]) -> Dict[str, StudentRef]:
+        """Look up many QR ids; all misses are fetched together in one query."""
+        found: Dict[str, StudentRef] = {}
+        missing = set()
+        for qr in qr_code_ids:
+            ref = self._by_qr.get(qr)
+            if ref is not None:
+                found[qr] = ref
+            else:
+                missing.add(qr)
+        if missing:
+            rows = (
+                db.query(models.Student.id, models.Student.qr_code_id, models.Student.group_id, models.Group.subject_id)
+                .join(models.Group, models.Student.group_id == models.Group.id)
+                .filter(models.Student.qr_code_id.in_(missing))
+                .all()
+            )
+            for student_id, qr, group_id, subject_id in rows:
+                self.put(student_id, qr, group_id, subject_id)
+                found[qr] = StudentRef(student_id, group_id, subject_id)
+        return found
+
+    def put(self, student_id: int, qr_code_id: Optional[str], group_id: int, subject_id: int):
+        with self._lock:
+            old_qr = self._qr_by_student.pop(student_id, None)
+            if old_qr is not None:
+                self._by_qr.pop(old_qr, None)
+            if qr_code_id:
+                self._by_qr[qr_code_id] = StudentRef(student_id, group_id, subject_id)
+                self._qr_by_student[student_id] = qr_code_id
+
+    def put_student(self, student: models.Student):
+        self.put(student.id, student.qr_code_id, student.group_id, student.group.subject_id)
+
+    def discard_student(self, student_id: int):
+        with self._lock:
+            qr = self._qr_by_student.pop(student_id, None)
+            if qr is not None:
+                self._by_qr.pop(qr, None)
+
+    def _discard_where(self, predicate):
+        with self._lock:
+            stale = [qr for qr, ref in self._by_qr.items() if predicate(ref)]
+            for qr in stale:
+                ref = self._by_qr.pop(qr)
+                self._qr_by_student.pop(ref.student_id, None)
+
+    def discard_group(self, group_id: int):
+        """Students are removed with their group (ON DELETE CASCADE)."""
+        self._discard_where(lambda ref: ref.group_id == group_id)
+
+    def discard_subject(self, subject_id: int):
+        """Groups, and so their students, are removed with their subject."""
+        self._discard_where(lambda ref: ref.subject_id == subject_id)
+
+    def clear(self):
+        with self._lock:
+            self._by_qr = {}
+            self._qr_by_student = {}
+
+
+qr_index = QRCodeIndex()
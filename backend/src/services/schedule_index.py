@@ -0,0 +1,114 @@
+"""
+Precompiled weekly schedule for strict-mode attendance.
+
+Each day of the week is compiled into sorted, non-overlapping minute
+intervals, each mapped to the class active during it. A scan then finds its
+class with a binary search instead of a WeeklySchedule query comparing
+String(5) times, and the active group's display name is available without a
+Group query. Each group's classes per day are kept too, so a scan can be tied
+to its class session. The index is rebuilt by crud_schedule whenever the schedule
+changes and invalidated when groups (and so their schedule entries) are
+deleted.
+"""
+import threading
+from bisect import bisect_right
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from ..models import models
+
+
+class ScheduleSlot(NamedTuple):
+    start_minute: int
+    end_minute: int
+    group_id: int
+    group_name: str
+    start_time: str
+    end_time: str
+
+
+def to_minutes(hhmm: str) -> int:
+    hours, minutes = hhmm.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+def _compile_day(slots: List[ScheduleSlot]) -> Tuple[List[int], List[Optional[ScheduleSlot]]]:
+    """
+    Split a day's slots into disjoint [bounds[i], bounds[i + 1]) intervals.
+    Where entries overlap, the one that started last wins.
+    """
+    bounds = sorted({s.start_minute for s in slots} | {s.end_minute for s in slots})
+    active: List[Optional[ScheduleSlot]] = []
+    for minute in bounds:
+        covering = [s for s in slots if s.start_minute <= minute < s.end_minute]
+        active.append(max(covering, key=lambda s: s.start_minute) if covering else None)
+    return bounds, active
+
+
+class ScheduleIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._days: Dict[str, Tuple[List[int], List[Optional[ScheduleSlot]]]] = {}
+        self._by_group: Dict[Tuple[str, int], List[ScheduleSlot]] = {}
+        self._loaded = False
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded
+
+    def load(self, entries: Iterable[models.WeeklySchedule]):
+        """Compile schedule entries (with their group loaded) into the index."""
+        by_day: Dict[str, List[ScheduleSlot]] = {}
+        for entry in entries:
+            by_day.setdefault(entry.day_of_week, []).append(
+                ScheduleSlot(
+                    start_minute=to_minutes(entry.start_time),
+                    end_minute=to_minutes(entry.end_time),
+                    group_id=entry.group_id,
+                    group_name=f"{entry.group.grade}{entry.group.name}",
+                    start_time=entry.start_time,
+                    end_time=entry.end_time,
+                )
+            )
+        days = {day: _compile_day(slots) for day, slots in by_day.items()}
+        by_group: Dict[Tuple[str, int], List[ScheduleSlot]] = {}
+        for day, slots in by_day.items():
+            for slot in sorted(slots, key=lambda s: s.start_minute):
+                by_group.setdefault((day, slot.group_id), []).append(slot)
+        with self._lock:
+            self._days = days
+            self._by_group = by_group
+            self._loaded = True
+
+    def invalidate(self):
+        with self._lock:
+            self._days = {}
+            self._by_group = {}
+            self._loaded = False
+
+    def lookup(self, day_of_week: str, minute: int) -> Optional[ScheduleSlot]:
+        """Return the class active at `minute` past midnight on `day_of_week`."""
+        compiled = self._days.get(day_of_week)
+        if not compiled:
+            return None
+        bounds, active = compiled
+        position = bisect_right(bounds, minute) - 1
+        if position < 0:
+            return None
+        return active[position]
+
+    def group_slot(self, day_of_week: str, group_id: int, minute: int) -> Optional[ScheduleSlot]:
+        """
+        The class of `group_id` a scan at `minute` belongs to: the one in
+        progress, else the next one that day (students arriving early), else
+        the day's last one.
+        """
+        slots = self._by_group.get((day_of_week, group_id))
+        if not slots:
+            return None
+        for slot in slots:
+            if minute < slot.end_minute:
+                return slot
+        return slots[-1]
+
+
+schedule_index = ScheduleIndex()
@@ -0,0 +1,140 @@
+"""
+Background Classroom workspace syncs.
+
+start() records a queued SyncJob and hands it to a small thread pool, so the
+sync endpoint and the Google signup callback return at once. The worker runs
+sync_workspace_from_classroom on its own session and commits the progress
+(courses done, students imported, errors) on a second session before every
+course, so it can be polled while the sync transaction is still open.
+
+The partial unique index on sync_jobs keeps at most one queued or running job
+per teacher; start() returns that job instead of queueing another. Jobs left
+queued or running by a shutdown are marked failed at the next startup.
+"""
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..models import models
+from .classroom_sync import sync_workspace_from_classroom
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ('queued', 'running')
+
+
+class SyncJobRunner:
+    def __init__(self, max_workers: int = 2):
+        self.max_workers = max_workers
+        self.session_factory: Optional[Callable[[], Session]] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _session(self) -> Session:
+        if self.session_factory is None:
+            from ..database import SessionLocal
+            self.session_factory = SessionLocal
+        return self.session_factory()
+
+    @staticmethod
+    def active_job(db: Session, teacher_id: int) -> Optional[models.SyncJob]:
+        return (
+            db.query(models.SyncJob)
+            .filter(models.SyncJob.teacher_id == teacher_id, models.SyncJob.status.in_(ACTIVE_STATUSES))
+            .first()
+        )
+
+    def start(self, db: Session, teacher: models.Teacher) -> Tuple[models.SyncJob, bool]:
+        """Queues a sync for the teacher, or returns the one already queued or running. Returns (job, created)."""
+        job = self.active_job(db, teacher.id)
+        if job is not None:
+            return job, False
+        job = models.SyncJob(teacher_id=teacher.id, status='queued')
+        db.add(job)
+        try:
+            db.commit()
+        except IntegrityError:
+            # Another request queued one between the check and the insert.
+            db.rollback()
+            return self.active_job(db, teacher.id), False
+        db.refresh(job)
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="sync-job")
+            self._executor.submit(self._run, job.id)
+        return job, True
+
+    def _run(self, job_id: int):
+        db = self._session()
+        progress_db = self._session()
+        try:
+            job = progress_db.get(models.SyncJob, job_id)
+            job.status = 'running'
+            job.started_at = func.now()
+            progress_db.commit()
+
+            def progress(counts: dict):
+                job.courses_total = counts["courses_total"]
+                job.courses_done = counts["courses_done"]
+                job.students_imported = counts["students_imported"]
+                job.errors = json.dumps(counts["errors"])
+                progress_db.commit()
+
+            try:
+                teacher = db.get(models.Teacher, job.teacher_id)
+                if teacher is None:
+                    raise ValueError("Teacher not found.")
+                result = sync_workspace_from_classroom(db, teacher, progress=progress)
+            except Exception as error:
+                db.rollback()
+                logger.exception("Classroom workspace sync %s failed.", job_id)
+                errors = json.loads(job.errors or '[]')
+                errors.append({"course_id": None, "course_name": None, "error": str(error)})
+                job.status = 'failed'
+                job.errors = json.dumps(errors)
+            else:
+                job.status = 'succeeded'
+                job.courses_total = job.courses_done = result["courses_seen"]
+                job.students_imported = result["students_imported"]
+                job.errors = json.dumps(result["errors"])
+                job.result = json.dumps(result)
+            job.finished_at = func.now()
+            progress_db.commit()
+        except Exception:
+            logger.exception("Could not record the outcome of sync job %s.", job_id)
+        finally:
+            db.close()
+            progress_db.close()
+
+    @staticmethod
+    def fail_interrupted(db: Session) -> int:
+        """Marks jobs a previous process left queued or running as failed."""
+        count = (
+            db.query(models.SyncJob)
+            .filter(models.SyncJob.status.in_(ACTIVE_STATUSES))
+            .update({
+                models.SyncJob.status: 'failed',
+                models.SyncJob.finished_at: func.now(),
+                models.SyncJob.errors: json.dumps([
+                    {"course_id": None, "course_name": None, "error": "Interrupted by a server restart."}
+                ]),
+            }, synchronize_session=False)
+        )
+        db.commit()
+        return count
+
+    def shutdown(self):
+        """Stops taking jobs; queued ones are failed at the next startup."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+sync_jobs = SyncJobRunner()
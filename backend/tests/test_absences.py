@@ -0,0 +1,30 @@
+import os
+from datetime import datetime
+
+import pytest
+
+if not os.environ.get("TEST_DATABASE_URL"):
+    pytest.skip("TEST_DATABASE_URL is not set", allow_module_level=True)
+
+from src.crud import crud_attendance
+
+
+def test_materialized_absences_are_not_listed_as_scans(client, workspace, monkeypatch):
+    group, students = workspace['group'], workspace['students']
+    client.post('/api/schedule', json={'groupId': group['id'], 'dayOfWeek': 'Monday', 'startTime': '08:00', 'endTime': '09:00'})
+    # Monday 2026-03-09, 08:05 local time; only the first student comes to class.
+    client.post('/api/attendance/batch', json={'entries': [
+        {'studentQrId': students[0]['qrCodeId'], 'periodId': 2, 'scannedAt': '2026-03-09T14:05:00Z'},
+    ]})
+
+    materialized = client.post('/api/attendance/absences/materialize', params={
+        'start_date': '2026-03-09', 'end_date': '2026-03-09', 'group_id': group['id'],
+    }).json()
+    assert materialized['inserted'] == 2
+
+    monkeypatch.setattr(crud_attendance, 'get_mexico_time', lambda: datetime(2026, 3, 9, 12, 0))
+    for response in (
+        client.get('/api/attendance/today'),
+        client.get('/api/attendance/by-date', params={'query_date': '2026-03-09'}),
+    ):
+        assert [(record['student']['id'], record['status']) for record in response.json()] == [(students[0]['id'], 'present')]
@@ -0,0 +1,38 @@
+import os
+
+import pytest
+
+if not os.environ.get("TEST_DATABASE_URL"):
+    pytest.skip("TEST_DATABASE_URL is not set", allow_module_level=True)
+
+
+@pytest.fixture
+def topic(client, workspace):
+    return client.post('/api/topics', json={
+        'name': 'Genetica', 'periodId': 1, 'subjectId': workspace['subject']['id'],
+        'examWeight': 50, 'practiceWeight': 50, 'notebookWeight': 0, 'otherWeight': 0,
+    }).json()
+
+
+def test_bulk_create_keeps_optional_fields_of_mixed_rows(client, topic):
+    response = client.post('/api/assignments/bulk', json=[
+        {'category': 'Practices', 'name': 'Practica 1', 'topicId': topic['id']},
+        {'category': 'Practices', 'name': 'Practica 2', 'topicId': topic['id'], 'maxGrade': 20, 'classroomAsgId': 'cw-2'},
+        {'category': 'Exam', 'name': 'Examen', 'topicId': topic['id'], 'classroomAsgId': 'cw-3'},
+        {'category': 'Practices', 'name': 'Practica 3', 'topicId': topic['id']},
+    ])
+    assert response.status_code == 200
+    created = {row['name']: row for row in response.json()}
+    assert (created['Practica 1']['maxGrade'], created['Practica 1']['classroomAsgId']) == (10, None)
+    assert (created['Practica 2']['maxGrade'], created['Practica 2']['classroomAsgId']) == (20, 'cw-2')
+    assert (created['Examen']['maxGrade'], created['Examen']['classroomAsgId']) == (10, 'cw-3')
+    assert created['Practica 3']['maxGrade'] == 10
+
+
+def test_bulk_create_reports_second_exam(client, topic):
+    response = client.post('/api/assignments/bulk', json=[
+        {'category': 'Exam', 'name': 'Examen A', 'topicId': topic['id']},
+        {'category': 'Exam', 'name': 'Examen B', 'topicId': topic['id'], 'maxGrade': 20},
+    ])
+    assert response.status_code == 400
+    assert response.json()['detail'] == "A topic can only have one exam assignment."
@@ -0,0 +1,59 @@
+import os
+import threading
+from datetime import date, datetime
+
+import pytest
+
+if not os.environ.get("TEST_DATABASE_URL"):
+    pytest.skip("TEST_DATABASE_URL is not set", allow_module_level=True)
+
+from src.crud import crud_attendance
+from src.database import SessionLocal
+from src.models import models
+from src.services.attendance_partitions import attendance_partitions
+from src.services.attendance_rollup import check_rollups
+
+
+def _row(student, subject, status):
+    return {
+        'student_id': student['id'],
+        'subject_id': subject['id'],
+        'period_id': 1,
+        'timestamp': datetime(2026, 3, 2, 14, 0),
+        'attendance_date': date(2026, 3, 2),
+        'status': status,
+        'session_id': None,
+    }
+
+
+def test_racing_scans_are_counted_once(db, workspace):
+    student = workspace["students"][0]
+    attendance_partitions.ensure(db, [date(2026, 3, 2)])
+    db.commit()
+
+    # A writes the record and keeps its transaction open; B scans the same
+    # record meanwhile and has to wait for A's commit before it can write.
+    crud_attendance._write_attendance(db, [_row(student, workspace["subject"], 'present')])
+    second = SessionLocal()
+    outcome = {}
+
+    def scan_again():
+        try:
+            _, outcome['existing'] = crud_attendance._write_attendance(second, [_row(student, workspace["subject"], 'present')])
+            second.commit()
+        finally:
+            second.close()
+
+    thread = threading.Thread(target=scan_again)
+    thread.start()
+    thread.join(timeout=1)
+    assert thread.is_alive()
+    db.commit()
+    thread.join(timeout=10)
+    assert not thread.is_alive()
+
+    rollup = db.query(models.AttendanceRollup).filter_by(student_id=student['id'], period_id=1).one()
+    assert rollup.present_count == 1
+    assert check_rollups(db) == []
+    # B's write is reported as an update of A's record, not a second insert.
+    assert outcome['existing'] == {(student['id'], 1, date(2026, 3, 2))}
@@ -0,0 +1,36 @@
+import os
+
+import pytest
+from sqlalchemy import update
+
+if not os.environ.get("TEST_DATABASE_URL"):
+    pytest.skip("TEST_DATABASE_URL is not set", allow_module_level=True)
+
+from src.models import models
+from src.services.grade_tracker import grade_tracker
+
+
+def test_recompute_invalidates_cached_analytics(client, db, workspace):
+    topic = client.post('/api/topics', json={
+        'name': 'Celula', 'periodId': 1, 'subjectId': workspace['subject']['id'],
+        'examWeight': 100, 'practiceWeight': 0, 'notebookWeight': 0, 'otherWeight': 0,
+    }).json()
+    exam = client.post('/api/assignments/exam', json={'name': 'Examen 1', 'topicId': topic['id']}).json()
+    student_ids = [student['id'] for student in workspace['students']]
+    client.put(f"/api/grades/topic/{topic['id']}/matrix", json={
+        'studentIds': student_ids,
+        'assignments': [{'id': exam['id'], 'category': 'Exam'}],
+        'grades': [[10], [10], [10]],
+    })
+    grade_tracker.flush()
+
+    before = client.get('/api/grades/analytics', params={'topic_id': topic['id']}).json()
+    assert before['overall']['mean'] == 10
+
+    # A write the tracker does not see; only the explicit recompute picks it up.
+    db.execute(update(models.StudentExamGrade).where(models.StudentExamGrade.assignment_id == exam['id']).values(grade=4))
+    db.commit()
+    client.post('/api/grades/topic-grades/recompute', params={'topic_id': topic['id']})
+
+    after = client.get('/api/grades/analytics', params={'topic_id': topic['id']}).json()
+    assert after['overall']['mean'] == 4
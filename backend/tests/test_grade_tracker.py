@@ -0,0 +1,46 @@
+import time
+
+from src.services.grade_tracker import GradeTracker
+
+
+def _wait_for(condition, timeout: float = 2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_marks_are_debounced_into_one_recompute():
+    tracker = GradeTracker(delay=0.05, max_delay=1.0)
+    recomputed = []
+    tracker._recompute = lambda changes: recomputed.append(set(changes.topics))
+
+    tracker.mark_topics([1])
+    tracker.mark_topics([2])
+    assert tracker.data_version == 2
+
+    assert _wait_for(lambda: tracker.data_version == 3)
+    assert recomputed == [{1, 2}]
+
+
+def test_failed_recompute_is_retried_without_a_new_mark():
+    tracker = GradeTracker(delay=0.01, max_delay=0.05)
+    attempts = []
+
+    def recompute(changes):
+        attempts.append(set(changes.topics))
+        if len(attempts) == 1:
+            raise RuntimeError("database unavailable")
+
+    tracker._recompute = recompute
+    tracker.mark_topics([7])
+
+    assert _wait_for(lambda: tracker.data_version == 2)
+    assert attempts == [{7}, {7}]
+    assert not tracker._pending
+
+
+def test_flush_without_changes_keeps_the_version():
+    tracker = GradeTracker()
+    assert tracker.flush() is False
+    assert tracker.data_version == 0
@@ -0,0 +1,55 @@
+from collections import defaultdict
+
+import pytest
+from pydantic import ValidationError
+
+from src.crud.assignment_registry import BY_KEY, CATEGORIES
+from src.schemas.grade import GradeTransform
+from src.services import grade_transforms
+
+
+def test_an_assignment_scope_covers_one_table():
+    exam = BY_KEY['Exam']
+    assert grade_transforms.scopes(exam, 4, None) == [(exam, 4, None)]
+
+
+def test_a_topic_scope_covers_every_category():
+    assert grade_transforms.scopes(None, None, 7) == [(category, None, 7) for category in CATEGORIES]
+
+
+def test_touched_pairs_are_reported_per_grade_table_and_assignment():
+    changed = defaultdict(set)
+    exam, notebook = BY_KEY['Exam'], BY_KEY['Notebook']
+    assert grade_transforms._touched([(1, 4), (2, 4)], exam, changed) == 2
+    assert grade_transforms._touched([(1, 4)], notebook, changed) == 1
+    assert changed == {
+        (exam.grade_model, 4): {1, 2},
+        (notebook.grade_model, 4): {1},
+    }
+
+
+@pytest.mark.parametrize("body", [
+    {'operation': 'curve'},
+    {'operation': 'curve', 'slope': 1.2, 'offset': -0.5},
+    {'operation': 'cap', 'value': 9},
+    {'operation': 'rescale', 'newMaxGrade': 20},
+    {'operation': 'fill_missing', 'value': 0},
+])
+def test_transform_accepts_each_operations_parameters(body):
+    assert GradeTransform(topicId=1, **body).operation == body['operation']
+
+
+@pytest.mark.parametrize("body", [
+    {'operation': 'scale'},
+    {'operation': 'cap'},
+    {'operation': 'cap', 'value': 9, 'offset': 1},
+    {'operation': 'rescale', 'value': 5},
+    {'operation': 'rescale', 'newMaxGrade': 0},
+    {'operation': 'rescale', 'newMaxGrade': 1000},
+    {'operation': 'fill_missing', 'value': -1},
+    {'operation': 'curve', 'slope': -1},
+    {'operation': 'curve', 'offset': 1000},
+])
+def test_transform_rejects_missing_extra_or_out_of_range_parameters(body):
+    with pytest.raises(ValidationError):
+        GradeTransform(topicId=1, **body)
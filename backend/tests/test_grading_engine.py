@@ -0,0 +1,62 @@
+import numpy as np
+
+from src.services import grading_engine
+
+# CATEGORIES order: Notebook, Practices, Exam, Others.
+NOTEBOOK, PRACTICES, EXAM, OTHERS = range(4)
+
+
+class _Result:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+
+class _Session:
+    """Answers compute_topic_grades' two queries (grades, then topic weights) in order."""
+
+    def __init__(self, *results):
+        self.results = list(results)
+
+    def execute(self, statement, *args):
+        return _Result(self.results.pop(0))
+
+
+def _grades(result):
+    return {
+        (int(topic), int(student)): float(grade)
+        for topic, student, grade in zip(result.topic_ids, result.student_ids, result.grades)
+    }
+
+
+def test_topic_grade_is_the_weighted_mean_per_category():
+    session = _Session(
+        [
+            # (topic_id, student_id, category, grade, max_grade)
+            (1, 10, PRACTICES, 8.0, 10.0),
+            (1, 10, PRACTICES, 6.0, 10.0),
+            (1, 10, EXAM, 18.0, 20.0),
+            (1, 11, EXAM, 5.0, 10.0),
+            (2, 10, NOTEBOOK, 10.0, 10.0),
+        ],
+        # (topic_id, notebook, practices, exam, others weights)
+        [(1, 0.0, 50.0, 50.0, 0.0), (2, 25.0, 25.0, 25.0, 25.0)],
+    )
+    result = grading_engine.compute_topic_grades(session)
+    assert _grades(result) == {(1, 10): 8.0, (1, 11): 2.5, (2, 10): 2.5}
+
+
+def test_assignments_without_a_max_grade_are_ignored():
+    session = _Session(
+        [(1, 10, EXAM, 7.0, 0.0), (1, 11, EXAM, 7.0, 10.0)],
+        [(1, 0.0, 0.0, 100.0, 0.0)],
+    )
+    assert _grades(grading_engine.compute_topic_grades(session)) == {(1, 11): 7.0}
+
+
+def test_no_grades_gives_an_empty_result():
+    result = grading_engine.compute_topic_grades(_Session([]))
+    assert len(result) == 0
+    assert result.grades.dtype == np.float64
@@ -0,0 +1,100 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from src.crud.crud_attendance import classify_scan
+from src.services.qr_index import StudentRef
+from src.services.schedule_index import ScheduleIndex, schedule_index, to_minutes
+
+
+def _entry(day, start, end, group_id, grade=1, name='A'):
+    return SimpleNamespace(
+        day_of_week=day, start_time=start, end_time=end, group_id=group_id,
+        group=SimpleNamespace(grade=grade, name=name),
+    )
+
+
+ENTRIES = [
+    _entry('Monday', '08:00', '09:00', 1),
+    _entry('Monday', '10:00', '11:00', 1),
+    _entry('Monday', '08:30', '09:30', 2, name='B'),
+    _entry('Tuesday', '07:00', '08:00', 2, name='B'),
+]
+
+
+@pytest.fixture
+def index():
+    index = ScheduleIndex()
+    index.load(ENTRIES)
+    return index
+
+
+def test_to_minutes():
+    assert to_minutes('00:00') == 0
+    assert to_minutes('13:45') == 825
+
+
+def test_lookup_prefers_the_class_that_started_last(index):
+    assert index.lookup('Monday', to_minutes('08:15')).group_id == 1
+    assert index.lookup('Monday', to_minutes('08:45')).group_id == 2
+    assert index.lookup('Monday', to_minutes('09:15')).group_id == 2
+    assert index.lookup('Monday', to_minutes('09:45')) is None
+    assert index.lookup('Monday', to_minutes('07:59')) is None
+    assert index.lookup('Sunday', to_minutes('08:15')) is None
+
+
+def test_lookup_treats_the_end_minute_as_exclusive(index):
+    assert index.lookup('Monday', to_minutes('10:59')).start_time == '10:00'
+    assert index.lookup('Monday', to_minutes('11:00')) is None
+
+
+def test_group_slot_picks_the_class_in_progress_or_the_next_one(index):
+    assert index.group_slot('Monday', 1, to_minutes('07:30')).start_time == '08:00'
+    assert index.group_slot('Monday', 1, to_minutes('08:30')).start_time == '08:00'
+    assert index.group_slot('Monday', 1, to_minutes('09:30')).start_time == '10:00'
+
+
+def test_group_slot_falls_back_to_the_last_class_of_the_day(index):
+    assert index.group_slot('Monday', 1, to_minutes('12:00')).start_time == '10:00'
+    assert index.group_slot('Tuesday', 1, to_minutes('08:00')) is None
+    assert index.group_slot('Monday', 3, to_minutes('08:00')) is None
+
+
+def test_invalidate_empties_the_index(index):
+    index.invalidate()
+    assert not index.is_loaded
+    assert index.lookup('Monday', to_minutes('08:15')) is None
+
+
+@pytest.fixture
+def loaded_schedule():
+    schedule_index.load(ENTRIES)
+    yield
+    # The next strict-mode scan reloads the real schedule.
+    schedule_index.invalidate()
+
+
+STUDENT = StudentRef(student_id=10, group_id=1, subject_id=3)
+
+
+def test_classify_scan_outside_strict_mode_is_always_present():
+    assert classify_scan(None, STUDENT, datetime(2026, 3, 1, 3, 0), strict_mode=False, late_threshold=5) == 'present'
+
+
+def test_classify_scan_applies_the_late_threshold(loaded_schedule):
+    # 2026-03-02 is a Monday.
+    assert classify_scan(None, STUDENT, datetime(2026, 3, 2, 8, 5), True, 5) == 'present'
+    assert classify_scan(None, STUDENT, datetime(2026, 3, 2, 8, 6), True, 5) == 'late'
+    assert classify_scan(None, STUDENT, datetime(2026, 3, 2, 8, 6), True, 10) == 'present'
+
+
+def test_classify_scan_rejects_scans_without_the_students_class(loaded_schedule):
+    with pytest.raises(HTTPException) as no_class:
+        classify_scan(None, STUDENT, datetime(2026, 3, 2, 12, 0), True, 5)
+    assert no_class.value.detail == "attendance_error_strict_no_class"
+
+    with pytest.raises(HTTPException) as wrong_group:
+        classify_scan(None, STUDENT, datetime(2026, 3, 2, 9, 0), True, 5)
+    assert wrong_group.value.detail == "attendance_error_strict_wrong_group||1B"
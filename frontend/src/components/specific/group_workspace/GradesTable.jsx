@@ -27,8 +27,9 @@ const GradesTable = ({ selectedTopic, students, gradeData, isLoading }) => {
     return gradeData.assignments.filter(asg => asg.category === activeCategory);
   }, [gradeData, activeCategory]);
 
-  const getAssignmentGrade = (studentId, assignmentId) => {
-    const grade = gradeData?.grades?.[studentId]?.[assignmentId];
+  // Grades are keyed by category, then assignment id: ids repeat across categories.
+  const getAssignmentGrade = (studentId, category, assignmentId) => {
+    const grade = gradeData?.grades?.[studentId]?.[category]?.[assignmentId];
     if (grade === null || grade === undefined) return '—';
     return formatGrade(parseFloat(grade)); 
   };
@@ -50,7 +51,7 @@ const GradesTable = ({ selectedTopic, students, gradeData, isLoading }) => {
       filterCategories.slice(1).forEach(cat => {
         const assignments = assignmentsByCategory[cat.key];
         const gradesForCategory = assignments
-          .map(asg => studentGrades[asg.id])
+          .map(asg => studentGrades[cat.key]?.[asg.id])
           .filter(grade => grade !== null && grade !== undefined);
         let average = 0;
         if (gradesForCategory.length > 0) {
@@ -133,7 +134,7 @@ const GradesTable = ({ selectedTopic, students, gradeData, isLoading }) => {
                       <td className="align-center"><strong>{formatGrade(data.categorySummaries[activeCategory]?.average)}</strong></td>
                       <td className="align-left">{data.studentName}</td>
                       {assignmentsForCategory.map(asg => (
-                        <td key={asg.id} className="align-center">{getAssignmentGrade(data.studentId, asg.id)}</td>
+                        <td key={asg.id} className="align-center">{getAssignmentGrade(data.studentId, activeCategory, asg.id)}</td>
                       ))}
                     </tr>
                   ))
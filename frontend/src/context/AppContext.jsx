@@ -3,6 +3,7 @@ import { useTranslation } from 'react-i18next';
 import { apiClient } from '../services/apiClient';
 
 const PENDING_SETUP_KEY = 'classpy_pending_setup';
+const SYNC_POLL_INTERVAL_MS = 1500;
 
 const AppContext = createContext();
 
@@ -26,6 +27,7 @@ export const AppProvider = ({ children }) => {
   const [subjects, setSubjects] = useState([]);
   const [groups, setGroups] = useState([]);
   const [isWorkspaceLoading, setIsWorkspaceLoading] = useState(true);
+  const [workspaceSyncJob, setWorkspaceSyncJob] = useState(null);
 
   const handleLanguageChange = () => {
     const newLang = i18n.language === 'en' ? 'es' : 'en';
@@ -58,6 +60,21 @@ export const AppProvider = ({ children }) => {
     checkTeacherStatus();
   }, []);
 
+  // The Classroom sync runs in the background; poll it until it finishes.
+  const waitForSyncJob = async (job) => {
+    let current = job;
+    setWorkspaceSyncJob(current);
+    while (current.status === 'queued' || current.status === 'running') {
+      await new Promise((resolve) => setTimeout(resolve, SYNC_POLL_INTERVAL_MS));
+      current = await apiClient.getSyncJob(current.id);
+      setWorkspaceSyncJob(current);
+    }
+    if (current.status === 'failed') {
+      console.error('Classroom workspace sync failed:', current.errors);
+    }
+    return current;
+  };
+
   const fetchWorkspaceData = async () => {
     setIsWorkspaceLoading(true);
     try {
@@ -73,7 +90,8 @@ export const AppProvider = ({ children }) => {
         groupsData.length === 0
       ) {
         try {
-          await apiClient.syncWorkspaceFromClassroom();
+          const syncJob = await apiClient.syncWorkspaceFromClassroom();
+          await waitForSyncJob(syncJob);
           [subjectsData, groupsData] = await Promise.all([
             apiClient.getSubjects(),
             apiClient.getGroups(),
@@ -150,6 +168,7 @@ export const AppProvider = ({ children }) => {
     subjects,
     groups,
     isWorkspaceLoading,
+    workspaceSyncJob,
     refreshWorkspaceData: fetchWorkspaceData, 
   };
   
@@ -144,9 +144,26 @@ const AttendancePage = () => {
     }
   }, []);
 
+  const isViewingToday = selectedDate.toDateString() === new Date().toDateString();
+
   useEffect(() => {
-    fetchAttendance(selectedDate);
-  }, [selectedDate, fetchAttendance]);
+    if (!isViewingToday) {
+      fetchAttendance(selectedDate);
+      return undefined;
+    }
+
+    // Today's records arrive as one snapshot and then one event per scan.
+    setLoading(true);
+    return apiClient.subscribeToTodaysAttendance({
+      onSnapshot: (records) => {
+        setAttendanceRecords(records);
+        setLoading(false);
+      },
+      onRecord: (record) => {
+        setAttendanceRecords((prev) => [record, ...prev.filter((r) => r.id !== record.id)]);
+      },
+    });
+  }, [selectedDate, isViewingToday, fetchAttendance]);
 
   useEffect(() => {
     const focusInterval = setInterval(() => {
@@ -188,11 +205,6 @@ const AttendancePage = () => {
         setIsFlipped(true);
       }
 
-      const today = new Date().toDateString();
-      if (selectedDate.toDateString() === today) {
-        fetchAttendance(new Date());
-      }
-
       scanTimerRef.current = setTimeout(() => {
         setIsFlipped(false);
         swapDataTimerRef.current = setTimeout(() => {
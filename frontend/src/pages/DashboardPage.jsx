@@ -12,7 +12,7 @@ import './DashboardPage.css';
 
 const DashboardPage = () => {
   const { t } = useTranslation();
-  const { groups, subjects, isWorkspaceLoading } = useAppContext();
+  const { groups, subjects, isWorkspaceLoading, workspaceSyncJob } = useAppContext();
   const [schedule, setSchedule] = useState([]);
 
   useEffect(() => {
@@ -66,7 +66,11 @@ const DashboardPage = () => {
   if (isWorkspaceLoading) {
     return (
       <div className="dashboard-page">
-        <div className="dashboard-loading">{t('dashboard.loading')}</div>
+        <div className="dashboard-loading">
+          {workspaceSyncJob?.status === 'running' && workspaceSyncJob.coursesTotal > 0
+            ? t('dashboard.syncing', { done: workspaceSyncJob.coursesDone, total: workspaceSyncJob.coursesTotal })
+            : t('dashboard.loading')}
+        </div>
       </div>
     );
   }
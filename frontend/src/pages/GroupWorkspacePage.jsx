@@ -108,7 +108,7 @@ const GroupWorkspacePage = () => {
     useEffect(() => {
         if (selectedTopicId) {
             setIsGradesLoading(true);
-            apiClient.getGradesForTopic(selectedTopicId)
+            apiClient.getGradesForTopic(selectedTopicId, currentGroup?.id)
                 .then(setGradeData)
                 .catch(err => {
                     setError(`Failed to fetch grades: ${err.message}`);
@@ -120,7 +120,7 @@ const GroupWorkspacePage = () => {
             setAllAssignments(null);
             setGradeData({ assignments: [], grades: {} });
         }
-    }, [selectedTopicId, refreshAssignments]);
+    }, [selectedTopicId, currentGroup, refreshAssignments]);
 
     const assignmentCounts = useMemo(() => {
         if (!allAssignments) return { notebook: 0, practices: 0, exam: 0, others: 0 };
@@ -338,8 +338,9 @@ export const apiClient = {
   // =================================================================
   // Grades Methods
   // =================================================================
-  getGradesForTopic: async (topicId) => {
-    const response = await fetch(`${API_BASE_URL}/api/grades/topic/${topicId}`);
+  getGradesForTopic: async (topicId, groupId) => {
+    const query = groupId ? `?group_id=${groupId}` : '';
+    const response = await fetch(`${API_BASE_URL}/api/grades/topic/${topicId}${query}`);
     if (!response.ok) {
       const errorData = await response.json();
       throw new Error(errorData.detail || 'Failed to fetch grades.');
@@ -391,6 +392,12 @@ export const apiClient = {
     return response.json();
   },
 
+  getSyncJob: async (jobId) => {
+    const response = await fetch(`${API_BASE_URL}/api/classroom/sync-jobs/${jobId}`);
+    if (!response.ok) throw new Error('Failed to fetch workspace sync progress.');
+    return response.json();
+  },
+
   createStudentsInBulk: async (groupId, studentsData) => {
     const payload = { students: studentsData };
     const response = await fetch(`${API_BASE_URL}/api/students/bulk/${groupId}`, {
@@ -438,6 +445,20 @@ export const apiClient = {
     return response.json();
   },
 
+  /**
+   * Opens the live attendance feed for today. `onSnapshot` receives the full
+   * list of today's records, `onRecord` each record created or updated after
+   * it. EventSource reconnects on its own and resumes from the last event id.
+   * Returns a function that closes the feed.
+   */
+  subscribeToTodaysAttendance: ({ onSnapshot, onRecord, onError }) => {
+    const source = new EventSource(`${API_BASE_URL}/api/attendance/stream`);
+    source.addEventListener('snapshot', (event) => onSnapshot(JSON.parse(event.data).records));
+    source.addEventListener('record', (event) => onRecord(JSON.parse(event.data)));
+    if (onError) source.onerror = onError;
+    return () => source.close();
+  },
+
    getAttendanceByDate: async (date) => {
     // Format date as YYYY-MM-DD
     const formattedDate = date.toISOString().split('T')[0];